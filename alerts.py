@@ -0,0 +1,185 @@
+"""
+Alert harga per chat ("kabari kalau BTC tembus 70k").
+
+Per symbol ada dua index terurut (array typed + list id paralel):
+    up   -> alert "harga naik ke >= level", key = -level ascending
+    down -> alert "harga turun ke <= level", key = level ascending
+Dengan key begitu alert yang kena selalu berupa ekor array: satu bisect lalu
+potong ekor, O(log n + k) per update harga, tanpa scan linear.
+
+Harga datang dari candle yang sudah di-fetch scanner (high/low candle terbaru,
+jadi wick di antara dua scan tetap terdeteksi).
+"""
+import itertools
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+import metrics
+
+MAX_ALERTS_PER_CHAT = 50
+
+UP = "up"
+DOWN = "down"
+
+
+def valid_level(level):
+    """Level harus angka positif berhingga: NaN merusak urutan bisect, inf/negatif tidak pernah kena."""
+    return math.isfinite(level) and level > 0
+
+
+class Alert:
+    __slots__ = ("id", "chat_id", "symbol", "level", "direction")
+
+    def __init__(self, id, chat_id, symbol, level, direction):
+        self.id = id
+        self.chat_id = chat_id
+        self.symbol = symbol
+        self.level = level
+        self.direction = direction
+
+
+class _Side:
+    """
+    Threshold satu arah satu symbol. Key disimpan ascending; alert yang kena
+    harga `p` adalah semua key >= key(p) (ekor array).
+      up  : key = -level  (kena kalau level <= high  <=> -level >= -high)
+      down: key = level   (kena kalau level >= low)
+    """
+
+    __slots__ = ("sign", "keys", "ids")
+
+    def __init__(self, sign):
+        self.sign = sign
+        self.keys = array("d")
+        self.ids = []
+
+    def add(self, level, alert_id):
+        key = self.sign * level
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.ids.insert(i, alert_id)
+
+    def remove(self, level, alert_id):
+        key = self.sign * level
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.ids[i] == alert_id:
+                del self.keys[i]
+                del self.ids[i]
+                return True
+            i += 1
+        return False
+
+    def pop_triggered(self, price):
+        i = bisect_left(self.keys, self.sign * price)
+        if i == len(self.keys):
+            return []
+        ids = self.ids[i:]
+        del self.keys[i:]
+        del self.ids[i:]
+        return ids
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class AlertBook:
+    def __init__(self, max_per_chat=MAX_ALERTS_PER_CHAT):
+        self.max_per_chat = max_per_chat
+        self._sides = {}      # symbol -> (up _Side, down _Side)
+        self._alerts = {}     # id -> Alert
+        self._by_chat = {}    # chat_id -> set(id)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _symbol_sides(self, symbol):
+        sides = self._sides.get(symbol)
+        if sides is None:
+            sides = self._sides[symbol] = (_Side(-1.0), _Side(1.0))
+        return sides
+
+    def add(self, chat_id, symbol, level, current_price):
+        """
+        Pasang alert; arah ditentukan dari harga sekarang (level di atas -> up).
+        Return Alert, atau None kalau jatah alert chat sudah penuh.
+        ValueError kalau level bukan angka positif berhingga.
+        """
+        if not valid_level(level):
+            raise ValueError(f"level alert tidak valid: {level}")
+        direction = UP if level > current_price else DOWN
+        with self._lock:
+            ids = self._by_chat.setdefault(chat_id, set())
+            if len(ids) >= self.max_per_chat:
+                return None
+            alert = Alert(next(self._ids), chat_id, symbol, level, direction)
+            up, down = self._symbol_sides(symbol)
+            (up if direction == UP else down).add(level, alert.id)
+            self._alerts[alert.id] = alert
+            ids.add(alert.id)
+        return alert
+
+    def remove(self, chat_id, alert_id):
+        with self._lock:
+            alert = self._alerts.get(alert_id)
+            if alert is None or alert.chat_id != chat_id:
+                return False
+            up, down = self._sides[alert.symbol]
+            (up if alert.direction == UP else down).remove(alert.level, alert_id)
+            self._forget(alert)
+        return True
+
+    def _forget(self, alert):
+        del self._alerts[alert.id]
+        ids = self._by_chat.get(alert.chat_id)
+        if ids is not None:
+            ids.discard(alert.id)
+            if not ids:
+                del self._by_chat[alert.chat_id]
+
+    def for_chat(self, chat_id):
+        with self._lock:
+            alerts = [self._alerts[i] for i in self._by_chat.get(chat_id, ())]
+        return sorted(alerts, key=lambda a: (a.symbol, a.level))
+
+    def check(self, symbol, high, low):
+        """Harga terbaru symbol (high/low sejak cek terakhir). Return list Alert yang kena (sudah dilepas)."""
+        with self._lock:
+            sides = self._sides.get(symbol)
+            if sides is None:
+                return []
+            up, down = sides
+            fired = [self._alerts[i] for i in up.pop_triggered(high) + down.pop_triggered(low)]
+            for alert in fired:
+                self._forget(alert)
+        if fired:
+            metrics.inc("cryptobot_alerts_fired_total", len(fired))
+        return fired
+
+    def has(self, symbol):
+        """True kalau masih ada alert aktif untuk `symbol`."""
+        with self._lock:
+            sides = self._sides.get(symbol)
+            return sides is not None and bool(len(sides[0]) or len(sides[1]))
+
+    def symbols(self):
+        with self._lock:
+            return [s for s, (up, down) in self._sides.items() if len(up) or len(down)]
+
+    def clear(self):
+        with self._lock:
+            self._sides.clear()
+            self._alerts.clear()
+            self._by_chat.clear()
+
+    def __len__(self):
+        return len(self._alerts)
+
+
+def format_alert(alert, price=None):
+    arrow = "⬆️" if alert.direction == UP else "⬇️"
+    text = f"{arrow} #{alert.id} {alert.symbol} {'>=' if alert.direction == UP else '<='} {alert.level:g}"
+    if price is not None:
+        text += f" (harga {price:g})"
+    return text
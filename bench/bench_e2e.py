@@ -0,0 +1,166 @@
+"""
+Load test end-to-end offline: scanner + chart diputar dari tape exchange
+(tape.py) dan kirim ke server Telegram palsu (bench/telegram_stub.py).
+
+Contoh:
+    # rekam tape sintetis dari exchange palsu (sekali), lalu putar ulang
+    python -m bench.bench_e2e --make-tape data/fake.tape --pairs 20 --cycles 120
+    python -m bench.bench_e2e --tape data/fake.tape --chats 50 --cycles 120
+
+    # tape hasil rekaman produksi (EXCHANGE_MODE=record)
+    python -m bench.bench_e2e --tape data/exchange.tape --chats 200 --tg-latency 0.05
+"""
+import argparse
+import json
+import time
+
+import telebot
+
+import scanner
+from bench.fake_exchange import FakeExchange, make_pairs
+from bench.telegram_stub import TelegramStub
+from ratelimit import Pacer
+from tape import TapeRecorder, TapeReplayer
+
+
+def pick(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 2)
+
+
+def make_tape(path, pairs, timeframes, cycles, step, seed):
+    """Rekam `cycles` putaran scan terhadap exchange palsu ke `path`."""
+    recorder = TapeRecorder(FakeExchange(seed=seed), path)
+    scanner.exchange = recorder
+    scanner.JOURNAL = None  # sinyal dari data palsu tidak masuk jurnal
+    scanner.reset_state()
+    for _ in range(cycles):
+        scanner.scan_once(lambda msg: None, pairs=pairs, timeframes=timeframes)
+        recorder.advance(step)
+    recorder.close()
+
+
+def tape_pairs(path):
+    pairs = []
+    with open(path) as f:
+        for line in f:
+            symbol = json.loads(line)[3]
+            if symbol not in pairs:
+                pairs.append(symbol)
+    return pairs
+
+
+def run(args):
+    timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+    if args.make_tape:
+        make_tape(args.make_tape, make_pairs(args.pairs), timeframes, args.cycles, args.step, args.seed)
+        args.tape = args.make_tape
+
+    stub = TelegramStub(latency=args.tg_latency, enforce_limits=True).start()
+    telebot.apihelper.API_URL = stub.api_url
+    bot = telebot.TeleBot("123456:stub", threaded=False)
+
+    chats = list(range(1, args.chats + 1))
+    pacer = Pacer() if not args.no_pacer else None
+    send_ms = []
+
+    def send_to_chat(chat_id, text):
+        if pacer is not None:
+            pacer.wait(chat_id)
+        t0 = time.perf_counter()
+        try:
+            bot.send_message(chat_id, text, parse_mode="Markdown")
+        finally:
+            send_ms.append((time.perf_counter() - t0) * 1000)
+
+    def send_chart(chat_id, chart):
+        if pacer is not None:
+            pacer.wait(chat_id)
+        try:
+            sent = bot.send_photo(chat_id, chart.file_id or chart.png)
+            chart.file_id = sent.photo[-1].file_id
+        except Exception:
+            pass
+
+    def send_to_all(text):
+        for chat_id in chats:
+            try:
+                send_to_chat(chat_id, text)
+            except Exception:
+                pass  # 429 dsb. sudah dihitung di stub
+
+    replay = TapeReplayer(args.tape, speed=0, latency=args.replay_latency)
+    scanner.exchange = replay
+    scanner.JOURNAL = None
+    scanner.reset_state()
+    pairs = tape_pairs(args.tape)
+
+    walls, signals = [], 0
+    t_start = time.perf_counter()
+    for i in range(args.cycles):
+        t0 = time.perf_counter()
+        signals += scanner.scan_once(send_to_all, pairs=pairs, timeframes=timeframes, notify=send_to_chat)
+        if args.charts and i % args.chart_every == 0:
+            import charts
+            for n in range(args.charts):
+                symbol = pairs[n % len(pairs)]
+                chart = charts.get_chart(symbol, timeframes[n % len(timeframes)])
+                if chart is not None:
+                    send_chart(chats[n % len(chats)], chart)
+        walls.append(time.perf_counter() - t0)
+        replay.advance(args.step)
+    total = time.perf_counter() - t_start
+    stub.stop()
+
+    walls.sort()
+    send_ms.sort()
+    return {
+        "pairs": len(pairs),
+        "chats": len(chats),
+        "cycles": args.cycles,
+        "total_s": round(total, 2),
+        "cycle_ms_p50": round(1000 * walls[len(walls) // 2], 2),
+        "cycle_ms_max": round(1000 * walls[-1], 2),
+        "signals": signals,
+        "exchange_requests": replay.requests,
+        "tape_misses": replay.misses,
+        "telegram_calls": sum(stub.calls.values()),
+        "telegram_429": stub.rejected,
+        "telegram_connections": stub.connections,
+        "send_ms_p50": pick(send_ms, 0.5),
+        "send_ms_p99": pick(send_ms, 0.99),
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Load test end-to-end offline (tape exchange + stub Telegram)")
+    p.add_argument("--tape", help="file tape exchange (EXCHANGE_MODE=record)")
+    p.add_argument("--make-tape", help="rekam tape sintetis dari exchange palsu ke path ini dulu")
+    p.add_argument("--pairs", type=int, default=7, help="jumlah pair untuk --make-tape")
+    p.add_argument("--timeframes", default=",".join(scanner.CRYPTO_TIMEFRAMES))
+    p.add_argument("--cycles", type=int, default=60)
+    p.add_argument("--step", type=float, default=60, help="detik jam exchange maju per putaran")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--chats", type=int, default=20, help="jumlah chat aktif")
+    p.add_argument("--charts", type=int, default=0, help="chart yang diminta per putaran chart")
+    p.add_argument("--chart-every", type=int, default=10, help="putaran antar gelombang chart")
+    p.add_argument("--tg-latency", type=float, default=0.0, help="latency stub Telegram (detik)")
+    p.add_argument("--replay-latency", action="store_true", help="tidur sesuai latency exchange yang direkam")
+    p.add_argument("--no-pacer", action="store_true", help="kirim tanpa pembatas 30/s global, 1/s per chat")
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+    if not (args.tape or args.make_tape):
+        p.error("butuh --tape atau --make-tape")
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        width = max(map(len, result))
+        for k, v in result.items():
+            print(f"{k:>{width}}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark waktu import (cold start) per modul, tiap target di proses Python baru.
+
+Contoh:
+    python -m bench.bench_import
+    python -m bench.bench_import --runs 5 --detail 15 main
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Path web (harus ringan) vs modul berat yang sekarang di-load lazy
+DEFAULT_TARGETS = [
+    "main",
+    "scanner",
+    "charts",
+    "metrics",
+    "flask",
+    "telebot",
+    "ccxt",
+    "numpy",
+    "matplotlib.pyplot",
+]
+
+_CHILD = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+try:
+    import {target}
+    error = None
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+dt = time.perf_counter() - t0
+heavy = [m for m in ("numpy", "ccxt", "matplotlib") if m in sys.modules]
+print(json.dumps({{
+    "seconds": dt,
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "heavy": heavy,
+    "error": error,
+}}))
+"""
+
+
+def measure(target, runs, env):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD.format(target=target)],
+            capture_output=True, text=True, env=env,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    first = samples[0]
+    return {
+        "target": target,
+        "ms_median": round(1000 * statistics.median(s["seconds"] for s in samples), 1),
+        "maxrss_mb": round(max(s["maxrss_kb"] for s in samples) / 1024, 1),
+        "modules": first["modules"],
+        "heavy": ",".join(first["heavy"]) or "-",
+        "error": first["error"],
+    }
+
+
+def importtime_detail(target, top, env):
+    """Modul paling lambat (cumulative) dari `python -X importtime`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, env=env,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split("|")
+        rows.append((int(cumulative_us), int(self_us.split(":")[-1]), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark waktu import modul bot")
+    p.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    p.add_argument("--runs", type=int, default=3, help="jumlah proses baru per target")
+    p.add_argument("--detail", type=int, default=0, help="tampilkan N modul paling lambat per target")
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    env = dict(os.environ)
+    env.setdefault("TOKEN", "0:benchmark")  # main.py butuh TOKEN saat import
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    results = [measure(t, args.runs, env) for t in args.targets]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'target':<20} {'ms':>8} {'rss MB':>8} {'modules':>8}  heavy")
+        for r in results:
+            status = f"  !! {r['error']}" if r["error"] else ""
+            print(f"{r['target']:<20} {r['ms_median']:>8} {r['maxrss_mb']:>8} {r['modules']:>8}  {r['heavy']}{status}")
+
+    for target in args.targets if args.detail else []:
+        print(f"\n== {target}: {args.detail} modul paling lambat (cumulative us, self us)")
+        for cumulative, self_us, name in importtime_detail(target, args.detail, env):
+            print(f"{cumulative:>10} {self_us:>10}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
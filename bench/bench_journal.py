@@ -0,0 +1,105 @@
+"""
+Benchmark jurnal sinyal (journal.py): biaya append di thread scanner, tulis,
+load index dari disk, dan latency query /history atas history berbulan-bulan.
+
+Contoh:
+    python -m bench.bench_journal
+    python -m bench.bench_journal --days 365 --per-day 2000 --json
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+
+from bench.fake_exchange import make_pairs
+from journal import DAY_MS, SignalJournal, to_csv
+
+TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+
+
+def pick(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 3)
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(1000 * (time.perf_counter() - t0))
+    return sorted(samples)
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    pairs = make_pairs(args.pairs)
+    root = tempfile.mkdtemp(prefix="journal-bench-")
+    start_ms = 1_700_000_000_000 // DAY_MS * DAY_MS
+    total = args.days * args.per_day
+    try:
+        jr = SignalJournal(root, flush_interval=0.2, queue_size=total + 1)
+        res = {"price": 100.0, "macd": 0.1, "signal": 0.05, "hist": 0.05}
+        step = DAY_MS // args.per_day
+        t0 = time.perf_counter()
+        for i in range(total):
+            jr.append(start_ms + i * step, rng.choice(pairs), rng.choice(TIMEFRAMES), rng.choice(("BUY", "SELL")), res)
+        append_s = time.perf_counter() - t0
+        jr.flush()
+        write_s = time.perf_counter() - t0
+        jr.close()
+
+        t0 = time.perf_counter()
+        cold = SignalJournal(root)
+        cold.count()
+        load_s = time.perf_counter() - t0
+
+        symbol, tf = pairs[0], "1h"
+        end_ms = start_ms + args.days * DAY_MS
+        last10 = timed(lambda: cold.query(symbol, tf, limit=10), args.runs)
+        month = timed(lambda: cold.query(symbol, tf, end_ms - 30 * DAY_MS, end_ms), args.runs)
+        all_rows = cold.query(symbol, tf)
+        csv_ms = timed(lambda: to_csv(all_rows), 5)
+        cold.close()
+        return {
+            "rows": total,
+            "days": args.days,
+            "append_us": round(1e6 * append_s / total, 2),
+            "write_rows_per_s": round(total / write_s),
+            "load_ms": round(1000 * load_s, 1),
+            "history_last10_p50_ms": pick(last10, 0.5),
+            "history_last10_p99_ms": pick(last10, 0.99),
+            "range_30d_rows": len(cold.query(symbol, tf, end_ms - 30 * DAY_MS, end_ms)),
+            "range_30d_p50_ms": pick(month, 0.5),
+            "range_30d_p99_ms": pick(month, 0.99),
+            "csv_rows": len(all_rows),
+            "csv_ms": pick(csv_ms, 0.5),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark jurnal sinyal")
+    p.add_argument("--days", type=int, default=180)
+    p.add_argument("--per-day", type=int, default=500, help="sinyal per hari (semua pair/TF)")
+    p.add_argument("--pairs", type=int, default=50)
+    p.add_argument("--runs", type=int, default=200)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        width = max(map(len, result))
+        for k, v in result.items():
+            print(f"{k:>{width}}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark scanner auto-signal dengan exchange palsu (tanpa network).
+
+Contoh:
+    python -m bench.bench_scanner --pairs 7 --timeframes 5m,15m,30m,1h,4h,1d
+    python -m bench.bench_scanner --pairs 50 --latency 0.02 --error-rate 0.05
+    python -m bench.bench_scanner --json > bench_output.txt
+    python -m bench.bench_scanner --baseline baseline.json --max-regression 0.2
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import scanner
+from bench.fake_exchange import FakeExchange, make_pairs
+
+
+def run_cycles(fake, pairs, timeframes, cycles, step):
+    """Jalankan `cycles` putaran scan_once, return statistik timing."""
+    sent = []
+    walls, cpus, signals = [], [], 0
+    for _ in range(cycles):
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        signals += scanner.scan_once(sent.append, pairs=pairs, timeframes=timeframes)
+        walls.append(time.perf_counter() - wall0)
+        cpus.append(time.process_time() - cpu0)
+        fake.advance(step)
+    return walls, cpus, signals, len(sent)
+
+
+def measure_allocations(fake, pairs, timeframes):
+    """Satu putaran scan di bawah tracemalloc (dipisah supaya timing tidak ikut lambat)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        scanner.scan_once(lambda msg: None, pairs=pairs, timeframes=timeframes)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    return {
+        "alloc_blocks": sum(max(d.count_diff, 0) for d in diff),
+        "alloc_net_kb": round(sum(d.size_diff for d in diff) / 1024, 1),
+        "alloc_peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(args):
+    timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+    pairs = make_pairs(args.pairs)
+
+    fake = FakeExchange(
+        seed=args.seed,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        recorded=args.recorded,
+    )
+    scanner.exchange = fake
+    scanner.EVAL_MODE = args.eval_mode
+    scanner.BASE_TIMEFRAME = args.base_timeframe
+    scanner.DELIVERY_MODE = args.delivery
+    scanner.JOURNAL = None  # sinyal dari data palsu tidak masuk jurnal
+    scanner.reset_state()
+
+    # retry NetworkError di get_ohlcv_ccxt tidur beberapa detik, matikan di benchmark
+    retry_delay = scanner.RETRY_DELAY
+    scanner.RETRY_DELAY = 0
+    try:
+        if args.warmup:
+            run_cycles(fake, pairs, timeframes, args.warmup, args.step)
+        fake.requests = fake.errors = 0
+        walls, cpus, signals, messages = run_cycles(fake, pairs, timeframes, args.cycles, args.step)
+        requests, errors = fake.requests, fake.errors
+        allocs = {} if args.no_allocs else measure_allocations(fake, pairs, timeframes)
+    finally:
+        scanner.RETRY_DELAY = retry_delay
+
+    walls.sort()
+    combos = len(pairs) * len(timeframes) or 1
+    candle_bytes = sum(c.nbytes() for c in scanner.CANDLES.values())
+    return {
+        "pairs": len(pairs),
+        "timeframes": len(timeframes),
+        "cycles": args.cycles,
+        "scan_wall_ms_mean": round(1000 * sum(walls) / len(walls), 2),
+        "scan_wall_ms_p50": round(1000 * walls[len(walls) // 2], 2),
+        "scan_wall_ms_max": round(1000 * walls[-1], 2),
+        "scan_cpu_ms_mean": round(1000 * sum(cpus) / len(cpus), 2),
+        "requests": requests,
+        "requests_failed": errors,
+        "signals": signals,
+        "messages": messages,
+        "circuit_trips": sum(b.trips_total for b in scanner.BREAKERS.values()),
+        "candles_kb_per_combo": round(candle_bytes / combos / 1024, 2),
+        **allocs,
+    }
+
+
+def check_regression(result, baseline_path, max_regression):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    failures = []
+    for key in ("scan_wall_ms_mean", "scan_cpu_ms_mean", "requests"):
+        old, new = baseline.get(key), result.get(key)
+        if old and new is not None and new > old * (1 + max_regression):
+            failures.append(f"{key}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return failures
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark scanner MACD dengan exchange palsu")
+    p.add_argument("--pairs", type=int, default=7, help="jumlah pair (N)")
+    p.add_argument("--timeframes", default=",".join(scanner.CRYPTO_TIMEFRAMES),
+                   help="daftar timeframe dipisah koma (M)")
+    p.add_argument("--cycles", type=int, default=5, help="jumlah putaran scan yang diukur")
+    p.add_argument("--warmup", type=int, default=1, help="putaran pemanasan (tidak diukur)")
+    p.add_argument("--step", type=float, default=60, help="detik jam exchange maju per putaran")
+    p.add_argument("--latency", type=float, default=0.0, help="latency per request (detik)")
+    p.add_argument("--jitter", type=float, default=0.0, help="jitter latency maksimum (detik)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="peluang NetworkError 0..1")
+    p.add_argument("--rate-limit-rate", type=float, default=0.0,
+                   help="peluang response 429 0..1 (menguji circuit breaker)")
+    p.add_argument("--eval-mode", choices=["closed", "live"], default=scanner.EVAL_MODE,
+                   help="closed = cross di candle close, live = state MACD candle berjalan")
+    p.add_argument("--base-timeframe", default=scanner.BASE_TIMEFRAME,
+                   help="base TF untuk resampling, \"\" = fetch tiap TF langsung")
+    p.add_argument("--delivery", choices=["digest", "single"], default=scanner.DELIVERY_MODE,
+                   help="digest = sinyal satu putaran digabung, single = satu pesan per sinyal")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--recorded", help="file JSON OHLCV rekaman, dipakai menggantikan data sintetis")
+    p.add_argument("--no-allocs", action="store_true", help="lewati pengukuran alokasi (tracemalloc)")
+    p.add_argument("--json", action="store_true", help="output JSON (bisa dipakai sebagai baseline)")
+    p.add_argument("--baseline", help="file JSON hasil sebelumnya untuk cek regresi")
+    p.add_argument("--max-regression", type=float, default=0.25,
+                   help="toleransi kenaikan relatif sebelum dianggap regresi")
+    args = p.parse_args(argv)
+
+    result = run_benchmark(args)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key, value in result.items():
+            print(f"{key:>20}: {value}")
+
+    if args.baseline:
+        failures = check_regression(result, args.baseline, args.max_regression)
+        if failures:
+            print("REGRESI:", *failures, sep="\n  ", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
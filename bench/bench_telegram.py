@@ -0,0 +1,142 @@
+"""
+Benchmark transport Telegram: bawaan telebot vs tgtransport (session bersama,
+pool keep-alive, upload foto di-stream) terhadap server Telegram palsu lokal.
+
+Contoh:
+    python -m bench.bench_telegram
+    python -m bench.bench_telegram --threads 8 --messages 400 --photos 40 --tg-latency 0.02
+    python -m bench.bench_telegram --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import telebot
+
+import tgtransport
+from bench.telegram_stub import TelegramStub
+
+
+def pick(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 2)
+
+
+def timed_calls(bot, threads, jobs):
+    """Jalankan `jobs` (fn(bot)) di `threads` thread baru; return (latency ms, wall detik)."""
+    latencies = []
+
+    def one(job):
+        t0 = time.perf_counter()
+        job(bot)
+        latencies.append(1000 * (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(one, jobs))
+    return sorted(latencies), time.perf_counter() - t0
+
+
+def _serve_stub(conn):
+    stub = TelegramStub().start()
+    conn.send(stub.api_url)
+    conn.recv()  # tunggu perintah berhenti
+
+
+def upload_peak_kb(bot, photo):
+    """
+    Puncak alokasi Python saat satu upload foto. Stub dijalankan di proses lain
+    supaya buffer body di sisi server tidak ikut terhitung.
+    """
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve_stub, args=(child,), daemon=True)
+    proc.start()
+    api_url = telebot.apihelper.API_URL
+    telebot.apihelper.API_URL = parent.recv()
+    try:
+        bot.send_photo(1, tgtransport.upload(photo), caption="bench")  # buka koneksi dulu
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            bot.send_photo(1, tgtransport.upload(photo), caption="bench")
+            return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    finally:
+        telebot.apihelper.API_URL = api_url
+        parent.send("stop")
+        proc.join()
+
+
+def run_transport(name, stub, args, photo):
+    bot = telebot.TeleBot("123:bench", threaded=False)
+    chats = range(1, args.chats + 1)
+    messages = [
+        (lambda b, c=chats[i % len(chats)]: b.send_message(c, "🚀 BUY BTC/USDT 1h"))
+        for i in range(args.messages)
+    ]
+    photos = [(lambda b, c=chats[i % len(chats)]: b.send_photo(c, tgtransport.upload(photo), caption="BTC/USDT 1h"))
+              for i in range(args.photos)]
+
+    stub.reset()
+    msg_lat, msg_wall = timed_calls(bot, args.threads, messages)
+    msg_conns = stub.connections
+    photo_lat, photo_wall = timed_calls(bot, args.threads, photos)
+    return {
+        "transport": name,
+        "msg_p50_ms": pick(msg_lat, 0.5),
+        "msg_p99_ms": pick(msg_lat, 0.99),
+        "msg_per_s": round(len(msg_lat) / msg_wall, 1),
+        "photo_p50_ms": pick(photo_lat, 0.5),
+        "photo_p99_ms": pick(photo_lat, 0.99),
+        "photo_per_s": round(len(photo_lat) / photo_wall, 1),
+        "tcp_connections": stub.connections,
+        "tcp_connections_msgs": msg_conns,
+        "upload_peak_kb": upload_peak_kb(bot, photo),
+    }
+
+
+def run(args):
+    stub = TelegramStub(latency=args.tg_latency).start()
+    telebot.apihelper.API_URL = stub.api_url
+    photo = os.urandom(args.photo_kb * 1024)  # ukuran PNG chart ~100-200 KB
+    try:
+        tgtransport.uninstall()
+        results = [run_transport("default", stub, args, photo)]
+        tgtransport.install(pool_size=args.pool or args.threads)
+        results.append(run_transport("tuned", stub, args, photo))
+    finally:
+        tgtransport.uninstall()
+        stub.stop()
+    return results
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark transport Telegram (bawaan vs tgtransport)")
+    p.add_argument("--threads", type=int, default=6, help="thread pengirim bersamaan")
+    p.add_argument("--pool", type=int, default=0, help="ukuran pool tgtransport (default = --threads)")
+    p.add_argument("--messages", type=int, default=600)
+    p.add_argument("--photos", type=int, default=60)
+    p.add_argument("--photo-kb", type=int, default=150)
+    p.add_argument("--chats", type=int, default=50)
+    p.add_argument("--tg-latency", type=float, default=0.01, help="latency server palsu (detik)")
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        keys = list(results[0])
+        width = max(map(len, keys))
+        for k in keys:
+            print(f"{k:>{width}}: " + "  ".join(f"{str(r[k]):>12}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
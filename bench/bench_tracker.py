@@ -0,0 +1,91 @@
+"""
+Benchmark pelacak performa sinyal (tracker.py): biaya update satu putaran untuk
+ribuan sinyal terbuka, dibanding update per sinyal dengan loop Python.
+
+Contoh:
+    python -m bench.bench_tracker
+    python -m bench.bench_tracker --signals 20000 --pairs 300 --json
+"""
+import argparse
+import json
+import random
+import time
+
+from bench.fake_exchange import make_pairs
+from candles import Candles, timeframe_ms
+from tracker import SignalTracker
+
+TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    combos = [(p, tf) for p in make_pairs(args.pairs) for tf in TIMEFRAMES]
+    start = 1_700_000_000_000
+    tr = SignalTracker(max_bars=10 ** 9)  # tidak ada yang ditutup selama benchmark
+    for i in range(args.signals):
+        symbol, tf = combos[i % len(combos)]
+        tr.open(symbol, tf, "BUY" if i % 2 else "SELL", 100.0, start, "macd")
+
+    # satu putaran = tiap combo dapat candle close baru, lalu satu update()
+    series = {}
+    for symbol, tf in combos:
+        c = series[(symbol, tf)] = Candles(4)
+        c.update([[start + timeframe_ms(tf), 100.0, 101.0, 99.0, 100.0, 1.0]])
+    observe_s = update_s = 0.0
+    for cycle in range(1, args.cycles + 1):
+        for (symbol, tf), c in series.items():
+            c.update([[start + (cycle + 1) * timeframe_ms(tf), 100.0, 101.0, 99.0, 100.0 + rng.uniform(-5, 5), 1.0]])
+        now = start + (cycle + 3) * timeframe_ms("1d")
+        t0 = time.perf_counter()
+        for (symbol, tf), c in series.items():
+            tr.observe(symbol, tf, c, now)
+        t1 = time.perf_counter()
+        tr.update()
+        t2 = time.perf_counter()
+        observe_s += t1 - t0
+        update_s += t2 - t1
+
+    # pembanding: update per sinyal dengan loop Python biasa
+    n = tr.n
+    keys = tr._key[:n].tolist()
+    sides, entries = tr._side[:n].tolist(), tr._entry[:n].tolist()
+    closes = tr._k_close.tolist()
+    t0 = time.perf_counter()
+    for _ in range(args.cycles):
+        [s * (closes[k] / e - 1.0) for k, s, e in zip(keys, sides, entries)]
+    loop_s = time.perf_counter() - t0
+
+    rows = tr.stats()
+    return {
+        "signals": n,
+        "combos": len(combos),
+        "cycles": args.cycles,
+        "observe_us_per_combo": round(1e6 * observe_s / (args.cycles * len(combos)), 2),
+        "update_ms": round(1000 * update_s / args.cycles, 3),
+        "update_ns_per_signal": round(1e9 * update_s / (args.cycles * n), 1),
+        "python_loop_ms": round(1000 * loop_s / args.cycles, 3),
+        "stats_rows": len(rows),
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark tracker performa sinyal")
+    p.add_argument("--signals", type=int, default=5000)
+    p.add_argument("--pairs", type=int, default=100)
+    p.add_argument("--cycles", type=int, default=200)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        width = max(map(len, result))
+        for k, v in result.items():
+            print(f"{k:>{width}}: {v}")
+
+
+if __name__ == "__main__":
+    main()
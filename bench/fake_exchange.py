@@ -0,0 +1,223 @@
+"""
+Exchange palsu yang kompatibel dengan ccxt untuk benchmark offline.
+
+Data OHLCV dibuat deterministik dari seed (atau dibaca dari file rekaman JSON),
+dengan latency dan error rate yang bisa diatur. Jam exchange dikontrol manual
+lewat `advance()` supaya tiap putaran scan bisa memunculkan candle baru.
+"""
+import json
+import math
+import random
+import threading
+import time
+import zlib
+
+import ccxt
+
+DEFAULT_START_MS = 1_700_000_000_000
+
+
+class FakeExchange:
+    id = "fake"
+    name = "FakeExchange"
+    rateLimit = 50
+
+    timeframes = {
+        tf: tf
+        for tf in ["1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d"]
+    }
+
+    def __init__(self, seed=42, latency=0.0, jitter=0.0, error_rate=0.0,
+                 recorded=None, start_ms=DEFAULT_START_MS, rate_limit_rate=0.0, retry_after=30,
+                 markets=None):
+        """
+        latency    : detik per request (sleep), meniru round trip ke exchange
+        jitter     : tambahan latency acak 0..jitter detik
+        error_rate : peluang 0..1 request gagal dengan ccxt.NetworkError
+        recorded   : path file JSON {"BTC/USDT": {"1h": [[ts,o,h,l,c,v], ...]}}
+        rate_limit_rate : peluang 0..1 request dijawab 429 (ccxt.RateLimitExceeded)
+                          dengan header Retry-After = `retry_after` detik
+        markets    : list symbol yang dikembalikan load_markets (untuk screener)
+        """
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.markets = markets or []
+        self.last_response_headers = {}
+        self.now_ms = start_ms
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._closed = {}  # (symbol key, tf_ms, idx) -> candle yang sudah close
+        self._recorded = {}
+        if recorded:
+            with open(recorded) as f:
+                self._recorded = json.load(f)
+
+    # ---------- kontrol jam ----------
+
+    def milliseconds(self):
+        return self.now_ms
+
+    def advance(self, seconds):
+        self.now_ms += int(seconds * 1000)
+
+    # ---------- API ala ccxt ----------
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    def load_markets(self, reload=False):
+        return {
+            symbol: {"symbol": symbol, "base": symbol.split("/")[0], "quote": symbol.split("/")[1],
+                     "spot": True, "active": True}
+            for symbol in self.markets
+        }
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self._request()
+        limit = limit or 500
+        if symbol in self._recorded:
+            rows = self._recorded[symbol].get(timeframe)
+            if rows is None:
+                raise ccxt.BadSymbol(f"{self.id} tidak punya data {symbol} {timeframe}")
+            return self._slice_recorded(rows, since, limit)
+        return self._synthetic(symbol, timeframe, since, limit)
+
+    def fetch_ticker(self, symbol, params=None):
+        candle = self.fetch_ohlcv(symbol, "1m", limit=1)[-1]
+        return {
+            "symbol": symbol,
+            "timestamp": self.now_ms,
+            "last": candle[4],
+            "close": candle[4],
+        }
+
+    def fetch_tickers(self, symbols=None, params=None):
+        self._request()
+        symbols = symbols or self.markets
+        return {
+            symbol: {"symbol": symbol, "timestamp": self.now_ms,
+                     "quoteVolume": 1e6 * (1.0 + _noise(zlib.crc32(f"{self.seed}:{symbol}".encode()), 0))}
+            for symbol in symbols
+        }
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        self._request()
+        limit = limit or 100
+        key = zlib.crc32(f"{self.seed}:{symbol}".encode())
+        g = self.now_ms // GRID_MS
+        mid = _price(key, g)
+        tick = mid * 0.0002
+        # kemiringan book ikut arah harga 1 menit terakhir (imbalance tidak selalu 0)
+        tilt = 1.0 + 20 * (mid - _price(key, g - 1)) / mid
+        bids = [[mid - tick * (i + 1), 5.0 * tilt * (1.2 + _noise(key, g * 1000 + i))] for i in range(limit)]
+        asks = [[mid + tick * (i + 1), 5.0 / tilt * (1.2 + _noise(key, -g * 1000 - i))] for i in range(limit)]
+        return {"symbol": symbol, "timestamp": self.now_ms, "bids": bids, "asks": asks}
+
+    def fetch_trades(self, symbol, since=None, limit=None, params=None):
+        self._request()
+        limit = limit or 500
+        key = zlib.crc32(f"{self.seed}:{symbol}".encode())
+        step = 1000  # satu trade per detik
+        trades = []
+        for i in range(limit, 0, -1):
+            t = self.now_ms - i * step
+            price = _price(key, t // GRID_MS)
+            up = _price(key, t // GRID_MS) >= _price(key, t // GRID_MS - 1)
+            amount = 0.5 * (1.5 + _noise(key, t // step))
+            side = "buy" if (_noise(key, -t // step) > -0.3) == up else "sell"
+            trades.append({"timestamp": t, "symbol": symbol, "side": side,
+                           "price": price, "amount": amount, "cost": price * amount})
+        return trades
+
+    # ---------- internal ----------
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+            failed = self._rng.random() < self.error_rate
+            limited = not failed and self.rate_limit_rate and self._rng.random() < self.rate_limit_rate
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            if failed or limited:
+                self.errors += 1
+            self.last_response_headers = {"Retry-After": str(self.retry_after)} if limited else {}
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise ccxt.NetworkError(f"{self.id} simulated network error")
+        if limited:
+            raise ccxt.RateLimitExceeded(f"{self.id} 429 Too Many Requests")
+
+    def _slice_recorded(self, rows, since, limit):
+        rows = [r for r in rows if r[0] <= self.now_ms] or rows
+        if since is not None:
+            rows = [r for r in rows if r[0] >= since]
+            return [list(r) for r in rows[:limit]]
+        return [list(r) for r in rows[-limit:]]
+
+    def _synthetic(self, symbol, timeframe, since, limit):
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        current = self.now_ms // tf_ms
+        if since is not None:
+            first = -(-since // tf_ms)
+            last = min(first + limit - 1, current)
+        else:
+            last = current
+            first = last - limit + 1
+
+        key = zlib.crc32(f"{self.seed}:{symbol}".encode())
+        rows = []
+        for idx in range(first, last + 1):
+            if idx < current:
+                # candle yang sudah close tidak berubah -> cache
+                cache_key = (key, tf_ms, idx)
+                row = self._closed.get(cache_key)
+                if row is None:
+                    row = self._closed[cache_key] = _synthetic_candle(key, idx * tf_ms, (idx + 1) * tf_ms)
+                rows.append(list(row))
+            else:
+                # candle yang sedang berjalan hanya "terlihat" sampai jam exchange
+                rows.append(_synthetic_candle(key, idx * tf_ms, self.now_ms + 1))
+        return rows
+
+
+# Harga sintetis = satu path per symbol di grid 1 menit, jadi candle semua TF
+# konsisten satu sama lain (1h == agregasi 12 candle 5m), seperti exchange asli.
+GRID_MS = 60_000
+_WAVES = ((3.0, 0.002), (25.0, 0.004), (120.0, 0.01), (700.0, 0.03), (4000.0, 0.06))
+
+
+def _noise(key, idx):
+    # pseudo-random deterministik -1..1 dari (key, idx)
+    return (zlib.crc32(f"{key}:{idx}".encode()) / 0xFFFFFFFF) * 2.0 - 1.0
+
+
+def _price(key, g):
+    phase = (key % 1000) / 159.0
+    base = 10.0 + key % 50_000
+    wave = sum(amp * math.sin(g / period + phase * (k + 1)) for k, (period, amp) in enumerate(_WAVES))
+    return base * (1.0 + wave + 0.001 * _noise(key, g))
+
+
+def _synthetic_candle(key, start_ms, end_ms):
+    """Candle [start_ms, end_ms) dari titik grid 1 menit."""
+    g0 = start_ms // GRID_MS
+    g1 = max(g0 + 1, -(-end_ms // GRID_MS))
+    prices = [_price(key, g) for g in range(g0, g1)]
+    volume = sum(10.0 * (1.5 + _noise(key, -g)) for g in range(g0, g1))
+    return [start_ms, prices[0], max(prices), min(prices), prices[-1], volume]
+
+
+def make_pairs(n):
+    """N pair: pair yang dipantau dulu, sisanya simbol sintetis."""
+    from scanner import CRYPTO_PAIRS
+
+    pairs = list(CRYPTO_PAIRS[:n])
+    pairs += [f"SYN{i}/USDT" for i in range(len(pairs), n)]
+    return pairs
@@ -0,0 +1,139 @@
+"""
+Server Bot API Telegram palsu (lokal) untuk load test tanpa network.
+
+Menjawab method yang dipakai bot (sendMessage, sendPhoto, editMessageMedia,
+answerCallbackQuery, getMe, setWebhook, deleteWebhook, getUpdates) dengan
+response berbentuk sama seperti Telegram, dengan latency yang bisa diatur dan
+(opsional) limit 1 pesan/detik per chat seperti aslinya (dijawab 429).
+
+    stub = TelegramStub(latency=0.05, enforce_limits=True).start()
+    telebot.apihelper.API_URL = stub.api_url
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEND_METHODS = {"sendMessage", "sendPhoto", "editMessageMedia", "editMessageText"}
+LIMIT_TOLERANCE = 0.05  # jitter jaringan/scheduler lokal, Telegram asli juga tidak sepresisi ini
+
+
+class TelegramStub:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, enforce_limits=False):
+        self.latency = latency
+        self.enforce_limits = enforce_limits
+        self.calls = {}          # method -> jumlah
+        self.rejected = 0        # response 429
+        self.bytes_in = 0
+        self.connections = 0     # koneksi TCP baru (cek keep-alive)
+        self._message_id = 0
+        self._last_send = {}     # chat_id -> waktu kirim terakhir
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def api_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/bot{{0}}/{{1}}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="telegram-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.rejected = self.bytes_in = self.connections = 0
+            self._last_send.clear()
+
+    # ---------- logika API ----------
+
+    def handle(self, method, params, body_len):
+        """Return (status, payload) untuk satu request Bot API."""
+        now = time.monotonic()
+        chat_id = params.get("chat_id")
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            self.bytes_in += body_len
+            if self.enforce_limits and method in SEND_METHODS and chat_id is not None:
+                last = self._last_send.get(chat_id)
+                if last is not None and now - last < 1.0 - LIMIT_TOLERANCE:
+                    self.rejected += 1
+                    return 429, {
+                        "ok": False, "error_code": 429,
+                        "description": "Too Many Requests: retry after 1",
+                        "parameters": {"retry_after": 1},
+                    }
+                self._last_send[chat_id] = now
+            self._message_id += 1
+            message_id = self._message_id
+
+        if self.latency:
+            time.sleep(self.latency)
+        return 200, {"ok": True, "result": self._result(method, params, message_id)}
+
+    @staticmethod
+    def _result(method, params, message_id):
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "stub", "username": "stub_bot"}
+        if method in ("setWebhook", "deleteWebhook", "answerCallbackQuery"):
+            return True
+        if method == "getUpdates":
+            return []
+        chat_id = params.get("chat_id", "0")
+        message = {
+            "message_id": int(params.get("message_id", message_id)),
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id) if chat_id.lstrip("-").isdigit() else 0, "type": "private"},
+        }
+        if method in ("sendPhoto", "editMessageMedia"):
+            message["photo"] = [{
+                "file_id": f"stub-photo-{message_id}", "file_unique_id": f"u{message_id}",
+                "width": 1000, "height": 600,
+            }]
+        else:
+            message["text"] = params.get("text", "")
+        return message
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            wbufsize = 1 << 16  # header + body dalam satu write (hindari delay Nagle/delayed ACK)
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def _serve(self):
+                url = urlparse(self.path)
+                method = url.path.rsplit("/", 1)[-1]
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if body and self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+                    params.update({k: v[-1] for k, v in parse_qs(body.decode()).items()})
+                status, payload = stub.handle(method, params, len(body))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _serve
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,128 @@
+"""
+Container candle hemat memori berbasis array typed (contiguous, tanpa float boxed).
+
+Satu `Candles` menyimpan satu series (symbol, timeframe) dan di-update in-place
+tiap scan: candle yang sama di-overwrite, candle baru di-append, candle paling
+lama dibuang kalau melebihi `capacity`. 200 candle ≈ 9.6 KB data.
+
+Layout per candle:
+    time                          'q' (int64, ms)   8 byte
+    open/high/low/close/volume    'd' (float64)   5x8 byte
+
+Semua kolom harga float64: float32 hanya ~7 digit, high/low pair mahal (BTC
+~1e5) bisa terbulatkan melewati level alert atau batas resample.
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+DEFAULT_CAPACITY = 200
+
+_TF_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000, "M": 2_592_000_000}
+
+
+def timeframe_ms(tf):
+    """Durasi satu candle dalam ms, contoh: "15m" -> 900000 (format timeframe ccxt)."""
+    return int(tf[:-1]) * _TF_UNIT_MS[tf[-1]]
+
+
+class Candles:
+    __slots__ = ("time", "open", "high", "low", "close", "volume", "capacity")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.time = array("q")
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.volume = array("d")
+
+    @classmethod
+    def from_ccxt(cls, rows, capacity=None):
+        """Parse langsung dari response ccxt: [[ts, o, h, l, c, v], ...]."""
+        c = cls(capacity or max(len(rows), 1))
+        c.update(rows)
+        return c
+
+    def __len__(self):
+        return len(self.time)
+
+    def _columns(self):
+        return (self.time, self.open, self.high, self.low, self.close, self.volume)
+
+    def update(self, rows, step_ms=None):
+        """
+        Merge rows ccxt (urut waktu) ke series yang ada, in-place tanpa alokasi ulang
+        array: candle dengan waktu yang sama di-overwrite, candle baru di-append.
+        `step_ms` = durasi candle; kalau diisi, rows yang bersambung tepat setelah
+        candle terakhir tidak dianggap gap. Return jumlah candle yang baru.
+        """
+        cols = self._columns()
+        if rows and self.time:
+            first = int(rows[0][0])
+            if first > self.time[-1] + (step_ms or 0):
+                # response tidak overlap / bersambung dengan series lama (ada gap) -> mulai ulang
+                self.clear()
+
+        times = self.time
+        j = bisect_left(times, int(rows[0][0])) if rows and times else len(times)
+        added = 0
+        for row in rows:
+            ts = int(row[0])
+            n = len(times)
+            while j < n and times[j] < ts:
+                j += 1
+            if j < n:
+                # candle yang sudah ada -> overwrite (nilai exchange terbaru);
+                # waktu yang tidak ada di tengah series diabaikan
+                if times[j] == ts:
+                    for col, value in zip(cols[1:], row[1:6]):
+                        col[j] = value or 0.0
+                    j += 1
+                continue
+            times.append(ts)
+            for col, value in zip(cols[1:], row[1:6]):
+                col.append(value or 0.0)
+            j += 1
+            added += 1
+
+        excess = len(times) - self.capacity
+        if excess > 0:
+            for col in cols:
+                del col[:excess]
+        return added
+
+    def clear(self):
+        for col in self._columns():
+            del col[:]
+
+    def last_time(self):
+        return self.time[-1] if self.time else None
+
+    def closed_count(self, tf_ms, now_ms):
+        """Jumlah candle yang sudah close (candle terakhir bisa jadi masih berjalan)."""
+        n = len(self.time)
+        if n and self.time[-1] + tf_ms > now_ms:
+            return n - 1
+        return n
+
+    def rows(self, limit=None):
+        """Series sebagai rows format ccxt [[ts, o, h, l, c, v], ...] (ekor `limit` bar)."""
+        n = len(self.time)
+        start = max(0, n - limit) if limit else 0
+        return [
+            [self.time[i], self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i]]
+            for i in range(start, n)
+        ]
+
+    def datetime_at(self, i):
+        return datetime.fromtimestamp(self.time[i] / 1000, tz=timezone.utc)
+
+    def datetimes(self):
+        return [datetime.fromtimestamp(ts / 1000, tz=timezone.utc) for ts in self.time]
+
+    def nbytes(self):
+        """Perkiraan memori (objek + buffer array) dalam byte."""
+        return sys.getsizeof(self) + sum(sys.getsizeof(col) for col in self._columns())
@@ -0,0 +1,177 @@
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+import history
+import indicators
+import metrics
+import status
+from candles import Candles
+from fetch_cache import expires_at
+from resample import MAX_FETCH_LIMIT
+from scanner import CRYPTO_TIMEFRAMES, OHLCV_CACHE, chart_rows, get_ohlcv_ccxt
+
+log = logging.getLogger("cryptobot.charts")
+
+# matplotlib di-import lazy: baru dimuat saat chart pertama diminta, bukan saat
+# worker web start. Render pakai Figure + canvas Agg langsung (bukan pyplot)
+# supaya aman dipanggil dari thread handler dan thread prefetch bersamaan.
+_Figure = None
+
+# Timeframe di tombol navigasi chart (inline keyboard)
+CHART_TIMEFRAMES = list(CRYPTO_TIMEFRAMES)
+
+# Jumlah candle default per chart; lebih dari MAX_FETCH_LIMIT diambil lewat history.py
+CHART_BARS = 200
+
+# Chart yang sudah di-render: (symbol, tf, bars) -> _Chart (urut LRU)
+MAX_CHARTS = 64
+_charts = OrderedDict()
+_inflight = {}  # (symbol, tf, bars) -> threading.Event
+_lock = threading.Lock()
+status.register("caches", "chart", lambda: len(_charts))
+
+# Prefetch TF tetangga jalan di thread pool kecil (dibuat saat pertama dipakai)
+PREFETCH_WORKERS = 2
+_prefetch_pool = None
+
+
+def get_figure_class():
+    global _Figure
+    if _Figure is None:
+        from matplotlib.figure import Figure
+        _Figure = Figure
+    return _Figure
+
+
+class _Chart:
+    __slots__ = ("png", "file_id", "expires")
+
+    def __init__(self, png, expires):
+        self.png = png
+        self.file_id = None  # file_id Telegram setelah upload pertama
+        self.expires = expires
+
+
+# =========================
+#  CHART GENERATOR
+# =========================
+
+def render_chart(symbol: str, timeframe: str, limit: int = CHART_BARS):
+    """Render chart harga + MACD jadi PNG (bytes). None kalau data kurang."""
+    # pair yang dipantau: series scanner di memori, tanpa request ke exchange
+    ohlc = chart_rows(symbol, timeframe, limit)
+    if ohlc is not None:
+        metrics.inc("cryptobot_cache_hits_total", cache="series")
+    elif limit > MAX_FETCH_LIMIT:
+        ohlc = history.load_recent(symbol, timeframe, limit)
+    else:
+        ohlc = get_ohlcv_ccxt(symbol, timeframe, limit=limit)
+    if not ohlc or len(ohlc) < 50:
+        log.info("chart tanpa data", extra={
+            "symbol": symbol, "tf": timeframe, "stage": "render", "rows": len(ohlc or ()),
+        })
+        return None
+
+    candles = Candles.from_ccxt(ohlc)
+    lines = indicators.macd(candles.close)
+    if lines is None:
+        return None
+    macd_line, signal_line, hist = lines
+    times = candles.datetimes()
+
+    Figure = get_figure_class()
+    with metrics.timer("render"):
+        fig = Figure(figsize=(10, 6))
+
+        ax1 = fig.add_subplot(2, 1, 1)
+        ax1.plot(times, candles.close)
+        ax1.set_title(f"{symbol} - {timeframe} Price")
+        ax1.set_ylabel("Price")
+
+        ax2 = fig.add_subplot(2, 1, 2)
+        ax2.plot(times, macd_line, label="MACD")
+        ax2.plot(times, signal_line, label="Signal")
+        ax2.bar(times, hist, width=0.01, label="Hist")
+        ax2.set_title("MACD 12,26,9")
+        ax2.legend(loc="best")
+
+        fig.tight_layout()
+
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")  # Figure tanpa pyplot otomatis pakai canvas Agg
+    return buf.getvalue()
+
+
+def get_chart(symbol: str, timeframe: str, bars: int = CHART_BARS):
+    """
+    Chart (symbol, tf) dari cache, atau render sekarang. Berlaku sampai close
+    candle berikutnya / TTL cache OHLCV. Request bersamaan untuk chart yang sama
+    (misal klik tombol saat prefetch masih jalan) menunggu satu render.
+    Return _Chart atau None.
+    """
+    key = (symbol, timeframe, bars)
+    while True:
+        with _lock:
+            chart = _charts.get(key)
+            if chart is not None and chart.expires > OHLCV_CACHE.clock():
+                _charts.move_to_end(key)
+                metrics.inc("cryptobot_cache_hits_total", cache="chart")
+                return chart
+            flight = _inflight.get(key)
+            if flight is None:
+                flight = _inflight[key] = threading.Event()
+                break
+        flight.wait()
+
+    metrics.inc("cryptobot_cache_misses_total", cache="chart")
+    try:
+        png = render_chart(symbol, timeframe, bars)
+        if png is None:
+            return None
+        chart = _Chart(png, expires_at(timeframe, OHLCV_CACHE.clock()))
+        with _lock:
+            _charts[key] = chart
+            _charts.move_to_end(key)
+            while len(_charts) > MAX_CHARTS:
+                _charts.popitem(last=False)
+        return chart
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        flight.set()
+
+
+def neighbor_timeframes(timeframe):
+    """TF sebelum & sesudah `timeframe` di tombol navigasi."""
+    if timeframe not in CHART_TIMEFRAMES:
+        return []
+    i = CHART_TIMEFRAMES.index(timeframe)
+    return [CHART_TIMEFRAMES[j] for j in (i - 1, i + 1) if 0 <= j < len(CHART_TIMEFRAMES)]
+
+
+def _prefetch_one(symbol, timeframe, bars):
+    try:
+        get_chart(symbol, timeframe, bars)
+    except Exception as e:
+        metrics.count_error("prefetch", e, symbol=symbol, tf=timeframe)
+
+
+def prefetch_neighbors(symbol, timeframe, bars=CHART_BARS):
+    """Render TF tetangga di background supaya pindah TF lewat tombol terasa instan."""
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+        with _lock:
+            if _prefetch_pool is None:
+                _prefetch_pool = ThreadPoolExecutor(PREFETCH_WORKERS, thread_name_prefix="chart-prefetch")
+    now = OHLCV_CACHE.clock()
+    for tf in neighbor_timeframes(timeframe):
+        with _lock:
+            key = (symbol, tf, bars)
+            chart = _charts.get(key)
+            if (chart is not None and chart.expires > now) or key in _inflight:
+                continue
+        _prefetch_pool.submit(_prefetch_one, symbol, tf, bars)
+
@@ -0,0 +1,120 @@
+"""
+Circuit breaker per venue + backoff eksponensial dengan jitter.
+
+State:
+    closed    -> request jalan normal; error network dihitung
+    open      -> semua request langsung ditolak sampai `open_until`
+    half_open -> satu request percobaan; sukses = closed, gagal = open lagi
+                 dengan delay backoff berikutnya. Pemanggil `allow()` wajib
+                 mencatat hasilnya (record_success / record_failure); probe
+                 yang tidak pernah dilaporkan dilepas setelah `probe_timeout`.
+
+429 (rate limit) dan 418 (IP ban Binance) langsung membuka circuit (tanpa
+menunggu threshold), memakai header Retry-After kalau ada.
+"""
+import random
+import threading
+import time
+
+import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt, base, cap, rng=random):
+    """Backoff eksponensial 'equal jitter': antara d/2 dan d, d = min(cap, base * 2^attempt)."""
+    d = min(cap, base * (2 ** attempt))
+    return d / 2 + rng.uniform(0, d / 2)
+
+
+class CircuitBreaker:
+    def __init__(self, venue, failure_threshold=5, base_delay=5.0, max_delay=600.0,
+                 ban_min_delay=120.0, probe_timeout=60.0, clock=time.monotonic, rng=None):
+        self.venue = venue
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.ban_min_delay = ban_min_delay
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self.state = CLOSED
+        self.failures = 0      # error berturut-turut saat closed
+        self.trips = 0         # berapa kali circuit terbuka berturut-turut (untuk backoff)
+        self.trips_total = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    # ---------- cek sebelum request ----------
+
+    def allow(self):
+        """True kalau request boleh jalan sekarang (half-open: hanya satu probe)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if self.clock() < self.open_until:
+                    metrics.inc("cryptobot_circuit_rejected_total", venue=self.venue)
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            now = self.clock()
+            if self._probing and now - self._probe_started < self.probe_timeout:
+                metrics.inc("cryptobot_circuit_rejected_total", venue=self.venue)
+                return False
+            # probe pertama, atau probe sebelumnya hilang tanpa hasil
+            self._probing = True
+            self._probe_started = now
+            return True
+
+    def is_open(self):
+        with self._lock:
+            return self.state == OPEN and self.clock() < self.open_until
+
+    def remaining(self):
+        """Detik sampai circuit boleh dicoba lagi (0 kalau tidak open)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_until - self.clock())
+
+    # ---------- hasil request ----------
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                metrics.set_gauge("cryptobot_circuit_open", 0, venue=self.venue)
+            self.state = CLOSED
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+
+    def record_failure(self, kind="network", retry_after=None):
+        """
+        kind: "network" (timeout/5xx), "rate_limit" (429), "ban" (418).
+        retry_after: detik dari header Retry-After (kalau ada).
+        """
+        with self._lock:
+            self.failures += 1
+            immediate = kind in ("rate_limit", "ban")
+            if self.state == CLOSED and not immediate and self.failures < self.failure_threshold:
+                return
+
+            delay = backoff_delay(self.trips, self.base_delay, self.max_delay, self.rng)
+            if kind == "ban":
+                delay = max(delay, self.ban_min_delay)
+            if retry_after:
+                delay = max(delay, float(retry_after))
+
+            self.trips += 1
+            self.trips_total += 1
+            self.state = OPEN
+            self._probing = False
+            self.open_until = self.clock() + delay
+        metrics.inc("cryptobot_circuit_trips_total", venue=self.venue, reason=kind)
+        metrics.set_gauge("cryptobot_circuit_open", 1, venue=self.venue)
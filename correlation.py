@@ -0,0 +1,280 @@
+"""
+Matriks korelasi bergulir return antar pair yang dipantau, per timeframe.
+
+Banyak sinyal sebenarnya satu pergerakan pasar yang sama (BTC menyeret ETH/SOL/BNB).
+Korelasi dipakai untuk menandai (atau menahan) sinyal pair yang searah dengan
+sinyal leader (CORR_LEADERS) dan berkorelasi tinggi dengannya.
+
+Update incremental: setiap candle close menambah satu baris return dan membuang
+baris paling lama dari window, dengan menjumlah/mengurangi outer product ke
+jumlahan pairwise (N, Σx, Σx², Σxy). Biaya per candle O(n²) untuk n pair, bukan
+O(n² · window) seperti hitung ulang dari nol. Pair yang datanya bolong / baru
+ditambahkan tetap benar karena semua jumlahan dihitung per pasangan (pairwise
+complete). Supaya error floating point tidak menumpuk, jumlahan dibangun ulang
+dari window tiap `window` baris (amortized tetap O(n²)).
+
+numpy di-import lazy (dipakai saat candle close pertama).
+"""
+import os
+import threading
+from collections import deque
+
+import metrics
+from candles import timeframe_ms
+
+CORR_WINDOW = int(os.getenv("CORR_WINDOW", "100"))   # jumlah return per timeframe
+CORR_MIN_OBS = 20                                    # observasi bersama minimal
+CORR_THRESHOLD = float(os.getenv("CORR_THRESHOLD", "0.8"))
+CORR_LEADERS = [p.strip() for p in os.getenv("CORR_LEADERS", "BTC/USDT").split(",") if p.strip()]
+# tag     -> sinyal redundan tetap dikirim dengan keterangan korelasi
+# suppress-> sinyal redundan tidak dikirim
+# off     -> tanpa cek korelasi
+CORR_MODE = os.getenv("CORR_MODE", "tag")
+# Cross leader dianggap "pergerakan yang sama" kalau terjadi dalam sekian candle
+LEADER_BARS = 3
+
+
+class RollingCorrelation:
+    """Korelasi Pearson bergulir pairwise untuk satu timeframe."""
+
+    def __init__(self, window=CORR_WINDOW):
+        import numpy as np
+
+        self._np = np
+        self.window = window
+        self.symbols = []
+        self.index = {}
+        self._rows = deque()  # (x, m) yang masih di window; panjang = jumlah symbol saat itu
+        self._pushed = 0
+        self._alloc(0)
+
+    def _alloc(self, n):
+        zeros = self._np.zeros
+        self._n = zeros((n, n))     # jumlah observasi bersama
+        self._sx = zeros((n, n))    # Σ x_i  (baris i, atas observasi bersama dengan j)
+        self._sxx = zeros((n, n))   # Σ x_i²
+        self._sxy = zeros((n, n))   # Σ x_i x_j
+
+    def _grow(self, symbols):
+        new = [s for s in symbols if s not in self.index]
+        if not new:
+            return
+        np = self._np
+        old = len(self.symbols)
+        for s in new:
+            self.index[s] = len(self.symbols)
+            self.symbols.append(s)
+        n = len(self.symbols)
+        for name in ("_n", "_sx", "_sxx", "_sxy"):
+            grown = np.zeros((n, n))
+            grown[:old, :old] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def _vector(self, x, m):
+        n = len(self.symbols)
+        if len(x) < n:  # baris lama sebelum ada symbol baru: kolom baru = tidak ada data
+            pad = self._np.zeros(n - len(x))
+            x, m = self._np.concatenate((x, pad)), self._np.concatenate((m, pad))
+        return x, m
+
+    def _add(self, x, m, sign):
+        outer = self._np.outer
+        self._n += sign * outer(m, m)
+        self._sx += sign * outer(x, m)
+        self._sxx += sign * outer(x * x, m)
+        self._sxy += sign * outer(x, x)
+
+    def push(self, returns):
+        """Tambah satu baris: dict symbol -> return candle yang sama."""
+        np = self._np
+        self._grow(returns)
+        n = len(self.symbols)
+        x, m = np.zeros(n), np.zeros(n)
+        for symbol, r in returns.items():
+            i = self.index[symbol]
+            x[i], m[i] = r, 1.0
+        self._add(x, m, 1.0)
+        self._rows.append((x, m))
+        if len(self._rows) > self.window:
+            self._add(*self._vector(*self._rows.popleft()), -1.0)
+        self._pushed += 1
+        if self._pushed % self.window == 0:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._alloc(len(self.symbols))
+        for x, m in self._rows:
+            self._add(*self._vector(x, m), 1.0)
+
+    def matrix(self):
+        """(symbols, matriks korelasi); NaN kalau observasi bersama < CORR_MIN_OBS."""
+        np = self._np
+        n, sx, sxx, sxy = self._n, self._sx, self._sxx, self._sxy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * sxy - sx * sx.T
+            var = (n * sxx - sx * sx) * (n * sxx.T - sx.T * sx.T)
+            corr = cov / np.sqrt(var)
+        corr[(n < CORR_MIN_OBS) | ~(var > 0)] = np.nan
+        np.fill_diagonal(corr, 1.0)
+        return list(self.symbols), corr
+
+    def corr(self, a, b):
+        """Korelasi satu pasangan, O(1). None kalau belum cukup data."""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return None
+        n = self._n[i, j]
+        if n < CORR_MIN_OBS:
+            return None
+        sx, sy = self._sx[i, j], self._sx[j, i]
+        var = (n * self._sxx[i, j] - sx * sx) * (n * self._sxx[j, i] - sy * sy)
+        if var <= 0:
+            return None
+        return float((n * self._sxy[i, j] - sx * sy) / var ** 0.5)
+
+
+class CorrelationBook:
+    """
+    Kumpulan RollingCorrelation per timeframe, diisi dari candle scanner.
+
+    `observe` mencatat return candle close baru per (symbol, tf); `commit` (akhir
+    putaran scan) memasukkan baris per waktu candle, urut waktu. Return yang datang
+    setelah waktunya di-commit (misal symbol dilewati karena circuit open) dibuang.
+    """
+
+    def __init__(self, window=CORR_WINDOW):
+        self.window = window
+        self._frames = {}     # tf -> RollingCorrelation
+        self._pending = {}    # tf -> {open time: {symbol: return}}
+        self._seen = {}       # (symbol, tf) -> open time candle close terakhir yang dicatat
+        self._committed = {}  # tf -> open time terakhir yang sudah masuk matriks
+        self._leaders = {}    # (leader, tf) -> (side, cross_time)
+        self._lock = threading.Lock()
+
+    def observe(self, symbol, tf, candles, now_ms):
+        tf_ms = timeframe_ms(tf)
+        times, closes = candles.time, candles.close
+        last = len(times) - 1
+        while last >= 0 and times[last] + tf_ms > now_ms:
+            last -= 1  # candle yang masih berjalan
+        if last < 1:
+            return
+        with self._lock:
+            seen = self._seen.get((symbol, tf))
+            floor = max(seen if seen is not None else -1, self._committed.get(tf, -1))
+            first = max(1, last - self.window + 1)
+            pending = self._pending.setdefault(tf, {})
+            for i in range(first, last + 1):
+                t = times[i]
+                if t <= floor or not closes[i - 1]:
+                    continue
+                pending.setdefault(t, {})[symbol] = closes[i] / closes[i - 1] - 1.0
+            self._seen[(symbol, tf)] = times[last]
+
+    def commit(self):
+        with self._lock:
+            for tf, pending in self._pending.items():
+                if not pending:
+                    continue
+                frame = self._frames.get(tf)
+                if frame is None:
+                    frame = self._frames[tf] = RollingCorrelation(self.window)
+                for t in sorted(pending)[-self.window:]:
+                    frame.push(pending[t])
+                self._committed[tf] = max(pending)
+                pending.clear()
+                metrics.set_gauge("cryptobot_corr_symbols", len(frame.symbols), tf=tf)
+
+    def matrix(self, tf):
+        with self._lock:
+            frame = self._frames.get(tf)
+            return frame.matrix() if frame is not None else ([], None)
+
+    def corr(self, tf, a, b):
+        with self._lock:
+            frame = self._frames.get(tf)
+            return frame.corr(a, b) if frame is not None else None
+
+    # ---------- sinyal redundan ----------
+
+    def note_leader(self, symbol, tf, side, cross_time):
+        if symbol in CORR_LEADERS:
+            with self._lock:
+                self._leaders[(symbol, tf)] = (side, cross_time)
+
+    def redundant_with(self, symbol, tf, side, cross_time):
+        """
+        (leader, korelasi) kalau sinyal ini searah dengan cross leader di TF yang
+        sama dalam LEADER_BARS candle dan korelasinya >= CORR_THRESHOLD, selain itu None.
+        """
+        if symbol in CORR_LEADERS or cross_time is None:
+            return None
+        window = LEADER_BARS * timeframe_ms(tf)
+        for leader in CORR_LEADERS:
+            with self._lock:
+                crossed = self._leaders.get((leader, tf))
+            if crossed is None or crossed[0] != side:
+                continue
+            if abs(_ms(cross_time) - _ms(crossed[1])) > window:
+                continue
+            rho = self.corr(tf, symbol, leader)
+            if rho is not None and rho >= CORR_THRESHOLD:
+                return leader, rho
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._pending.clear()
+            self._seen.clear()
+            self._committed.clear()
+            self._leaders.clear()
+
+
+def _ms(t):
+    return int(t.timestamp() * 1000) if hasattr(t, "timestamp") else int(t)
+
+
+def average_correlation(corr):
+    """Rata-rata korelasi antar pasangan berbeda (indikator regime: pasar bergerak bersama)."""
+    import numpy as np
+
+    if corr is None or len(corr) < 2:
+        return None
+    off = corr[~np.eye(len(corr), dtype=bool)]
+    off = off[~np.isnan(off)]
+    return float(off.mean()) if off.size else None
+
+
+def format_matrix(tf, symbols, corr, max_symbols=10, top=10):
+    """Pesan /corr: matriks (maks. `max_symbols` pair pertama) + pasangan paling berkorelasi."""
+    import numpy as np
+
+    if corr is None or not symbols:
+        return f"Data korelasi {tf} belum tersedia, tunggu beberapa candle close."
+    names = [s.split("/")[0][:5] for s in symbols]
+    shown = min(len(symbols), max_symbols)
+
+    lines = ["      " + " ".join(f"{n:>5}" for n in names[:shown])]
+    for i in range(shown):
+        cells = " ".join("  -  " if np.isnan(v) else f"{v:5.2f}" for v in corr[i, :shown])
+        lines.append(f"{names[i]:<5} {cells}")
+
+    pairs = [
+        (corr[i, j], symbols[i], symbols[j])
+        for i in range(len(symbols)) for j in range(i + 1, len(symbols))
+        if not np.isnan(corr[i, j])
+    ]
+    pairs.sort(reverse=True)
+    best = "\n".join(f"{a} ~ {b}: {v:.2f}" for v, a, b in pairs[:top]) or "-"
+
+    avg = average_correlation(corr)
+    regime = "n/a" if avg is None else (
+        f"{avg:.2f} ({'pasar bergerak bersama' if avg >= 0.6 else 'pergerakan per pair beragam'})"
+    )
+    return (
+        f"📈 *Korelasi return {tf}* ({len(symbols)} pair, window {CORR_WINDOW} candle)\n"
+        f"Rata-rata: {regime}\n"
+        f"```\n" + "\n".join(lines) + "\n```\n"
+        f"*Paling berkorelasi:*\n```\n{best}\n```"
+    )
@@ -0,0 +1,112 @@
+"""
+Digest sinyal: semua sinyal dalam satu putaran scan (atau satu window) digabung
+jadi satu tabel ringkas, bukan satu pesan Telegram per combo.
+
+Saat candle 4h/1d close banyak pair bisa cross bersamaan; tanpa digest itu jadi
+puluhan pesan per chat (limit Telegram: ~30 pesan/detik global, 1/detik per chat).
+Pair prioritas tetap dikirim sebagai pesan lengkap sendiri-sendiri.
+"""
+import os
+import threading
+
+import metrics
+import orderflow
+from candles import timeframe_ms
+
+# Pair yang sinyalnya tetap dikirim satu per satu (pesan lengkap)
+PRIORITY_PAIRS = [p.strip() for p in os.getenv("PRIORITY_PAIRS", "BTC/USDT").split(",") if p.strip()]
+
+# Lama window digest (detik). 0 = kirim digest di akhir tiap putaran scan.
+DIGEST_WINDOW = float(os.getenv("DIGEST_WINDOW", "0"))
+
+# Kalau isi digest kurang dari ini, kirim pesan lengkap biasa saja
+DIGEST_MIN_SIGNALS = 2
+
+# Batas panjang pesan Telegram 4096 karakter; sisakan ruang untuk header/footer
+MAX_MESSAGE_CHARS = 3800
+
+
+class Digest:
+    """Buffer sinyal non-prioritas sampai window selesai."""
+
+    def __init__(self, window=DIGEST_WINDOW, priority=PRIORITY_PAIRS, exchange_name=""):
+        self.window = window
+        self.priority = set(priority)
+        self.exchange_name = exchange_name
+        self._items = []          # (symbol, tf, side, msg, res)
+        self._opened_at = None    # detik (jam exchange) sinyal pertama di window
+        self._lock = threading.Lock()
+
+    def is_priority(self, symbol):
+        return symbol in self.priority
+
+    def add(self, symbol, tf, side, msg, res, now):
+        with self._lock:
+            if self._opened_at is None:
+                self._opened_at = now
+            self._items.append((symbol, tf, side, msg, res))
+
+    def flush(self, now, force=False):
+        """Return list pesan yang siap dikirim (kosong kalau window belum selesai)."""
+        with self._lock:
+            if not self._items:
+                return []
+            if not force and now - self._opened_at < self.window:
+                return []
+            items, self._items, self._opened_at = self._items, [], None
+
+        if len(items) < DIGEST_MIN_SIGNALS:
+            return [msg for _, _, _, msg, _ in items]
+        metrics.inc("cryptobot_digest_signals_total", len(items))
+        return render(items, self.exchange_name)
+
+    def clear(self):
+        with self._lock:
+            self._items, self._opened_at = [], None
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _row(symbol, tf, side, res):
+    when = res["time"].strftime("%m-%d %H:%M") if hasattr(res["time"], "strftime") else str(res["time"])
+    row = f"{symbol:<11} {tf:>3} {side:<4} {res['price']:>14.5f} {when}"
+    flow = res.get("flow")
+    if flow:
+        # konfirmasi order book / trade flow (orderflow.py): searah / berlawanan
+        mark = {True: "✓", False: "✗"}.get(orderflow.confirms(flow, side))
+        if mark:
+            row += f" {mark}"
+    if res.get("corr"):
+        row += f" ≈{res['corr'][0].split('/')[0]}"  # ikut sinyal leader (correlation.py)
+    return row
+
+
+def render(items, exchange_name=""):
+    """
+    Tabel Markdown (blok kode, monospace) urut TF terbesar dulu lalu pair.
+    Dipecah jadi beberapa pesan kalau melebihi batas panjang Telegram.
+    """
+    items = sorted(items, key=lambda it: (-timeframe_ms(it[1]), it[0]))
+    rows = [_row(symbol, tf, side, res) for symbol, tf, side, _, res in items]
+    header = f"{'Pair':<11} {'TF':>3} {'Side':<4} {'Price':>14} Candle"
+
+    chunks, current, size = [], [], 0
+    for row in rows:
+        if current and size + len(row) + 1 > MAX_MESSAGE_CHARS:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(row)
+        size += len(row) + 1
+    if current:
+        chunks.append(current)
+
+    title = f"🧾 *MACD Digest* {exchange_name}".rstrip()
+    messages = []
+    for n, chunk in enumerate(chunks, 1):
+        part = f" ({n}/{len(chunks)})" if len(chunks) > 1 else ""
+        messages.append(
+            f"{title}{part} – {len(chunk)} sinyal\n"
+            "```\n" + header + "\n" + "\n".join(chunk) + "\n```"
+        )
+    return messages
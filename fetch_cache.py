@@ -0,0 +1,142 @@
+"""
+Cache OHLCV bersama (scanner + chart) dengan TTL per timeframe dan single-flight.
+
+- Key: (symbol, timeframe). Request dengan limit <= jumlah bar yang di-cache
+  dilayani dari cache (ambil ekor).
+- TTL mengikuti durasi candle: `tf * TTL_FRACTION` (dibatasi TTL_MIN..TTL_MAX),
+  dan entry tidak pernah melewati batas close candle berikutnya, jadi scanner
+  yang fetch tepat setelah close selalu dapat data final.
+- Single-flight: caller bersamaan untuk key yang sama menunggu satu request
+  yang sedang berjalan, bukan fetch sendiri-sendiri.
+- Fetch kecil (misal 2 bar terakhir) di-merge ke entry yang lebih panjang.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from candles import timeframe_ms
+
+TTL_FRACTION = 0.1
+TTL_MIN = 5.0      # detik
+TTL_MAX = 300.0    # detik
+MAX_ENTRIES = int(os.getenv("OHLCV_CACHE_ENTRIES", "256"))
+MAX_ROWS = 1000
+# Maks. menunggu fetch orang lain (detik); lewat dari ini fetch sendiri, supaya
+# request yang macet tidak ikut menggantung semua caller (mis. scanner baru
+# hasil restart watchdog)
+FLIGHT_TIMEOUT = 30.0
+
+
+def ttl_for(timeframe):
+    return min(TTL_MAX, max(TTL_MIN, timeframe_ms(timeframe) / 1000 * TTL_FRACTION))
+
+
+def expires_at(timeframe, fetched_at):
+    """Waktu kedaluwarsa (epoch detik): TTL atau close candle berikutnya, mana yang duluan."""
+    tf_s = timeframe_ms(timeframe) / 1000
+    next_close = (fetched_at // tf_s + 1) * tf_s
+    return min(fetched_at + ttl_for(timeframe), next_close)
+
+
+class _Entry:
+    __slots__ = ("rows", "limit", "expires")
+
+    def __init__(self, rows, limit, expires):
+        self.rows = rows
+        self.limit = limit
+        self.expires = expires
+
+
+class OHLCVCache:
+    def __init__(self, max_entries=MAX_ENTRIES, clock=time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # (symbol, tf) -> _Entry (urut LRU)
+        self._inflight = {}            # (symbol, tf) -> threading.Event
+        self._lock = threading.Lock()
+
+    def _lookup(self, key, limit, now):
+        entry = self._entries.get(key)
+        if entry is None or entry.expires <= now or entry.limit < limit:
+            return None
+        self._entries.move_to_end(key)
+        return entry.rows[-limit:]
+
+    def get(self, symbol, timeframe, limit):
+        with self._lock:
+            return self._lookup((symbol, timeframe), limit, self.clock())
+
+    def get_or_fetch(self, symbol, timeframe, limit, fetch):
+        """
+        Return rows dari cache, atau panggil `fetch()` (sekali untuk semua caller
+        bersamaan). `fetch()` boleh return None (gagal) -> tidak di-cache.
+        """
+        key = (symbol, timeframe)
+        own = True
+        while True:
+            with self._lock:
+                rows = self._lookup(key, limit, self.clock())
+                if rows is not None:
+                    metrics.inc("cryptobot_cache_hits_total", cache="ohlcv")
+                    return rows
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = self._inflight[key] = threading.Event()
+                    break
+            # ada request lain untuk key yang sama -> tunggu, lalu cek cache lagi
+            metrics.inc("cryptobot_cache_coalesced_total", cache="ohlcv")
+            if not flight.wait(FLIGHT_TIMEOUT):
+                metrics.inc("cryptobot_cache_flight_timeouts_total", cache="ohlcv")
+                own = False
+                break
+
+        metrics.inc("cryptobot_cache_misses_total", cache="ohlcv")
+        try:
+            rows = fetch()
+            if rows:
+                self.put(symbol, timeframe, rows, limit)
+            return rows
+        finally:
+            if own:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                flight.set()
+
+    def put(self, symbol, timeframe, rows, limit=None):
+        """Simpan / merge rows hasil fetch ke cache."""
+        if not rows:
+            return
+        key = (symbol, timeframe)
+        now = self.clock()
+        limit = limit or len(rows)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry.rows
+                and entry.rows[0][0] <= rows[0][0] <= entry.rows[-1][0]
+                and len(rows) < len(entry.rows)
+            ):
+                # fetch kecil yang overlap -> ganti ekor entry lama (termasuk candle
+                # yang dulu masih berjalan), bar lama yang sudah close tetap dipakai
+                old = entry.rows
+                cut = len(old)
+                while cut > 0 and old[cut - 1][0] >= rows[0][0]:
+                    cut -= 1
+                entry.rows = (old[:cut] + list(rows))[-MAX_ROWS:]
+                entry.limit = min(max(entry.limit, limit), MAX_ROWS)
+                entry.expires = expires_at(timeframe, now)
+            else:
+                self._entries[key] = _Entry(list(rows[-MAX_ROWS:]), limit, expires_at(timeframe, now))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,141 @@
+"""
+Loader history OHLCV panjang (chart 1 tahun, seed backtest) dengan paging paralel.
+
+- Range dipecah jadi halaman `PAGE_BARS` candle yang sejajar grid tetap
+  (awal halaman = kelipatan PAGE_BARS * tf), jadi halaman bisa dipakai ulang
+  antar request dengan range berbeda.
+- Halaman di-fetch paralel (`HISTORY_WORKERS` thread) lewat jalur fetch scanner
+  (circuit breaker ikut berlaku), dengan jarak antar request minimal
+  `exchange.rateLimit` ms.
+- Halaman yang seluruh candle-nya sudah close disimpan ke disk
+  (HISTORY_DIR/<SYMBOL>/<tf>/<awal halaman>.json, ditulis atomik). Kalau proses
+  terputus, pemanggilan berikutnya hanya fetch halaman yang belum ada.
+- Hasil disambung dan di-dedup per timestamp.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from candles import timeframe_ms
+from resample import MAX_FETCH_LIMIT
+
+HISTORY_DIR = os.getenv("HISTORY_DIR", "data/ohlcv")
+HISTORY_WORKERS = int(os.getenv("HISTORY_WORKERS", "4"))
+PAGE_BARS = MAX_FETCH_LIMIT
+MAX_BARS = 5000  # batas satu request (chart / seed)
+
+_pace_lock = threading.Lock()
+_next_request = 0.0
+
+
+def page_starts(since_ms, until_ms, tf):
+    """Awal halaman (ms) yang mencakup [since_ms, until_ms)."""
+    span = PAGE_BARS * timeframe_ms(tf)
+    first = since_ms // span * span
+    return list(range(first, until_ms, span))
+
+
+def page_path(symbol, tf, start):
+    return os.path.join(HISTORY_DIR, symbol.replace("/", ""), tf, f"{start}.json")
+
+
+def _read_page(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # belum ada / rusak -> fetch ulang
+
+
+def _write_page(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(rows, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _pace(interval):
+    """Jaga jarak antar request history (semua thread) minimal `interval` detik."""
+    global _next_request
+    with _pace_lock:
+        now = time.monotonic()
+        at = max(now, _next_request)
+        _next_request = at + interval
+    if at > now:
+        time.sleep(at - now)
+
+
+def _load_page(symbol, tf, start, now_ms, fetch, interval):
+    """Rows satu halaman: dari disk kalau sudah lengkap, selain itu fetch. None = gagal."""
+    tf_ms = timeframe_ms(tf)
+    end = start + PAGE_BARS * tf_ms
+    complete = end <= now_ms - now_ms % tf_ms  # semua candle di halaman sudah close
+    path = page_path(symbol, tf, start)
+
+    if complete:
+        rows = _read_page(path)
+        if rows is not None:
+            metrics.inc("cryptobot_history_pages_total", result="disk")
+            return rows
+
+    _pace(interval)
+    rows = fetch(symbol, tf, start, PAGE_BARS)
+    if rows is None:
+        metrics.inc("cryptobot_history_pages_total", result="failed")
+        return None
+    # Binance mengembalikan candle setelah listing kalau `since` lebih awal;
+    # buang yang di luar halaman supaya tidak tercampur halaman lain
+    rows = [list(r) for r in rows if start <= r[0] < end]
+    if complete:
+        _write_page(path, rows)
+    metrics.inc("cryptobot_history_pages_total", result="fetched")
+    return rows
+
+
+def load_history(symbol, tf, since_ms, until_ms=None, workers=HISTORY_WORKERS):
+    """
+    Candle `symbol` `tf` dalam [since_ms, until_ms) (until default = sekarang).
+    Return (rows, missing): rows format ccxt urut waktu tanpa duplikat, missing =
+    jumlah halaman yang gagal (panggil lagi untuk melanjutkan).
+    """
+    from scanner import fetch_ohlcv_uncached, get_exchange
+
+    ex = get_exchange()
+    now_ms = ex.milliseconds()
+    until_ms = now_ms + 1 if until_ms is None else until_ms
+    interval = getattr(ex, "rateLimit", 0) / 1000
+
+    def fetch(sym, timeframe, since, limit):
+        return fetch_ohlcv_uncached(sym, timeframe, limit, since=since)
+
+    starts = page_starts(since_ms, until_ms, tf)
+    with metrics.timer("history"), ThreadPoolExecutor(max(1, min(workers, len(starts)))) as pool:
+        pages = list(pool.map(lambda s: _load_page(symbol, tf, s, now_ms, fetch, interval), starts))
+
+    merged = {}
+    for rows in pages:
+        for r in rows or ():
+            if since_ms <= r[0] < until_ms:
+                merged[r[0]] = r
+    return [merged[t] for t in sorted(merged)], sum(rows is None for rows in pages)
+
+
+def load_recent(symbol, tf, bars):
+    """
+    `bars` candle terakhir (maks. MAX_BARS), ekornya ikut masuk cache OHLCV.
+    Return rows format ccxt (bisa kurang kalau ada halaman gagal).
+    """
+    from scanner import OHLCV_CACHE, get_exchange
+
+    bars = min(bars, MAX_BARS)
+    tf_ms = timeframe_ms(tf)
+    now_ms = get_exchange().milliseconds()
+    since = (now_ms // tf_ms - bars + 1) * tf_ms
+    rows, _ = load_history(symbol, tf, since)
+    rows = rows[-bars:]
+    OHLCV_CACHE.put(symbol, tf, rows[-PAGE_BARS:])
+    return rows
@@ -0,0 +1,83 @@
+"""
+Indikator di atas array typed (lihat candles.py), tanpa DataFrame per scan.
+
+Hasilnya sama dengan `pandas_ta.macd` (mode non-talib): EMA di-seed dengan SMA
+dari `length` nilai pertama, lalu rekursif alpha = 2 / (length + 1).
+"""
+from array import array
+
+NAN = float("nan")
+
+
+def ema(values, length, start=0):
+    """EMA ala pandas_ta; index sebelum seed berisi NaN."""
+    n = len(values)
+    out = array("d", [NAN]) * n
+    if n - start < length:
+        return out
+
+    seed_at = start + length - 1
+    prev = sum(values[i] for i in range(start, seed_at + 1)) / length
+    out[seed_at] = prev
+
+    alpha = 2.0 / (length + 1)
+    keep = 1.0 - alpha
+    for i in range(seed_at + 1, n):
+        prev = alpha * values[i] + keep * prev
+        out[i] = prev
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD(fast, slow, signal) dari array close.
+    Return (macd, signal, hist) sebagai array('d') sepanjang close, atau None
+    kalau data belum cukup.
+    """
+    n = len(close)
+    if n < slow + signal - 1:
+        return None
+
+    fast_ema = ema(close, fast)
+    slow_ema = ema(close, slow)
+    macd_line = array("d", [NAN]) * n
+    for i in range(slow - 1, n):
+        macd_line[i] = fast_ema[i] - slow_ema[i]
+
+    signal_line = ema(macd_line, signal, start=slow - 1)
+    hist = array("d", [NAN]) * n
+    for i in range(slow + signal - 2, n):
+        hist[i] = macd_line[i] - signal_line[i]
+    return macd_line, signal_line, hist
+
+
+def macd_matrix(close, fast=12, slow=26, signal=9):
+    """
+    MACD banyak series sekaligus (screener). `close` = matriks (symbol x bar),
+    semua baris sama panjang. Rekursi EMA tetap per bar, tapi tiap langkah
+    dihitung untuk semua symbol sekaligus dengan numpy (di-import lazy).
+    Return (macd, signal, hist) matriks numpy, atau None kalau bar kurang.
+    """
+    import numpy as np
+
+    close = np.asarray(close, dtype="float64")
+    n = close.shape[1]
+    if n < slow + signal - 1:
+        return None
+
+    def ema_rows(values, length, start=0):
+        out = np.full(values.shape, np.nan)
+        seed_at = start + length - 1
+        prev = values[:, start:seed_at + 1].mean(axis=1)
+        out[:, seed_at] = prev
+        alpha = 2.0 / (length + 1)
+        keep = 1.0 - alpha
+        for i in range(seed_at + 1, n):
+            prev = alpha * values[:, i] + keep * prev
+            out[:, i] = prev
+        return out
+
+    macd_line = ema_rows(close, fast) - ema_rows(close, slow)
+    macd_line[:, :slow - 1] = np.nan
+    signal_line = ema_rows(macd_line, signal, start=slow - 1)
+    return macd_line, signal_line, macd_line - signal_line
@@ -0,0 +1,301 @@
+"""
+Jurnal sinyal yang terkirim: append-only, dipartisi per hari (UTC).
+
+Format: JOURNAL_DIR/<YYYY-MM-DD>.bin berisi baris biner ukuran tetap (45 byte)
+
+    ts (ms, int64) | symbol id (uint16) | tf id (uint16) | side (+1 BUY / -1 SELL)
+    | price | macd | signal | hist (float64)
+
+`ts` = waktu candle cross (atau waktu scan kalau mode live). Nama symbol/tf
+disimpan sekali di JOURNAL_DIR/names.txt (id = nomor baris). Baris tidak pernah
+diubah; baris terakhir yang terpotong (crash saat menulis) dibuang saat load.
+
+- `append()` dipanggil di thread scanner: hanya memasukkan tuple ke antrean
+  terbatas (tanpa I/O, tanpa menunggu; antrean penuh -> dibuang + metrik).
+  Satu thread writer mengumpulkan baris selama FLUSH_INTERVAL lalu menulis
+  per partisi dengan satu write. Baris terlihat di query setelah ditulis.
+- Index di memori: (symbol, tf) -> waktu terurut + lokasi baris (hari, nomor
+  baris). Dibangun sekali dari semua partisi saat pertama dipakai, lalu
+  diperbarui writer. Query = bisect range waktu + pread baris yang cocok, jadi
+  cost-nya sebanding jumlah hasil, bukan panjang history.
+"""
+import bisect
+import csv
+import io
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+
+import metrics
+
+JOURNAL_ENABLED = os.getenv("JOURNAL", "1") == "1"
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "data/journal")
+FLUSH_INTERVAL = 1.0   # detik baris dikumpulkan sebelum ditulis
+QUEUE_SIZE = 10_000
+
+ROW = struct.Struct("<qHHbdddd")
+SIDES = {"BUY": 1, "SELL": -1}
+SIDE_NAMES = {1: "BUY", -1: "SELL"}
+DAY_MS = 86_400_000
+CSV_FIELDS = ("time_utc", "ts", "symbol", "tf", "side", "price", "macd", "signal", "hist")
+
+
+def day_of(ts_ms):
+    return ts_ms // DAY_MS
+
+
+def partition_name(day):
+    return datetime.fromtimestamp(day * 86_400, timezone.utc).strftime("%Y-%m-%d") + ".bin"
+
+
+def parse_partition(filename):
+    """"2024-05-01.bin" -> nomor hari sejak epoch, None kalau bukan partisi."""
+    if not filename.endswith(".bin"):
+        return None
+    try:
+        date = datetime.strptime(filename[:-4], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return int(date.timestamp()) // 86_400
+
+
+class SignalJournal:
+    def __init__(self, root=JOURNAL_DIR, flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE):
+        self.root = root
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(queue_size)
+        self._names = []     # id -> nama symbol / tf
+        self._ids = {}       # nama -> id
+        self._index = {}     # (symbol id, tf id) -> (array ts, array lokasi (hari << 32 | baris))
+        self._rows = {}      # hari -> jumlah baris di partisi
+        self._fds = {}       # hari -> fd baca
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._thread = None
+
+    def __len__(self):
+        return sum(self._rows.values())
+
+    # ---------- tulis ----------
+
+    def append(self, ts_ms, symbol, tf, side, res):
+        """Catat satu sinyal (thread scanner; tidak pernah menunggu)."""
+        row = (int(ts_ms), symbol, tf, SIDES[side],
+               res["price"], res["macd"], res["signal"], res["hist"])
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            metrics.inc("cryptobot_journal_dropped_total")
+
+    def flush(self, timeout=None):
+        """Tunggu semua baris yang sudah di-append tertulis (benchmark / shutdown)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        self._load()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = [r for r in batch if not isinstance(r, threading.Event)]
+            try:
+                if rows:
+                    with metrics.timer("journal"):
+                        self._write(rows)
+            except Exception as e:
+                metrics.count_error("journal", e)
+            for marker in batch:
+                if isinstance(marker, threading.Event):
+                    marker.set()
+
+    def _name_id(self, name, new_names):
+        name_id = self._ids.get(name)
+        if name_id is None:
+            name_id = self._ids[name] = len(self._names)
+            self._names.append(name)
+            new_names.append(name)
+        return name_id
+
+    def _write(self, rows):
+        os.makedirs(self.root, exist_ok=True)
+        new_names = []
+        by_day = {}
+        with self._lock:
+            for ts, symbol, tf, side, *values in rows:
+                key = (self._name_id(symbol, new_names), self._name_id(tf, new_names))
+                by_day.setdefault(day_of(ts), []).append((ts, key, side, values))
+        if new_names:
+            # nama dulu, baru baris yang memakainya
+            with open(os.path.join(self.root, "names.txt"), "a") as f:
+                f.write("".join(n + "\n" for n in new_names))
+
+        for day, day_rows in by_day.items():
+            data = b"".join(ROW.pack(ts, sid, tid, side, *values) for ts, (sid, tid), side, values in day_rows)
+            with open(os.path.join(self.root, partition_name(day)), "ab") as f:
+                f.write(data)
+            with self._lock:
+                first = self._rows.get(day, 0)
+                for n, (ts, key, _, _) in enumerate(day_rows):
+                    self._add_index(key, ts, (day << 32) | (first + n))
+                self._rows[day] = first + len(day_rows)
+        metrics.inc("cryptobot_journal_rows_total", len(rows))
+
+    def _add_index(self, key, ts, loc):
+        entry = self._index.get(key)
+        if entry is None:
+            entry = self._index[key] = (array("q"), array("q"))
+        times, locs = entry
+        if not times or ts >= times[-1]:
+            times.append(ts)
+            locs.append(loc)
+        else:  # jarang: baris datang tidak urut waktu (jam mundur, replay)
+            i = bisect.bisect_right(times, ts)
+            times.insert(i, ts)
+            locs.insert(i, loc)
+
+    # ---------- load ----------
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.isdir(self.root):
+                return
+            names_path = os.path.join(self.root, "names.txt")
+            if os.path.exists(names_path):
+                with open(names_path) as f:
+                    lines = f.read().split("\n")
+                if lines[-1]:
+                    # baris terakhir tanpa "\n" = tulisan terpotong (belum pernah dipakai baris data)
+                    os.truncate(names_path, os.path.getsize(names_path) - len(lines[-1].encode()))
+                for name in lines[:-1]:
+                    self._ids[name] = len(self._names)
+                    self._names.append(name)
+            days = sorted(d for d in map(parse_partition, os.listdir(self.root)) if d is not None)
+            for day in days:
+                path = os.path.join(self.root, partition_name(day))
+                with open(path, "rb") as f:
+                    data = f.read()
+                torn = len(data) % ROW.size
+                if torn:
+                    os.truncate(path, len(data) - torn)
+                    data = data[:len(data) - torn]
+                for n, (ts, sid, tid, *_rest) in enumerate(ROW.iter_unpack(data)):
+                    self._add_index((sid, tid), ts, (day << 32) | n)
+                self._rows[day] = len(data) // ROW.size
+
+    # ---------- baca ----------
+
+    def _read(self, loc):
+        day, n = loc >> 32, loc & 0xFFFFFFFF
+        fd = self._fds.get(day)
+        if fd is None:
+            fd = self._fds[day] = os.open(os.path.join(self.root, partition_name(day)), os.O_RDONLY)
+        ts, sid, tid, side, price, macd, signal, hist = ROW.unpack(os.pread(fd, ROW.size, n * ROW.size))
+        return {
+            "ts": ts, "symbol": self._names[sid], "tf": self._names[tid], "side": SIDE_NAMES[side],
+            "price": price, "macd": macd, "signal": signal, "hist": hist,
+        }
+
+    def _keys(self, symbol, tf):
+        return [
+            key for key in self._index
+            if (symbol is None or self._names[key[0]] == symbol)
+            and (tf is None or self._names[key[1]] == tf)
+        ]
+
+    def count(self, symbol=None, tf=None):
+        self._load()
+        with self._lock:
+            return sum(len(self._index[key][0]) for key in self._keys(symbol, tf))
+
+    def query(self, symbol=None, tf=None, since_ms=None, until_ms=None, limit=None):
+        """
+        Sinyal dalam [since_ms, until_ms), urut waktu. symbol/tf None = semua.
+        `limit` = hanya N sinyal terakhir.
+        """
+        self._load()
+        with self._lock:
+            hits = []
+            for key in self._keys(symbol, tf):
+                times, locs = self._index[key]
+                lo = 0 if since_ms is None else bisect.bisect_left(times, since_ms)
+                hi = len(times) if until_ms is None else bisect.bisect_left(times, until_ms)
+                if limit is not None:
+                    lo = max(lo, hi - limit)
+                hits.extend(zip(times[lo:hi], locs[lo:hi]))
+            hits.sort()
+            if limit is not None:
+                hits = hits[-limit:]
+            return [self._read(loc) for _, loc in hits]
+
+    def close(self):
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+
+
+# =========================
+#  FORMAT
+# =========================
+
+def iso(ts_ms):
+    return datetime.fromtimestamp(ts_ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def parse_time(value):
+    """"1714521600000" (ms) / "2024-05-01" (UTC) -> ms; None/kosong -> None. ValueError kalau salah."""
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def to_csv(rows):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS)
+    for r in rows:
+        writer.writerow([iso(r["ts"]), r["ts"], r["symbol"], r["tf"], r["side"],
+                         r["price"], r["macd"], r["signal"], r["hist"]])
+    return out.getvalue()
+
+
+def format_history(symbol, tf, rows, total):
+    """Pesan /history: sinyal terakhir, yang terbaru di atas."""
+    if not rows:
+        return f"Belum ada sinyal tercatat untuk {symbol} {tf}."
+    lines = [f"📜 *History sinyal {symbol} {tf}* ({len(rows)} terakhir dari {total})", "```"]
+    for r in reversed(rows):
+        lines.append(f"{iso(r['ts'])}  {r['side']:<4}  {r['price']:>12.6g}  hist {r['hist']:+.4g}")
+    lines.append("```")
+    return "\n".join(lines)
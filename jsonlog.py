@@ -0,0 +1,135 @@
+"""
+Logging terstruktur (JSON satu baris per event) tanpa I/O di thread pemanggil.
+
+    logger.info("scan", extra={"stage": "scan", "duration_ms": 12.3})
+    -> {"ts": "...", "level": "INFO", "logger": "cryptobot.scanner", "msg": "scan",
+        "stage": "scan", "duration_ms": 12.3}
+
+- Thread scanner/handler hanya memasukkan record ke antrean terbatas
+  (`QueueHandler`); tulis ke stderr dikerjakan satu thread `QueueListener`.
+  Kalau antrean penuh record dibuang (tidak pernah menunggu) dan dihitung di
+  metrik cryptobot_log_dropped_total.
+- Event DEBUG per combo (skip, fetch) di-sampling: hanya 1 dari
+  `LOG_DEBUG_SAMPLE` per jenis event yang diteruskan (yang lain tetap tercatat
+  di metrik). Level lain tidak pernah di-sampling.
+- Field konteks: symbol, tf, stage, duration_ms, plus field `extra` lain.
+
+Logger "cryptobot" (dan turunannya) diam sampai `setup()` dipanggil di entry point.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import metrics
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_DEBUG_SAMPLE = max(1, int(os.getenv("LOG_DEBUG_SAMPLE", "100")))
+
+CONTEXT_FIELDS = ("symbol", "tf", "stage", "duration_ms")
+
+# atribut bawaan LogRecord, selain ini dianggap field `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = record.__dict__.get(key)
+            if value is not None:
+                event[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in event:
+                event[key] = value
+        if record.exc_text:
+            event["exc"] = record.exc_text
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """Teruskan 1 dari `every` record DEBUG per (logger, pesan)."""
+
+    def __init__(self, every=LOG_DEBUG_SAMPLE):
+        super().__init__()
+        self.every = every
+        self._seen = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every <= 1:
+            return True
+        key = (record.name, record.msg)
+        n = self._seen.get(key, 0)
+        self._seen[key] = n + 1  # race antar thread hanya menggeser sampling sedikit
+        if n % self.every:
+            metrics.inc("cryptobot_log_sampled_out_total")
+            return False
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler yang membuang record (dan menghitungnya) kalau antrean penuh."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("cryptobot_log_dropped_total")
+
+    def prepare(self, record):
+        # Jangan format di thread pemanggil (QueueHandler bawaan memformat pesan
+        # penuh di sini); cukup bekukan args & traceback supaya aman dipindah thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup(level=LOG_LEVEL, stream=None):
+    """Pasang handler antrean + listener (sekali). Aman dipanggil berulang."""
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        out = logging.StreamHandler(stream or sys.stderr)
+        out.setFormatter(JsonFormatter())
+        q = queue.Queue(LOG_QUEUE_SIZE)
+        _handler = DroppingQueueHandler(q)
+        _handler.addFilter(DebugSampler())
+
+        root = logging.getLogger("cryptobot")
+        root.setLevel(level)
+        root.addHandler(_handler)
+        root.propagate = False
+        _listener = QueueListener(q, out, respect_handler_level=False)
+        _listener.start()
+        atexit.register(stop)
+
+
+def stop():
+    """Hentikan listener setelah antrean dikosongkan."""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger("cryptobot").removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
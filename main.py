@@ -1,764 +1,128 @@
+"""
+Entry point Crypto MACD Signal Bot: satu set handler, scanner dan pengirim,
+dijalankan dalam salah satu mode:
+
+    python main.py polling       # long polling + scanner (+ web health/metrics)
+    python main.py webhook       # Telegram push update ke Flask + scanner
+    python main.py worker-only   # hanya scanner & kirim sinyal, tanpa handler command
+    gunicorn 'main:create_app()' --workers 1 --threads 8   # mode webhook lewat gunicorn
+
+Tanpa argumen mode diambil dari BOT_MODE (default webhook). Tiap mode hanya
+menjalankan thread yang dibutuhkannya.
+"""
+import argparse
+import hmac
+import logging
 import os
-import time
 import threading
-from datetime import datetime, timezone
-
-import pandas as pd
-import pandas_ta as ta
-import ccxt
-import matplotlib
-matplotlib.use("Agg")  # backend non-GUI untuk server
-import matplotlib.pyplot as plt
+import time
 
+# numpy, ccxt & matplotlib di-import lazy di scanner.py / charts.py
+# supaya worker web (health check + webhook) cepat start.
 import telebot
-from flask import Flask
+from flask import Flask, request
+
+# Config pair/TF, ambil data, analisa MACD & loop scanner ada di scanner.py
+import charts
+import correlation
+import history
+import journal
+import jsonlog
+import metrics
+import profiler
+import screener
+import status
+import tgtransport
+import tracker
+from alerts import format_alert, valid_level
+from ratelimit import ChatLimiter, FairExecutor, Pacer
+from scanner import (
+    ALERTS,
+    CORRELATION,
+    CRYPTO_PAIRS,
+    CRYPTO_TIMEFRAMES,
+    EXCHANGE_NAME,
+    JOURNAL,
+    SCAN_INTERVAL,
+    TRACKER,
+    crypto_scanner_loop as run_scanner_loop,
+    current_price,
+)
+from supervisor import Supervisor
 
 # =========================
 #  CONFIG & SETUP
 # =========================
 
-TOKEN = os.getenv("TOKEN")
+TOKEN = os.getenv("TELEGRAM_TOKEN") or os.getenv("TOKEN")
 if not TOKEN:
-    raise ValueError("TOKEN Telegram belum diset. Tambahkan di Replit Secrets dengan nama 'TOKEN'.")
-
-bot = telebot.TeleBot(TOKEN)
-
-# Chat ID user yang aktif (/start)
-USER_CHAT_ID = None
-
-# Web server mini untuk keep-alive di Replit
-app = Flask(__name__)
-
-@app.route("/")
-def home():
-    return "Crypto MACD Signal Bot is running!"
-
-def run_web():
-    app.run(host="0.0.0.0", port=8080)
-
-# =========================
-#  CRYPTO CONFIG (Binance via ccxt)
-# =========================
-
-EXCHANGE_NAME = "Binance"
-exchange = ccxt.binance()  # tanpa API key, public market data
-
-# Pair crypto yang akan dipantau auto-signal
-CRYPTO_PAIRS = [
-    "BTC/USDT",
-    "ETH/USDT",
-    "SOL/USDT",
-    "BNB/USDT",
-    "PAXG/USDT",
-    "XRP/USDT",
-    "DOT/USDT",
-]
-
-# Timeframe auto-signal
-CRYPTO_TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
-
-# =========================
-#  UTIL
-# =========================
-
-def format_time_utc(ts=None):
-    if ts is None:
-        ts = datetime.now(timezone.utc)
-    return ts.strftime("%Y-%m-%d %H:%M:%S UTC")
-
-def send_if_chat_set(text: str):
-    """Kirim pesan ke chat user kalau USER_CHAT_ID sudah terisi."""
-    global USER_CHAT_ID
-    if USER_CHAT_ID:
-        bot.send_message(USER_CHAT_ID, text, parse_mode="Markdown")
-
-# =========================
-#  DATA CRYPTO via CCXT (Binance)
-# =========================
-
-def get_ohlcv_ccxt(symbol: str, timeframe: str, limit: int = 200):
-    """
-    Ambil candlestick crypto dari Binance (ccxt).
-    return: list [ [timestamp, open, high, low, close, volume], ... ]
-    """
-    for attempt in range(2):
-        try:
-            data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-            return data
-        except ccxt.NetworkError:
-            if attempt == 0:
-                time.sleep(2)
-                continue
-            return None
-        except ccxt.ExchangeError:
-            return None
-
-# =========================
-#  ANALISA MACD via pandas-ta
-# =========================
-
-def macd_from_ohlc(ohlc):
-    if not ohlc or len(ohlc) < 50:
-        return None
-
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"]
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
-
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
-
-    if macd_col not in macd_df.columns:
-        return None
-
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
-
-    last_row = df.iloc[-1]
-    return {
-        "price": float(last_row["close"]),
-        "macd": float(last_row[macd_col]),
-        "signal": float(last_row[macds_col]),
-        "hist": float(last_row[macdh_col]),
-        "time": last_row["time"],
-    }
-
-def build_signal_message(symbol, tf, res):
-    side = None
-    reason = ""
-
-    if res["macd"] > res["signal"] and res["hist"] > 0:
-        side = "BUY"
-        reason = "MACD Golden Cross, histogram > 0 (bullish momentum)."
-    elif res["macd"] < res["signal"] and res["hist"] < 0:
-        side = "SELL"
-        reason = "MACD Dead Cross, histogram < 0 (bearish momentum)."
-
-    if not side:
-        return None, None
-
-    msg = (
-        f"🚨 *CRYPTO MACD Signal*\n\n"
-        f"Exchange: *{EXCHANGE_NAME}*\n"
-        f"Pair: *{symbol}*\n"
-        f"Timeframe: *{tf}*\n"
-        f"Sinyal: *{side}*\n\n"
-        f"Price: `{res['price']:.5f}`\n"
-        f"MACD: `{res['macd']:.6f}`\n"
-        f"Signal: `{res['signal']:.6f}`\n"
-        f"Histogram: `{res['hist']:.6f}`\n"
-        f"Waktu candle: {res['time']}\n"
-        f"Alasan: {reason}\n"
-        f"Update bot: {format_time_utc()}"
-    )
-    return msg, side
-
-# =========================
-#  LOOP SCANNER SINYAL CRYPTO (AUTO)
-# =========================
-
-LAST_SIGNAL = {}  # key: (symbol,tf) -> "BUY"/"SELL"
-
-def mark_and_should_send(symbol, tf, side):
-    key = (symbol, tf)
-    last = LAST_SIGNAL.get(key)
-    if last == side:
-        return False
-    LAST_SIGNAL[key] = side
-    return True
-
-def crypto_scanner_loop():
-    """
-    Loop utama: scan semua pair/timeframe,
-    hitung MACD, kirim sinyal kalau ada BUY/SELL baru.
-    """
-    while True:
-        try:
-            for symbol in CRYPTO_PAIRS:
-                for tf in CRYPTO_TIMEFRAMES:
-                    try:
-                        ohlc = get_ohlcv_ccxt(symbol, timeframe=tf, limit=200)
-                        if not ohlc:
-                            continue
-
-                        res = macd_from_ohlc(ohlc)
-                        if not res:
-                            continue
-
-                        msg, side = build_signal_message(symbol, tf, res)
-                        if msg and side:
-                            if mark_and_should_send(symbol, tf, side):
-                                send_if_chat_set(msg)
-                    except Exception:
-                        continue
-
-            time.sleep(60)
-        except Exception:
-            time.sleep(60)
-
-# =========================
-#  FITUR CHART /tf
-# =========================
-
-def plot_chart_with_macd(symbol: str, timeframe: str, limit: int = 200):
-    """
-    Ambil data dari Binance dan buat chart candlestick simple + garis MACD & Signal.
-    Return path file png.
-    """
-    ohlc = get_ohlcv_ccxt(symbol, timeframe, limit=limit)
-    if not ohlc or len(ohlc) < 50:
-        return None
-
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"]
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
+    raise ValueError("Token Telegram belum diset (env TELEGRAM_TOKEN atau TOKEN).")
 
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
+MODES = ("polling", "webhook", "worker-only")
+BOT_MODE = os.getenv("BOT_MODE", "webhook")
 
-    if macd_col not in macd_df.columns:
-        return None
-
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
-
-    # Mulai plotting
-    plt.figure(figsize=(10, 6))
-
-    # Subplot 1: harga (close) aja biar simple (bisa dikembangkan ke candlestick utuh)
-    ax1 = plt.subplot(2, 1, 1)
-    ax1.plot(df["time"], df["close"])
-    ax1.set_title(f"{symbol} - {timeframe} Price")
-    ax1.set_ylabel("Price")
-
-    # Subplot 2: MACD & Signal + Histogram
-    ax2 = plt.subplot(2, 1, 2)
-    ax2.plot(df["time"], df[macd_col], label="MACD")
-    ax2.plot(df["time"], df[macds_col], label="Signal")
-    ax2.bar(df["time"], df[macdh_col], width=0.01, label="Hist")  # width kecil biar nggak dempet
-    ax2.set_title("MACD 12,26,9")
-    ax2.legend(loc="best")
-
-    plt.tight_layout()
-
-    # Simpan ke file
-    filename = f"chart_{symbol.replace('/', '')}_{timeframe}.png"
-    plt.savefig(filename)
-    plt.close()
-    return filename
-
-# =========================
-#  TELEGRAM BOT
-# =========================
-
-@bot.message_handler(commands=["start"])
-def start_cmd(message):
-    global USER_CHAT_ID
-    USER_CHAT_ID = message.chat.id
-    text = (
-        "👋 *Crypto MACD Signal Bot*\n\n"
-        "Bot ini:\n"
-        "1️⃣ *Auto-signal MACD* 12,26,9 untuk:\n"
-        f"   Pair: {', '.join(CRYPTO_PAIRS)}\n"
-        f"   TF  : {', '.join(CRYPTO_TIMEFRAMES)}\n\n"
-        "2️⃣ *Fitur chart manual* via command:\n"
-        "   `/tf <timeframe> <symbol>`\n"
-        "   Contoh:\n"
-        "   • `/tf 1h BTCUSDT`\n"
-        "   • `/tf 4h ETHUSDT`\n"
-        "   • `/tf 30m XRPUSDT`\n"
-        "   • `/tf 1d PAXGUSDT`\n\n"
-        "Timeframe yang didukung mengikuti Binance / ccxt:\n"
-        "`1m,3m,5m,15m,30m,1h,2h,4h,6h,8h,12h,1d,3d,1w,1M`\n\n"
-        "Sinyal BUY/SELL akan otomatis dikirim ke chat ini."
-    )
-    bot.send_message(message.chat.id, text, parse_mode="Markdown")
+PORT = int(os.getenv("PORT", "8080"))
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "").rstrip("/")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_URL = WEBHOOK_HOST + WEBHOOK_PATH
+# Opsional: Telegram mengirim ini di header X-Telegram-Bot-Api-Secret-Token,
+# update tanpa header yang cocok ditolak
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
 
-@bot.message_handler(func=lambda m: m.text and m.text.upper() == "CRYPTO")
-def crypto_info(message):
-    text = (
-        "📊 *CRYPTO yang dipantau auto-signal:*\n" +
-        "\n".join([f"- {p} @ {', '.join(CRYPTO_TIMEFRAMES)}" for p in CRYPTO_PAIRS])
-        + "\n\nUntuk chart manual, gunakan: `/tf <tf> <symbol>`"
-    )
-    bot.send_message(message.chat.id, text, parse_mode="Markdown")
+# Thread worker handler telebot (polling / webhook). Pool-nya baru dibuat di
+# enable_handlers(), jadi mode worker-only tidak menjalankan thread handler.
+HANDLER_THREADS = 2
 
-@bot.message_handler(commands=["tf"])
-def tf_chart_handler(message):
-    """
-    Command: /tf <timeframe> <symbol>
-    Contoh: /tf 1h BTCUSDT
-            /tf 30m ETHUSDT
-    """
-    try:
-        parts = message.text.split()
-        if len(parts) != 3:
-            bot.reply_to(
-                message,
-                "Format salah.\nContoh yang benar:\n`/tf 1h BTCUSDT`\n`/tf 30m BTCUSDT`",
-                parse_mode="Markdown",
-            )
-            return
-
-        tf = parts[1].strip()
-        symbol_raw = parts[2].strip().upper()
-
-        # Ubah BTCUSDT → BTC/USDT
-        if symbol_raw.endswith("USDT"):
-            base = symbol_raw.replace("USDT", "")
-            symbol = f"{base}/USDT"
-        else:
-            # fallback: kalau user sudah ketik BTC/USDT
-            symbol = symbol_raw
-
-        bot.reply_to(message, f"⏳ Mengambil chart {symbol} timeframe {tf} dari {EXCHANGE_NAME}...")
-
-        file_path = plot_chart_with_macd(symbol, tf)
-        if not file_path:
-            bot.reply_to(message, "Gagal membuat chart. Coba timeframe lain atau cek simbolnya lagi.")
-            return
-
-        with open(file_path, "rb") as photo:
-            caption = f"{symbol} - {tf} (Price + MACD)"
-            bot.send_photo(message.chat.id, photo, caption=caption)
-    except Exception as e:
-        bot.reply_to(message, f"Terjadi error saat membuat chart: `{e}`", parse_mode="Markdown")
-
-# =========================
-#  MAIN
-# =========================
-
-if __name__ == "__main__":
-    print("🤖 Crypto MACD Signal Bot aktif.")
-    print("   - CRYPTO only (Binance via ccxt)")
-    print("   - Auto scan & kirim sinyal ke Telegram")
-    print("   - Pair:", ", ".join(CRYPTO_PAIRS))
-    print("   - TF:", ", ".join(CRYPTO_TIMEFRAMES))
-    print("   - Fitur /tf untuk chart manual")
-
-    # Jalankan web server (keep-alive)
-    t_web = threading.Thread(target=run_web, daemon=True)
-    t_web.start()
-
-    # Jalankan scanner crypto
-    t_crypto = threading.Thread(target=crypto_scanner_loop, daemon=True)
-    t_crypto.start()
-
-    # Jalankan Telegram bot
-    bot.infinity_polling(timeout=60, long_polling_timeout=30)    app.run(host="0.0.0.0", port=port, debug=False, use_reloader=False)
-
-# ====================== BINANCE ======================
-exchange = ccxt.binance({
-    'enableRateLimit': True,
-    'timeout': 30000,
-})
-
-PAIRS = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "BNB/USDT", "XRP/USDT", "PAXG/USDT", "DOT/USDT"]
-TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
-
-LAST_SIGNAL = {}   # (symbol, tf) -> "BUY"/"SELL"
-
-# ====================== UTIL ======================
-def utc_now():
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-
-def send(text):
-    global USER_CHAT_ID
-    if USER_CHAT_ID:
-        try:
-            bot.send_message(USER_CHAT_ID, text, parse_mode="Markdown", disable_web_page_preview=True)
-        except Exception as e:
-            logger.error(f"Gagal kirim Telegram: {e}")
-
-# ====================== MACD CROSS DETECTION ======================
-def check_macd_cross(symbol, tf):
-    try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=tf, limit=100)
-        if len(ohlcv) < 50:
-            return None
-
-        df = pd.DataFrame(ohlcv, columns=["ts", "o", "h", "l", "c", "v"])
-        df["date"] = pd.to_datetime(df["ts"], unit="ms")
-        macd = ta.macd(df["c"])
-        if macd is None or macd.empty:
-            return None
-
-        df["macd"] = macd["MACD_12_26_9"]
-        df["signal"] = macd["MACDs_12_26_9"]
-        df["hist"] = macd["MACDh_12_26_9"]
-
-        prev = df.iloc[-2]
-        curr = df.iloc[-1]
-
-        key = (symbol, tf)
-        last = LAST_SIGNAL.get(key)
-
-        # Golden Cross
-        if prev["macd"] <= prev["signal"] and curr["macd"] > curr["signal"]:
-            if last != "BUY":
-                LAST_SIGNAL[key] = "BUY"
-                msg = (
-                    f"*MACD GOLDEN CROSS*\n\n"
-                    f"*Pair:* `{symbol}`\n"
-                    f"*TF:* `{tf}`\n"
-                    f"*Signal:* BUY\n\n"
-                    f"Price: `{curr['c']:.6f}`\n"
-                    f"MACD: `{curr['macd']:.6f}`\n"
-                    f"Signal Line: `{curr['signal']:.6f}`\n"
-                    f"Histogram: `{curr['hist']:.6f}`\n"
-                    f"Time: `{curr['date'].strftime('%Y-%m-%d %H:%M')} UTC`"
-                )
-                return msg
-
-        # Death Cross
-        elif prev["macd"] >= prev["signal"] and curr["macd"] < curr["signal"]:
-            if last != "SELL":
-                LAST_SIGNAL[key] = "SELL"
-                msg = (
-                    f"*MACD DEATH CROSS*\n\n"
-                    f"*Pair:* `{symbol}`\n"
-                    f"*TF:* `{tf}`\n"
-                    f"*Signal:* SELL\n\n"
-                    f"Price: `{curr['c']:.6f}`\n"
-                    f"MACD: `{curr['macd']:.6f}`\n"
-                    f"Signal Line: `{curr['signal']:.6f}`\n"
-                    f"Histogram: `{curr['hist']:.6f}`\n"
-                    f"Time: `{curr['date'].strftime('%Y-%m-%d %H:%M')} UTC`"
-                )
-                return msg
-    except Exception as e:
-        logger.warning(f"Error {symbol} {tf}: {e}")
-    return None
-
-# ====================== SCANNER LOOP ======================
-def scanner():
-    logger.info("Scanner started")
-    while True:
-        try:
-            for symbol in PAIRS:
-                for tf in TIMEFRAMES:
-                    msg = check_macd_cross(symbol, tf)
-                    if msg:
-                        send(msg)
-                    time.sleep(0.7)
-            logger.info(f"Scan complete – {utc_now()}")
-            time.sleep(45)
-        except Exception as e:
-            logger.error(f"Scanner crash: {e}")
-            time.sleep(60)
-
-# ====================== CHART /tf ======================
-def make_chart(symbol, tf):
-    try:
-        ohlcv = exchange.fetch_ohlcv(symbol, tf, limit=150)
-        df = pd.DataFrame(ohlcv, columns=["ts","o","h","l","c","v"])
-        df["date"] = pd.to_datetime(df["ts"], unit="ms")
-        macd = ta.macd(df["c"])
-        df["macd"] = macd["MACD_12_26_9"]
-        df["signal"] = macd["MACDs_12_26_9"]
-        df["hist"] = macd["MACDh_12_26_9"]
-
-        plt.figure(figsize=(12,8))
-        plt.subplot(2,1,1)
-        plt.plot(df["date"], df["c"], color="#8b5cf6")
-        plt.title(f"{symbol} {tf} – Price")
-        plt.grid(alpha=0.3)
-
-        plt.subplot(2,1,2)
-        plt.plot(df["date"], df["macd"], label="MACD", color="blue")
-        plt.plot(df["date"], df["signal"], label="Signal", color="orange")
-        plt.bar(df["date"], df["hist"], label="Histogram", color="gray", alpha=0.6, width=0.001)
-        plt.axhline(0, color="white", linewidth=0.8, linestyle="--")
-        plt.legend()
-        plt.title("MACD (12,26,9)")
-        plt.grid(alpha=0.3)
-
-        plt.tight_layout()
-        path = f"/tmp/chart_{symbol.replace('/', '')}_{tf}.png"
-        plt.savefig(path, dpi=200)
-        plt.close()
-        return path
-    except:
-        return None
-
-# ====================== TELEGRAM HANDLERS ======================
-@bot.message_handler(commands=["start"])
-def start(msg):
-    global USER_CHAT_ID
-    USER_CHAT_ID = msg.chat.id
-    text = (
-        "*Crypto MACD Cross Signal Bot*\n\n"
-        "Bot akan kirim notif hanya saat terjadi:\n"
-        "• Golden Cross → BUY\n"
-        "• Death Cross → SELL\n\n"
-        f"Pair: {', '.join(PAIRS)}\n"
-        f"TF: {', '.join(TIMEFRAMES)}\n\n"
-        "Chart manual: `/tf 1h BTCUSDT`"
-    )
-    bot.send_message(msg.chat.id, text, parse_mode="Markdown")
-
-@bot.message_handler(commands=["tf"])
-def chart(msg):
-    try:
-        parts = msg.text.split()
-        if len(parts) != 3:
-            bot.reply_to(msg, "Gunakan: `/tf 1h BTCUSDT`", parse_mode="Markdown")
-            return
-        tf = parts[1].lower()
-        sym = parts[2].upper().replace("USDT", "/USDT")
-        bot.reply_to(msg, f"Mengambil {sym} {tf}...")
-        path = make_chart(sym, tf)
-        if path and os.path.exists(path):
-            with open(path, "rb") as p:
-                bot.send_photo(msg.chat.id, p, caption=f"{sym} – {tf}")
-            os.remove(path)
-        else:
-            bot.reply_to(msg, "Gagal buat chart.")
-    except Exception as e:
-        bot.reply_to(msg, f"Error: {e}")
-
-# ====================== MAIN ======================
-if __name__ == "__main__":
-    logger.info("Bot starting...")
-    threading.Thread(target=run_web, daemon=True).start()
-    threading.Thread(target=scanner, daemon=True).start()
-    bot.infinity_polling(none_stop=True, interval=0, timeout=60)
-bot = telebot.TeleBot(TOKEN, threaded=True)
+bot = telebot.TeleBot(TOKEN, threaded=False)
 app = Flask(__name__)
 
-# Chat ID user yang aktif (bisa banyak, simpan sebagai set)
-ACTIVE_CHAT_IDS = set()
+# Chat ID user yang aktif (bisa banyak, simpan sebagai set). SIGNAL_CHAT_IDS
+# (dipisah koma) selalu ikut -- satu-satunya sumber chat di mode worker-only.
+ACTIVE_CHAT_IDS = {int(c) for c in os.getenv("SIGNAL_CHAT_IDS", "").split(",") if c.strip()}
 
-# =========================
-#  CRYPTO CONFIG
-# =========================
-
-EXCHANGE_NAME = "Binance"
-exchange = ccxt.binance()
+log = logging.getLogger("cryptobot.main")
 
-CRYPTO_PAIRS = [
-    "BTC/USDT",
-    "ETH/USDT",
-    "SOL/USDT",
-    "BNB/USDT",
-    "PAXG/USDT",
-    "XRP/USDT",
-    "DOT/USDT",
-]
-
-CRYPTO_TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
-
-# Simpan sinyal terakhir: (symbol, tf) -> "BUY"/"SELL"
-LAST_SIGNAL = {}
+# Token admin untuk route /admin/* (kosong = route admin dimatikan)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 
 # =========================
 #  UTIL
 # =========================
 
-def format_time_utc(ts=None):
-    if ts is None:
-        ts = datetime.now(timezone.utc)
-    return ts.strftime("%Y-%m-%d %H:%M:%S UTC")
+# Jaga kiriman di bawah limit Telegram (30/detik global, 1/detik per chat)
+SEND_PACER = Pacer()
 
 
 def send_to_all_active(text: str):
     for chat_id in list(ACTIVE_CHAT_IDS):
+        SEND_PACER.wait(chat_id)
         try:
             bot.send_message(chat_id, text, parse_mode="Markdown")
-        except Exception:
+        except Exception as e:
             # kalau error (user blokir bot, dll) – hapus dari list
+            metrics.count_error("send", e, chat_id=chat_id)
             ACTIVE_CHAT_IDS.discard(chat_id)
 
 
-# =========================
-#  DATA CRYPTO / MACD
-# =========================
+def send_to_chat(chat_id, text: str):
+    SEND_PACER.wait(chat_id)
+    bot.send_message(chat_id, text, parse_mode="Markdown")
 
-def get_ohlcv_ccxt(symbol: str, timeframe: str, limit: int = 200):
-    for attempt in range(2):
-        try:
-            return exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-        except ccxt.NetworkError:
-            if attempt == 0:
-                time.sleep(2)
-                continue
-            return None
-        except ccxt.ExchangeError:
-            return None
-
-
-def macd_from_ohlc(ohlc):
-    if not ohlc or len(ohlc) < 50:
-        return None
-
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"],
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
-
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
-
-    if macd_col not in macd_df.columns:
-        return None
-
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
-
-    last = df.iloc[-1]
-    return {
-        "price": float(last["close"]),
-        "macd": float(last[macd_col]),
-        "signal": float(last[macds_col]),
-        "hist": float(last[macdh_col]),
-        "time": last["time"],
-    }
 
-
-def build_signal_message(symbol, tf, res):
-    side = None
-    reason = ""
-
-    if res["macd"] > res["signal"] and res["hist"] > 0:
-        side = "BUY"
-        reason = "MACD Golden Cross, histogram > 0 (bullish momentum)."
-    elif res["macd"] < res["signal"] and res["hist"] < 0:
-        side = "SELL"
-        reason = "MACD Dead Cross, histogram < 0 (bearish momentum)."
-
-    if not side:
-        return None, None
-
-    msg = (
-        f"🚨 *CRYPTO MACD Signal*\n\n"
-        f"Exchange: *{EXCHANGE_NAME}*\n"
-        f"Pair: *{symbol}*\n"
-        f"Timeframe: *{tf}*\n"
-        f"Sinyal: *{side}*\n\n"
-        f"Price: `{res['price']:.5f}`\n"
-        f"MACD: `{res['macd']:.6f}`\n"
-        f"Signal: `{res['signal']:.6f}`\n"
-        f"Histogram: `{res['hist']:.6f}`\n"
-        f"Waktu candle: {res['time']}\n"
-        f"Alasan: {reason}\n"
-        f"Update bot: {format_time_utc()}"
-    )
-    return msg, side
-
-
-# =========================
-#  SCANNER AUTO-SIGNAL
-# =========================
-
-def mark_and_should_send(symbol, tf, side):
-    key = (symbol, tf)
-    last = LAST_SIGNAL.get(key)
-    if last == side:
-        return False
-    LAST_SIGNAL[key] = side
-    return True
+def crypto_scanner_loop(worker=None):
+    run_scanner_loop(send_to_all_active, notify=send_to_chat, worker=worker)
 
 
-def crypto_scanner_loop():
-    while True:
-        try:
-            for symbol in CRYPTO_PAIRS:
-                for tf in CRYPTO_TIMEFRAMES:
-                    try:
-                        ohlc = get_ohlcv_ccxt(symbol, tf, limit=200)
-                        if not ohlc:
-                            continue
-
-                        res = macd_from_ohlc(ohlc)
-                        if not res:
-                            continue
+# Watchdog scanner: tanpa heartbeat lebih dari SCANNER_STALL_TIMEOUT detik (di luar
+# jeda antar putaran) thread scanner dianggap macet dan diganti yang baru
+SUPERVISOR = Supervisor()
+SCANNER_STALL_TIMEOUT = float(os.getenv("SCANNER_STALL_TIMEOUT", str(SCAN_INTERVAL)))
 
-                        msg, side = build_signal_message(symbol, tf, res)
-                        if msg and side and mark_and_should_send(symbol, tf, side):
-                            send_to_all_active(msg)
-                    except Exception:
-                        continue
 
-            time.sleep(60)
-        except Exception:
-            time.sleep(60)
-
-
-# =========================
-#  CHART GENERATOR
-# =========================
-
-def plot_chart_with_macd(symbol: str, timeframe: str, limit: int = 200):
-    ohlc = get_ohlcv_ccxt(symbol, timeframe, limit=limit)
-    if not ohlc or len(ohlc) < 50:
-        return None
-
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"],
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
-
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
-
-    if macd_col not in macd_df.columns:
-        return None
-
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
-
-    plt.figure(figsize=(10, 6))
-
-    ax1 = plt.subplot(2, 1, 1)
-    ax1.plot(df["time"], df["close"])
-    ax1.set_title(f"{symbol} - {timeframe} Price")
-    ax1.set_ylabel("Price")
-
-    ax2 = plt.subplot(2, 1, 2)
-    ax2.plot(df["time"], df[macd_col], label="MACD")
-    ax2.plot(df["time"], df[macds_col], label="Signal")
-    ax2.bar(df["time"], df[macdh_col], width=0.01, label="Hist")
-    ax2.set_title("MACD 12,26,9")
-    ax2.legend(loc="best")
-
-    plt.tight_layout()
-
-    filename = f"chart_{symbol.replace('/', '')}_{timeframe}.png"
-    plt.savefig(filename)
-    plt.close()
-
-    return filename
+def start_scanner():
+    SUPERVISOR.add("scanner", crypto_scanner_loop, SCANNER_STALL_TIMEOUT)
+    SUPERVISOR.start()
 
 
 # =========================
@@ -770,8 +134,8 @@ def start_cmd(message):
     chat_id = message.chat.id
     ACTIVE_CHAT_IDS.add(chat_id)
 
-    kb = types.ReplyKeyboardMarkup(resize_keyboard=True)
-    kb.row(types.KeyboardButton("CRYPTO"), types.KeyboardButton("Chart"))
+    kb = telebot.types.ReplyKeyboardMarkup(resize_keyboard=True)
+    kb.row(telebot.types.KeyboardButton("CRYPTO"), telebot.types.KeyboardButton("Chart"))
 
     text = (
         "👋 *Crypto MACD Signal Bot*\n\n"
@@ -782,6 +146,11 @@ def start_cmd(message):
         "2️⃣ *Fitur chart cepat* via tombol *Chart*:\n"
         "   - Tekan tombol `Chart`\n"
         "   - Lalu ketik: `BTCUSDT 1h` atau `ETHUSDT 4h`\n\n"
+        "3️⃣ *Alert harga*: `/alert BTCUSDT 70000`, lihat `/alerts`, hapus `/unalert <id>`\n\n"
+        "4️⃣ *Screener MACD* semua pair USDT: `/screen 1h` (opsional jumlah: `/screen 4h 20`)\n\n"
+        "5️⃣ *Korelasi* pair yang dipantau: `/corr 1h`\n\n"
+        "6️⃣ *History sinyal* yang pernah dikirim: `/history BTCUSDT 1h` (CSV: `/history BTCUSDT 1h csv`)\n\n"
+        "7️⃣ *Performa sinyal* (win rate, rata-rata pergerakan): `/stats`, `/stats BTCUSDT`, `/stats 1h`\n\n"
         "Timeframe yang didukung (Binance/ccxt):\n"
         "`1m,3m,5m,15m,30m,1h,2h,4h,6h,8h,12h,1d,3d,1w,1M`\n\n"
         "Sinyal BUY/SELL akan otomatis dikirim ke chat ini."
@@ -811,618 +180,507 @@ def chart_menu(message):
         "Aturan:\n"
         "- Symbol: pakai format Binance (BTCUSDT, ETHUSDT, XRPUSDT, DOTUSDT, dll)\n"
         "- Timeframe: 1m,5m,15m,30m,1h,4h,1d, dll.\n"
+        "- Opsional jumlah candle (maks. 5000): `BTCUSDT 1d 365`\n"
     )
     bot.send_message(message.chat.id, text, parse_mode="Markdown")
 
 
-@bot.message_handler(func=lambda m: True)
-def generic_text_handler(message):
-    text = message.text.strip().upper()
+def parse_symbol(raw):
+    """"BTCUSDT" -> "BTC/USDT" (format ccxt); yang lain dibiarkan."""
+    raw = raw.upper()
+    if "/" not in raw and raw.endswith("USDT"):
+        return f"{raw[:-4]}/USDT"
+    return raw
+
+
+def parse_tf(raw):
+    """"1H" -> "1h"; "1M" (bulan) tetap, "1m" (menit) tetap."""
+    return raw.lower() if raw[-1] != "M" else raw
 
-    if text in ["CRYPTO", "CHART", "/START"]:
+
+@bot.message_handler(commands=["alert"])
+def alert_cmd(message):
+    """/alert BTCUSDT 70000 -> kabari saat harga menyentuh level (naik atau turun)."""
+    parts = message.text.split()
+    try:
+        symbol, level = parse_symbol(parts[1]), float(parts[2].replace(",", ""))
+        if not valid_level(level):
+            raise ValueError(level)
+    except (IndexError, ValueError):
+        bot.reply_to(message, "Format: `/alert BTCUSDT 70000` (level harga > 0)", parse_mode="Markdown")
+        return
+    if symbol not in CRYPTO_PAIRS:
+        # harga alert diambil dari data scanner, jadi hanya pair yang dipantau
+        bot.reply_to(message, f"Alert hanya untuk pair yang dipantau: {', '.join(CRYPTO_PAIRS)}")
         return
 
-    parts = text.split()
-    if len(parts) != 2:
+    price = current_price(symbol)
+    if price is None:
+        bot.reply_to(message, "Harga belum tersedia, coba lagi sebentar.")
+        return
+    alert = ALERTS.add(message.chat.id, symbol, level, price)
+    if alert is None:
+        bot.reply_to(message, f"Maksimal {ALERTS.max_per_chat} alert per chat. Hapus dulu dengan /unalert <id>.")
         return
+    ACTIVE_CHAT_IDS.add(message.chat.id)
+    bot.reply_to(message, f"🔔 Alert dipasang: {format_alert(alert, price)}")
 
-    symbol_raw, tf = parts[0], parts[1]
 
-    if symbol_raw.endswith("USDT"):
-        base = symbol_raw.replace("USDT", "")
-        symbol = f"{base}/USDT"
-    else:
-        symbol = symbol_raw
+@bot.message_handler(commands=["alerts"])
+def alerts_cmd(message):
+    alerts = ALERTS.for_chat(message.chat.id)
+    if not alerts:
+        bot.reply_to(message, "Belum ada alert. Contoh: `/alert BTCUSDT 70000`", parse_mode="Markdown")
+        return
+    bot.reply_to(message, "🔔 Alert aktif:\n" + "\n".join(format_alert(a) for a in alerts))
+
 
+@bot.message_handler(commands=["unalert"])
+def unalert_cmd(message):
+    parts = message.text.split()
     try:
-        bot.reply_to(message, f"⏳ Mengambil chart {symbol} timeframe {tf} dari {EXCHANGE_NAME}...")
+        alert_id = int(parts[1].lstrip("#"))
+    except (IndexError, ValueError):
+        bot.reply_to(message, "Format: `/unalert 12` (id dari /alerts)", parse_mode="Markdown")
+        return
+    if ALERTS.remove(message.chat.id, alert_id):
+        bot.reply_to(message, f"Alert #{alert_id} dihapus.")
+    else:
+        bot.reply_to(message, f"Alert #{alert_id} tidak ditemukan.")
 
-        file_path = plot_chart_with_macd(symbol, tf)
-        if not file_path:
-            bot.reply_to(
-                message,
-                "Gagal membuat chart. Coba cek lagi symbol/timeframenya.\n"
-                "Contoh: `BTCUSDT 1h`",
-                parse_mode="Markdown",
-            )
-            return
 
-        with open(file_path, "rb") as photo:
-            caption = f"{symbol} - {tf} (Price + MACD)"
-            bot.send_photo(message.chat.id, photo, caption=caption)
-    except Exception as e:
-        bot.reply_to(message, f"Error saat membuat chart: `{e}`", parse_mode="Markdown")
+@bot.message_handler(commands=["screen"])
+def screen_cmd(message):
+    """/screen 1h [N] -> N pair USDT paling bullish & bearish menurut MACD."""
+    parts = message.text.split()
+    tf = parse_tf(parts[1]) if len(parts) > 1 else "1h"
+    n = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 10
+    if tf not in charts.CHART_TIMEFRAMES:
+        bot.reply_to(message, f"Timeframe screener: {', '.join(charts.CHART_TIMEFRAMES)}")
+        return
+    if not admit_heavy(message.chat.id, send_screen, message, tf, max(1, min(n, 25))):
+        return
+    bot.reply_to(message, f"⏳ Screening semua pair USDT di {EXCHANGE_NAME} ({tf})...")
 
 
-# =========================
-#  FLASK + WEBHOOK
-# =========================
+def send_screen(message, tf, n):
+    """Jalankan screener + kirim tabel (jalan di HEAVY_POOL)."""
+    try:
+        results = screener.screen(tf)
+        if not results:
+            bot.reply_to(message, "Data screener belum tersedia, coba lagi sebentar.")
+            return
+        bot.send_message(message.chat.id, screener.format_screen(tf, results, n), parse_mode="Markdown")
+    except Exception as e:
+        metrics.count_error("screen", e, tf=tf)
+        bot.reply_to(message, f"Error saat screening: `{e}`", parse_mode="Markdown")
 
-@app.route("/", methods=["GET"])
-def index():
-    return "Crypto MACD Signal Bot - OK"
 
+@bot.message_handler(commands=["corr"])
+def corr_cmd(message):
+    """/corr 1h -> matriks korelasi return pair yang dipantau (dari data scanner, tanpa fetch)."""
+    parts = message.text.split()
+    tf = parse_tf(parts[1]) if len(parts) > 1 else "1h"
+    if tf not in CRYPTO_TIMEFRAMES:
+        bot.reply_to(message, f"Timeframe korelasi: {', '.join(CRYPTO_TIMEFRAMES)}")
+        return
+    symbols, corr = CORRELATION.matrix(tf)
+    bot.send_message(message.chat.id, correlation.format_matrix(tf, symbols, corr), parse_mode="Markdown")
 
-@app.route(WEBHOOK_PATH, methods=["POST"])
-def webhook():
-    if request.headers.get("content-type") == "application/json":
-        json_str = request.get_data().decode("utf-8")
-        update = telebot.types.Update.de_json(json_str)
-        bot.process_new_updates([update])
-        return "OK", 200
-    else:
-        return "Unsupported Media Type", 415
 
+@bot.message_handler(commands=["history"])
+def history_cmd(message):
+    """/history BTCUSDT 1h [N|csv] -> sinyal yang pernah dikirim (dari jurnal, tanpa fetch)."""
+    parts = message.text.split()
+    if len(parts) < 3:
+        bot.reply_to(message, "Format: `/history BTCUSDT 1h` (opsional jumlah atau `csv`)", parse_mode="Markdown")
+        return
+    if JOURNAL is None:
+        bot.reply_to(message, "Jurnal sinyal tidak aktif.")
+        return
+    symbol, tf = parse_symbol(parts[1]), parse_tf(parts[2])
+    arg = parts[3].lower() if len(parts) > 3 else ""
 
-def set_webhook():
-    bot.remove_webhook()
-    time.sleep(1)
-    bot.set_webhook(url=WEBHOOK_URL)
+    if arg == "csv":
+        rows = JOURNAL.query(symbol, tf)
+        if not rows:
+            bot.reply_to(message, f"Belum ada sinyal tercatat untuk {symbol} {tf}.")
+            return
+        name = f"signals_{symbol.replace('/', '')}_{tf}.csv"
+        bot.send_document(message.chat.id, tgtransport.upload(journal.to_csv(rows).encode(), name))
+        return
+    n = int(arg) if arg.isdigit() else 10
+    rows = JOURNAL.query(symbol, tf, limit=max(1, min(n, 50)))
+    text = journal.format_history(symbol, tf, rows, JOURNAL.count(symbol, tf))
+    bot.send_message(message.chat.id, text, parse_mode="Markdown")
 
 
-# =========================
-#  MAIN
-# =========================
+@bot.message_handler(commands=["stats"])
+def stats_cmd(message):
+    """/stats [BTCUSDT] [1h] -> win rate & rata-rata pergerakan sinyal yang dikirim (dilacak live)."""
+    symbol = tf = None
+    for arg in message.text.split()[1:]:
+        if arg[0].isdigit():
+            tf = parse_tf(arg)
+        else:
+            symbol = parse_symbol(arg)
+    rows = TRACKER.stats(symbol, tf)
+    bot.send_message(message.chat.id, tracker.format_stats(rows), parse_mode="Markdown")
 
-if __name__ == "__main__":
-    print("Starting Crypto MACD Bot (Render/webhook mode)...")
-    print("Webhook URL:", WEBHOOK_URL)
 
-    # set webhook Telegram
-    set_webhook()
+@bot.message_handler(func=lambda m: True)
+def generic_text_handler(message):
+    text = message.text.strip()
 
-    # start scanner auto-signal di thread terpisah
-    t_scan = threading.Thread(target=crypto_scanner_loop, daemon=True)
-    t_scan.start()
+    if text.upper() in ["CRYPTO", "CHART", "/START"]:
+        return
 
-    # jalankan Flask (Render akan call gunicorn / python main.py)
-    app.run(host="0.0.0.0", port=PORT)    "ETH/USDT",
-    "SOL/USDT",
-    "BNB/USDT",
-    "PAXG/USDT",
-    "XRP/USDT",
-    "DOT/USDT",
-]
+    # huruf besar/kecil timeframe bermakna ("1m" menit vs "1M" bulan): split teks asli
+    parts = text.split()
+    if len(parts) not in (2, 3):
+        return
 
-# Timeframe auto-signal
-CRYPTO_TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+    # opsional jumlah candle: "BTCUSDT 1d 365" (lebih dari 1000 diambil per halaman)
+    symbol, tf = parse_symbol(parts[0]), parse_tf(parts[1])
+    bars = charts.CHART_BARS
+    if len(parts) == 3:
+        if not parts[2].isdigit():
+            return
+        bars = max(50, min(int(parts[2]), history.MAX_BARS))
 
-# =========================
-#  UTIL
-# =========================
+    if not admit_heavy(message.chat.id, send_chart, message, symbol, tf, bars):
+        return
+    bot.reply_to(message, f"⏳ Mengambil chart {symbol} timeframe {tf} dari {EXCHANGE_NAME}...")
 
-def format_time_utc(ts=None):
-    if ts is None:
-        ts = datetime.now(timezone.utc)
-    return ts.strftime("%Y-%m-%d %H:%M:%S UTC")
 
-def send_if_chat_set(text: str):
-    """Kirim pesan ke chat user kalau USER_CHAT_ID sudah terisi."""
-    global USER_CHAT_ID
-    if USER_CHAT_ID:
-        bot.send_message(USER_CHAT_ID, text, parse_mode="Markdown")
+def send_chart(message, symbol, tf, bars):
+    """Fetch + render + kirim chart (jalan di HEAVY_POOL)."""
+    try:
+        chart = charts.get_chart(symbol, tf, bars)
+        if chart is None:
+            bot.reply_to(
+                message,
+                "Gagal membuat chart. Coba cek lagi symbol/timeframenya.\n"
+                "Contoh: `BTCUSDT 1h`",
+                parse_mode="Markdown",
+            )
+            return
 
-# =========================
-#  DATA CRYPTO via CCXT (Binance)
-# =========================
+        sent = bot.send_photo(
+            message.chat.id,
+            chart.file_id or tgtransport.upload(chart.png),
+            caption=chart_caption(symbol, tf),
+            reply_markup=chart_keyboard(symbol, tf, bars),
+        )
+        remember_file_id(chart, sent)
+        charts.prefetch_neighbors(symbol, tf, bars)
+    except Exception as e:
+        metrics.count_error("chart", e, symbol=symbol, tf=tf)
+        bot.reply_to(message, f"Error saat membuat chart: `{e}`", parse_mode="Markdown")
 
-def get_ohlcv_ccxt(symbol: str, timeframe: str, limit: int = 200):
-    """
-    Ambil candlestick crypto dari Binance (ccxt).
-    return: list [ [timestamp, open, high, low, close, volume], ... ]
-    """
-    for attempt in range(2):
-        try:
-            data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-            return data
-        except ccxt.NetworkError:
-            if attempt == 0:
-                time.sleep(2)
-                continue
-            return None
-        except ccxt.ExchangeError:
-            return None
 
 # =========================
-#  ANALISA MACD via pandas-ta
+#  THROTTLE COMMAND BERAT
 # =========================
 
-def macd_from_ohlc(ohlc):
-    if not ohlc or len(ohlc) < 50:
-        return None
+# Jatah per chat + batas global render/fetch dari command user, supaya satu chat
+# yang spam tidak membuat semua orang (dan scanner) ikut lambat.
+CHAT_LIMITER = ChatLimiter(
+    rate=float(os.getenv("HEAVY_RATE", "0.2")),
+    burst=int(os.getenv("HEAVY_BURST", "3")),
+)
+HEAVY_POOL = FairExecutor(workers=int(os.getenv("HEAVY_WORKERS", "2")), name="heavy")
 
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"]
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
-
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
-
-    if macd_col not in macd_df.columns:
-        return None
-
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
-
-    last_row = df.iloc[-1]
-    return {
-        "price": float(last_row["close"]),
-        "macd": float(last_row[macd_col]),
-        "signal": float(last_row[macds_col]),
-        "hist": float(last_row[macdh_col]),
-        "time": last_row["time"],
-    }
+status.register("queues", "heavy_pending", HEAVY_POOL.pending)
+status.register("queues", "send_backlog", SEND_PACER.backlog)
+status.register("queues", "active_chats", lambda: len(ACTIVE_CHAT_IDS))
 
-def build_signal_message(symbol, tf, res):
-    side = None
-    reason = ""
-
-    if res["macd"] > res["signal"] and res["hist"] > 0:
-        side = "BUY"
-        reason = "MACD Golden Cross, histogram > 0 (bullish momentum)."
-    elif res["macd"] < res["signal"] and res["hist"] < 0:
-        side = "SELL"
-        reason = "MACD Dead Cross, histogram < 0 (bearish momentum)."
-
-    if not side:
-        return None, None
-
-    msg = (
-        f"🚨 *CRYPTO MACD Signal*\n\n"
-        f"Exchange: *{EXCHANGE_NAME}*\n"
-        f"Pair: *{symbol}*\n"
-        f"Timeframe: *{tf}*\n"
-        f"Sinyal: *{side}*\n\n"
-        f"Price: `{res['price']:.5f}`\n"
-        f"MACD: `{res['macd']:.6f}`\n"
-        f"Signal: `{res['signal']:.6f}`\n"
-        f"Histogram: `{res['hist']:.6f}`\n"
-        f"Waktu candle: {res['time']}\n"
-        f"Alasan: {reason}\n"
-        f"Update bot: {format_time_utc()}"
-    )
-    return msg, side
 
-# =========================
-#  LOOP SCANNER SINYAL CRYPTO (AUTO)
-# =========================
-
-LAST_SIGNAL = {}  # key: (symbol,tf) -> "BUY"/"SELL"
-
-def mark_and_should_send(symbol, tf, side):
-    key = (symbol, tf)
-    last = LAST_SIGNAL.get(key)
-    if last == side:
+def admit_heavy(chat_id, fn, *args, notify=None):
+    """
+    Antrekan command berat `fn(*args)`. Kalau jatah chat habis / antrean penuh,
+    langsung balas "sibuk" (lewat `notify(text)`, default kirim pesan ke chat)
+    dan return False.
+    """
+    notify = notify or (lambda text: bot.send_message(chat_id, text))
+    wait = CHAT_LIMITER.take(chat_id)
+    if wait:
+        metrics.inc("cryptobot_throttled_total", reason="rate")
+        notify(f"⏳ Terlalu banyak request, coba lagi dalam {wait:.0f} detik.")
+        return False
+    if not HEAVY_POOL.submit(chat_id, fn, *args):
+        notify("⏳ Bot sedang sibuk, coba lagi sebentar.")
         return False
-    LAST_SIGNAL[key] = side
     return True
 
-def crypto_scanner_loop():
-    """
-    Loop utama: scan semua pair/timeframe,
-    hitung MACD, kirim sinyal kalau ada BUY/SELL baru.
-    """
-    while True:
-        try:
-            for symbol in CRYPTO_PAIRS:
-                for tf in CRYPTO_TIMEFRAMES:
-                    try:
-                        ohlc = get_ohlcv_ccxt(symbol, timeframe=tf, limit=200)
-                        if not ohlc:
-                            continue
-
-                        res = macd_from_ohlc(ohlc)
-                        if not res:
-                            continue
-
-                        msg, side = build_signal_message(symbol, tf, res)
-                        if msg and side:
-                            if mark_and_should_send(symbol, tf, side):
-                                send_if_chat_set(msg)
-                    except Exception:
-                        continue
-
-            time.sleep(60)
-        except Exception:
-            time.sleep(60)
 
 # =========================
-#  FITUR CHART /tf
+#  CHART INLINE KEYBOARD
 # =========================
 
-def plot_chart_with_macd(symbol: str, timeframe: str, limit: int = 200):
-    """
-    Ambil data dari Binance dan buat chart candlestick simple + garis MACD & Signal.
-    Return path file png.
-    """
-    ohlc = get_ohlcv_ccxt(symbol, timeframe, limit=limit)
-    if not ohlc or len(ohlc) < 50:
-        return None
-
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"]
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
-
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
+# callback_data = "chart:<symbol>:<tf>:<bars>" (maks. 64 byte di Telegram)
+CHART_CALLBACK_PREFIX = "chart:"
 
-    if macd_col not in macd_df.columns:
-        return None
 
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
+def chart_caption(symbol, tf):
+    return f"{symbol} - {tf} (Price + MACD)"
 
-    # Mulai plotting
-    plt.figure(figsize=(10, 6))
 
-    # Subplot 1: harga (close) aja biar simple (bisa dikembangkan ke candlestick utuh)
-    ax1 = plt.subplot(2, 1, 1)
-    ax1.plot(df["time"], df["close"])
-    ax1.set_title(f"{symbol} - {timeframe} Price")
-    ax1.set_ylabel("Price")
+def chart_keyboard(symbol, tf, bars=charts.CHART_BARS):
+    """
+    Tombol TF (baris atas) dan pair (bawah); tombol aktif ditandai •. Jumlah
+    candle ikut di callback, jadi pindah TF/pair tetap pakai jumlah yang diminta.
+    """
+    kb = telebot.types.InlineKeyboardMarkup()
 
-    # Subplot 2: MACD & Signal + Histogram
-    ax2 = plt.subplot(2, 1, 2)
-    ax2.plot(df["time"], df[macd_col], label="MACD")
-    ax2.plot(df["time"], df[macds_col], label="Signal")
-    ax2.bar(df["time"], df[macdh_col], width=0.01, label="Hist")  # width kecil biar nggak dempet
-    ax2.set_title("MACD 12,26,9")
-    ax2.legend(loc="best")
+    def button(label, active, sym, timeframe):
+        text = f"• {label}" if active else label
+        return telebot.types.InlineKeyboardButton(
+            text, callback_data=f"{CHART_CALLBACK_PREFIX}{sym}:{timeframe}:{bars}",
+        )
 
-    plt.tight_layout()
+    kb.row(*[button(t, t == tf, symbol, t) for t in charts.CHART_TIMEFRAMES])
+    pairs = [button(p.split("/")[0], p == symbol, p, tf) for p in CRYPTO_PAIRS]
+    for i in range(0, len(pairs), 4):
+        kb.row(*pairs[i:i + 4])
+    return kb
 
-    # Simpan ke file
-    filename = f"chart_{symbol.replace('/', '')}_{timeframe}.png"
-    plt.savefig(filename)
-    plt.close()
-    return filename
 
-# =========================
-#  TELEGRAM BOT
-# =========================
-
-@bot.message_handler(commands=["start"])
-def start_cmd(message):
-    global USER_CHAT_ID
-    USER_CHAT_ID = message.chat.id
-    text = (
-        "👋 *Crypto MACD Signal Bot*\n\n"
-        "Bot ini:\n"
-        "1️⃣ *Auto-signal MACD* 12,26,9 untuk:\n"
-        f"   Pair: {', '.join(CRYPTO_PAIRS)}\n"
-        f"   TF  : {', '.join(CRYPTO_TIMEFRAMES)}\n\n"
-        "2️⃣ *Fitur chart manual* via command:\n"
-        "   `/tf <timeframe> <symbol>`\n"
-        "   Contoh:\n"
-        "   • `/tf 1h BTCUSDT`\n"
-        "   • `/tf 4h ETHUSDT`\n"
-        "   • `/tf 30m XRPUSDT`\n"
-        "   • `/tf 1d PAXGUSDT`\n\n"
-        "Timeframe yang didukung mengikuti Binance / ccxt:\n"
-        "`1m,3m,5m,15m,30m,1h,2h,4h,6h,8h,12h,1d,3d,1w,1M`\n\n"
-        "Sinyal BUY/SELL akan otomatis dikirim ke chat ini."
-    )
-    bot.send_message(message.chat.id, text, parse_mode="Markdown")
+def remember_file_id(chart, sent):
+    # kirim berikutnya untuk chart yang sama cukup pakai file_id (tanpa upload ulang)
+    if sent is not None and getattr(sent, "photo", None):
+        chart.file_id = sent.photo[-1].file_id
 
-@bot.message_handler(func=lambda m: m.text and m.text.upper() == "CRYPTO")
-def crypto_info(message):
-    text = (
-        "📊 *CRYPTO yang dipantau auto-signal:*\n" +
-        "\n".join([f"- {p} @ {', '.join(CRYPTO_TIMEFRAMES)}" for p in CRYPTO_PAIRS])
-        + "\n\nUntuk chart manual, gunakan: `/tf <tf> <symbol>`"
-    )
-    bot.send_message(message.chat.id, text, parse_mode="Markdown")
 
-@bot.message_handler(commands=["tf"])
-def tf_chart_handler(message):
+@bot.callback_query_handler(func=lambda c: c.data and c.data.startswith(CHART_CALLBACK_PREFIX))
+def chart_navigation(call):
     """
-    Command: /tf <timeframe> <symbol>
-    Contoh: /tf 1h BTCUSDT
-            /tf 30m ETHUSDT
+    Tombol chart: ganti TF/pair dengan edit foto di pesan yang sama. Selalu lewat
+    jatah chat + HEAVY_POOL (chart hasil prefetch pun tetap satu edit ke Telegram).
     """
-    try:
-        parts = message.text.split()
-        if len(parts) != 3:
-            bot.reply_to(
-                message,
-                "Format salah.\nContoh yang benar:\n`/tf 1h BTCUSDT`\n`/tf 30m BTCUSDT`",
-                parse_mode="Markdown",
-            )
-            return
+    symbol, tf, bars = parse_chart_callback(call.data)
+    admit_heavy(
+        call.message.chat.id, switch_chart, call, symbol, tf, bars,
+        notify=lambda text: bot.answer_callback_query(call.id, text),
+    )
 
-        tf = parts[1].strip()
-        symbol_raw = parts[2].strip().upper()
 
-        # Ubah BTCUSDT → BTC/USDT
-        if symbol_raw.endswith("USDT"):
-            base = symbol_raw.replace("USDT", "")
-            symbol = f"{base}/USDT"
-        else:
-            # fallback: kalau user sudah ketik BTC/USDT
-            symbol = symbol_raw
+def parse_chart_callback(data):
+    """"chart:BTC/USDT:1h:365" -> ("BTC/USDT", "1h", 365); tombol lama tanpa bars -> CHART_BARS."""
+    parts = data[len(CHART_CALLBACK_PREFIX):].split(":")
+    bars = charts.CHART_BARS
+    if len(parts) == 3 and parts[2].isdigit():
+        bars = max(50, min(int(parts[2]), history.MAX_BARS))
+    return parts[0], parts[1], bars
 
-        bot.reply_to(message, f"⏳ Mengambil chart {symbol} timeframe {tf} dari {EXCHANGE_NAME}...")
 
-        file_path = plot_chart_with_macd(symbol, tf)
-        if not file_path:
-            bot.reply_to(message, "Gagal membuat chart. Coba timeframe lain atau cek simbolnya lagi.")
+def switch_chart(call, symbol, tf, bars=charts.CHART_BARS):
+    try:
+        chart = charts.get_chart(symbol, tf, bars)
+        if chart is None:
+            bot.answer_callback_query(call.id, "Gagal membuat chart")
             return
-
-        with open(file_path, "rb") as photo:
-            caption = f"{symbol} - {tf} (Price + MACD)"
-            bot.send_photo(message.chat.id, photo, caption=caption)
+        bot.answer_callback_query(call.id)
+
+        media = telebot.types.InputMediaPhoto(chart.file_id or tgtransport.upload(chart.png), caption=chart_caption(symbol, tf))
+        edited = bot.edit_message_media(
+            media,
+            chat_id=call.message.chat.id,
+            message_id=call.message.message_id,
+            reply_markup=chart_keyboard(symbol, tf, bars),
+        )
+        remember_file_id(chart, edited)
+        charts.prefetch_neighbors(symbol, tf, bars)
     except Exception as e:
-        bot.reply_to(message, f"Terjadi error saat membuat chart: `{e}`", parse_mode="Markdown")
+        metrics.count_error("chart", e, symbol=symbol, tf=tf)
+
 
 # =========================
-#  MAIN
+#  FLASK + WEBHOOK
 # =========================
 
-if __name__ == "__main__":
-    print("🤖 Crypto MACD Signal Bot aktif.")
-    print("   - CRYPTO only (Binance via ccxt)")
-    print("   - Auto scan & kirim sinyal ke Telegram")
-    print("   - Pair:", ", ".join(CRYPTO_PAIRS))
-    print("   - TF:", ", ".join(CRYPTO_TIMEFRAMES))
-    print("   - Fitur /tf untuk chart manual")
-
-    # Jalankan web server (keep-alive)
-    t_web = threading.Thread(target=run_web, daemon=True)
-    t_web.start()
-
-    # Jalankan scanner crypto
-    t_crypto = threading.Thread(target=crypto_scanner_loop, daemon=True)
-    t_crypto.start()
-
-    # Jalankan Telegram bot
-    bot.infinity_polling(timeout=60, long_polling_timeout=30)#  CRYPTO CONFIG (Binance via ccxt)
-# =========================
+@app.route("/", methods=["GET"])
+def index():
+    return "Crypto MACD Signal Bot - OK"
 
-EXCHANGE_NAME = "Binance"
-exchange = ccxt.binance()  # tanpa API key, public market data
 
-# Pair crypto yang akan dipantau
-CRYPTO_PAIRS = [
-    "BTC/USDT",
-    "ETH/USDT",
-    "SOL/USDT",
-    "BNB/USDT",
-]
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: proses & watchdog hidup (scanner macet diurus watchdog, bukan restart proses)."""
+    alive, body = SUPERVISOR.liveness()
+    return body, 200 if alive else 500
 
-# Timeframe Binance yang akan dicek
-CRYPTO_TIMEFRAMES = ["5m", "15m", "1h"]  # bisa "1m","5m","15m","1h","4h","1d", dll.
 
-# =========================
-#  UTIL
-# =========================
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: scanner sudah menyelesaikan putaran dan tidak sedang macet."""
+    ready, body = SUPERVISOR.readiness()
+    return body, 200 if ready else 503
 
-def format_time_utc(ts=None):
-    if ts is None:
-        ts = datetime.now(timezone.utc)
-    return ts.strftime("%Y-%m-%d %H:%M:%S UTC")
 
-def send_if_chat_set(text: str):
-    """Kirim pesan ke chat user kalau USER_CHAT_ID sudah terisi."""
-    global USER_CHAT_ID
-    if USER_CHAT_ID:
-        bot.send_message(USER_CHAT_ID, text, parse_mode="Markdown")
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return metrics.render_prometheus(), 200, {"Content-Type": metrics.CONTENT_TYPE}
 
-# =========================
-#  DATA CRYPTO via CCXT (Binance)
-# =========================
 
-def get_ohlcv_ccxt(symbol: str, timeframe: str, limit: int = 200):
+def is_admin_request():
+    token = request.headers.get("X-Admin-Token") or request.args.get("token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+@app.route("/admin/profile", methods=["GET"])
+def admin_profile():
     """
-    Ambil candlestick crypto dari Binance (ccxt).
-    return: list [ [timestamp, open, high, low, close, volume], ... ]
+    Sampling profiler semua thread, output collapsed stack (flamegraph).
+    Contoh: curl -H "X-Admin-Token: ..." "$HOST/admin/profile?seconds=10" > out.folded
     """
-    for attempt in range(2):
-        try:
-            data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-            return data
-        except ccxt.NetworkError:
-            if attempt == 0:
-                time.sleep(2)
-                continue
-            return None
-        except ccxt.ExchangeError:
-            return None
-
-# =========================
-#  ANALISA MACD via pandas-ta
-# =========================
+    if not is_admin_request():
+        return "Not Found", 404
+    try:
+        seconds = float(request.args.get("seconds", 10))
+        interval = float(request.args.get("interval", profiler.DEFAULT_INTERVAL))
+    except ValueError:
+        return "seconds/interval harus angka", 400
+    if not interval > 0:
+        return "interval harus > 0 (detik, mis. 0.005)", 400
+    try:
+        report = profiler.profile(seconds, interval)
+    except profiler.ProfilerBusy:
+        return "Profiler sedang berjalan, coba lagi nanti", 409
+    return report, 200, {"Content-Type": "text/plain; charset=utf-8"}
 
-def macd_from_ohlc(ohlc):
-    if not ohlc or len(ohlc) < 50:
-        return None
 
-    df = pd.DataFrame(
-        ohlc,
-        columns=["time", "open", "high", "low", "close", "volume"]
-    )
-    df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
-
-    macd_df = ta.macd(df["close"])
-    if macd_df is None or macd_df.empty:
-        return None
-
-    macd_col = "MACD_12_26_9"
-    macds_col = "MACDs_12_26_9"
-    macdh_col = "MACDh_12_26_9"
-
-    if macd_col not in macd_df.columns:
-        return None
-
-    df[macd_col] = macd_df[macd_col]
-    df[macds_col] = macd_df[macds_col]
-    df[macdh_col] = macd_df[macdh_col]
-
-    last_row = df.iloc[-1]
-    return {
-        "price": float(last_row["close"]),
-        "macd": float(last_row[macd_col]),
-        "signal": float(last_row[macds_col]),
-        "hist": float(last_row[macdh_col]),
-        "time": last_row["time"],
+@app.route("/admin/status", methods=["GET"])
+def admin_status():
+    """
+    Status scanner, cache & antrean dari snapshot yang dipublish scanner tiap putaran
+    (tanpa lock). JSON default; HTML dengan ?format=html.
+    """
+    if not is_admin_request():
+        return "Not Found", 404
+    snapshot = status.current()
+    if request.args.get("format") == "html":
+        return status.render_html(snapshot), 200, {"Content-Type": "text/html; charset=utf-8"}
+    if snapshot is None:
+        return {"ready": False}, 503
+    return snapshot
+
+
+@app.route("/admin/signals.csv", methods=["GET"])
+def admin_signals_csv():
+    """
+    Export jurnal sinyal. Filter opsional: symbol (BTCUSDT), tf, since/until
+    (YYYY-MM-DD atau ms). Contoh: /admin/signals.csv?symbol=BTCUSDT&since=2024-05-01
+    """
+    if not is_admin_request() or JOURNAL is None:
+        return "Not Found", 404
+    try:
+        since = journal.parse_time(request.args.get("since"))
+        until = journal.parse_time(request.args.get("until"))
+    except ValueError:
+        return "since/until: YYYY-MM-DD atau ms", 400
+    symbol = request.args.get("symbol")
+    rows = JOURNAL.query(parse_symbol(symbol) if symbol else None, request.args.get("tf"), since, until)
+    return journal.to_csv(rows), 200, {
+        "Content-Type": "text/csv; charset=utf-8",
+        "Content-Disposition": "attachment; filename=signals.csv",
     }
 
-def build_signal_message(symbol, tf, res):
-    side = None
-    reason = ""
-
-    if res["macd"] > res["signal"] and res["hist"] > 0:
-        side = "BUY"
-        reason = "MACD Golden Cross, histogram > 0 (bullish momentum)."
-    elif res["macd"] < res["signal"] and res["hist"] < 0:
-        side = "SELL"
-        reason = "MACD Dead Cross, histogram < 0 (bearish momentum)."
-
-    if not side:
-        return None, None
-
-    msg = (
-        f"🚨 *CRYPTO MACD Signal*\n\n"
-        f"Exchange: *{EXCHANGE_NAME}*\n"
-        f"Pair: *{symbol}*\n"
-        f"Timeframe: *{tf}*\n"
-        f"Sinyal: *{side}*\n\n"
-        f"Price: `{res['price']:.5f}`\n"
-        f"MACD: `{res['macd']:.6f}`\n"
-        f"Signal: `{res['signal']:.6f}`\n"
-        f"Histogram: `{res['hist']:.6f}`\n"
-        f"Waktu candle: {res['time']}\n"
-        f"Alasan: {reason}\n"
-        f"Update bot: {format_time_utc()}"
-    )
-    return msg, side
-
-# =========================
-#  LOOP SCANNER SINYAL CRYPTO
-# =========================
 
-# Untuk menghindari spam, simpan sinyal terakhir (per pair,tf) → "BUY"/"SELL"
-LAST_SIGNAL = {}  # key: (symbol,tf) -> "BUY"/"SELL"
+def webhook():
+    """Update dari Telegram (route dipasang hanya di mode webhook)."""
+    if WEBHOOK_SECRET and not hmac.compare_digest(
+        request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), WEBHOOK_SECRET
+    ):
+        return "Forbidden", 403
+    if request.headers.get("content-type") == "application/json":
+        json_str = request.get_data().decode("utf-8")
+        update = telebot.types.Update.de_json(json_str)
+        bot.process_new_updates([update])
+        return "OK", 200
+    else:
+        return "Unsupported Media Type", 415
 
-def mark_and_should_send(symbol, tf, side):
-    key = (symbol, tf)
-    last = LAST_SIGNAL.get(key)
-    if last == side:
-        return False
-    LAST_SIGNAL[key] = side
-    return True
 
-def crypto_scanner_loop():
-    """
-    Loop utama: scan semua pair/timeframe,
-    hitung MACD, kirim sinyal kalau ada BUY/SELL baru.
-    """
-    while True:
-        try:
-            for symbol in CRYPTO_PAIRS:
-                for tf in CRYPTO_TIMEFRAMES:
-                    try:
-                        ohlc = get_ohlcv_ccxt(symbol, timeframe=tf, limit=200)
-                        if not ohlc:
-                            continue
-
-                        res = macd_from_ohlc(ohlc)
-                        if not res:
-                            continue
-
-                        msg, side = build_signal_message(symbol, tf, res)
-                        if msg and side:
-                            if mark_and_should_send(symbol, tf, side):
-                                send_if_chat_set(msg)
-                    except Exception:
-                        # Jangan matikan loop hanya karena 1 error
-                        continue
-
-            # jeda antar scan (detik)
-            time.sleep(60)
-        except Exception:
-            time.sleep(60)
+def set_webhook():
+    bot.remove_webhook()
+    time.sleep(1)
+    bot.set_webhook(url=WEBHOOK_URL, secret_token=WEBHOOK_SECRET or None)
 
-# =========================
-#  TELEGRAM BOT (sederhana)
-# =========================
 
-@bot.message_handler(commands=["start"])
-def start_cmd(message):
-    global USER_CHAT_ID
-    USER_CHAT_ID = message.chat.id
-    text = (
-        "👋 *Crypto MACD Signal Bot*\n\n"
-        "Bot ini akan *otomatis* memantau MACD 12,26,9 pada:\n"
-        f"Pair: {', '.join(CRYPTO_PAIRS)}\n"
-        f"Timeframe: {', '.join(CRYPTO_TIMEFRAMES)}\n\n"
-        "Jika ada sinyal MACD:\n"
-        "- Golden Cross + histogram > 0 → *BUY*\n"
-        "- Dead Cross + histogram < 0 → *SELL*\n\n"
-        "Sinyal akan langsung dikirim ke chat ini.\n\n"
-        "Ketik `CRYPTO` kapan saja untuk melihat daftar pair & timeframe yang dipantau."
-    )
-    bot.send_message(message.chat.id, text, parse_mode="Markdown")
+def run_web():
+    app.run(host="0.0.0.0", port=PORT, threaded=True, use_reloader=False)
 
-@bot.message_handler(func=lambda m: m.text and m.text.upper() == "CRYPTO")
-def crypto_info(message):
-    text = (
-        "📊 *CRYPTO yang dipantau:*\n" +
-        "\n".join([f"- {p} @ {', '.join(CRYPTO_TIMEFRAMES)}" for p in CRYPTO_PAIRS])
-    )
-    bot.send_message(message.chat.id, text, parse_mode="Markdown")
 
 # =========================
 #  MAIN
 # =========================
 
-if __name__ == "__main__":
-    print("🤖 Crypto MACD Signal Bot aktif.")
-    print("   - CRYPTO only (Binance via ccxt)")
-    print("   - Auto scan & kirim sinyal ke Telegram")
+def enable_handlers():
+    """Nyalakan worker pool handler telebot (sekali)."""
+    if not bot.threaded:
+        bot.worker_pool = telebot.util.ThreadPool(bot, num_threads=HANDLER_THREADS)
+        bot.threaded = True
 
-    # Jalankan web server (keep-alive)
-    t_web = threading.Thread(target=run_web, daemon=True)
-    t_web.start()
 
-    # Jalankan scanner crypto
-    t_crypto = threading.Thread(target=crypto_scanner_loop, daemon=True)
-    t_crypto.start()
+def start(mode):
+    """
+    Rakit komponen untuk `mode` lalu jalankan scanner (diawasi watchdog).
+    Tidak memblok: loop utama (polling / web / tunggu) diurus pemanggil.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode tidak dikenal: {mode} (pilihan: {', '.join(MODES)})")
+    jsonlog.setup()
+    log.info("starting", extra={"mode": mode, "webhook_url": WEBHOOK_URL if mode == "webhook" else None})
+
+    # Thread yang bisa memegang koneksi Telegram bersamaan: scanner, plus worker
+    # command berat & worker handler kalau handler aktif, plus long poll
+    # getUpdates (memegang satu koneksi ~timeout poll) di mode polling. Route
+    # Flask tidak mengirim sendiri: update webhook diserahkan ke worker handler.
+    # Pool koneksi tgtransport (pool_block) disesuaikan dengan angka ini.
+    senders = 1
+    if mode != "worker-only":
+        enable_handlers()
+        senders += HEAVY_POOL.workers + HANDLER_THREADS
+    if mode == "polling":
+        senders += 1
+    tgtransport.install(pool_size=senders)
+
+    if mode == "webhook":
+        if not WEBHOOK_HOST:
+            raise ValueError("WEBHOOK_HOST belum diset untuk mode webhook.")
+        app.add_url_rule(WEBHOOK_PATH, "webhook", webhook, methods=["POST"])
+        set_webhook()
+    elif mode == "polling":
+        # webhook yang masih terpasang membuat getUpdates ditolak Telegram
+        bot.remove_webhook()
+
+    start_scanner()
+
+
+def create_app():
+    """Factory untuk gunicorn (mode webhook). Pakai 1 worker, tanpa --preload."""
+    start("webhook")
+    return app
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Crypto MACD Signal Bot")
+    p.add_argument("mode", nargs="?", default=BOT_MODE, choices=MODES)
+    p.add_argument("--no-web", action="store_true",
+                   help="polling / worker-only: jangan jalankan web (health, metrics, admin)")
+    args = p.parse_args(argv)
+
+    start(args.mode)
+    if args.mode == "polling":
+        if not args.no_web:
+            threading.Thread(target=run_web, name="web", daemon=True).start()
+        bot.infinity_polling(timeout=60, long_polling_timeout=30)
+    elif args.mode == "webhook" or not args.no_web:
+        run_web()
+    else:
+        threading.Event().wait()  # worker-only tanpa web: cukup scanner
 
-    # Jalankan Telegram bot
-    bot.infinity_polling(timeout=60, long_polling_timeout=30)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Instrumentasi ringan untuk hot path: counter, gauge & histogram dengan bucket tetap,
+di-render ke format teks Prometheus untuk route /metrics.
+
+Catat metrik cukup murah (bisect + increment di bawah lock kecil), jadi aman
+dipanggil per combo di scanner.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Bucket default (detik) – cukup untuk fetch network sampai render chart
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> float
+_histograms = {}   # (name, labels) -> Histogram
+_gauges = {}       # (name, labels) -> float
+_help = {}         # name -> (type, help)
+
+# Error yang dihitung di sini juga di-log (JSON, lewat antrean; lihat jsonlog.py).
+# Tanpa jsonlog.setup() logger "cryptobot" diam.
+log = logging.getLogger("cryptobot")
+log.addHandler(logging.NullHandler())
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count", "lock")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # slot terakhir = +Inf
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.total += value
+            self.count += 1
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def describe(name, kind, text):
+    _help[name] = (kind, text)
+
+
+def inc(name, value=1, **labels):
+    key = (name, _labels_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    key = (name, _labels_key(labels))
+    with _lock:
+        _gauges[key] = value
+
+
+def histogram(name, buckets=DEFAULT_BUCKETS, **labels):
+    key = (name, _labels_key(labels))
+    h = _histograms.get(key)
+    if h is None:
+        with _lock:
+            h = _histograms.setdefault(key, Histogram(buckets))
+    return h
+
+
+def observe(name, value, **labels):
+    histogram(name, **labels).observe(value)
+
+
+@contextmanager
+def timer(stage):
+    """Ukur durasi satu stage (fetch, indicator, message, send, render, ...)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("cryptobot_stage_seconds", time.perf_counter() - t0, stage=stage)
+
+
+def count_error(stage, exc, **context):
+    """Hitung error per stage/tipe dan log dengan konteks (symbol, tf, ...)."""
+    inc("cryptobot_errors_total", stage=stage, type=type(exc).__name__)
+    # error exchange/network (ccxt) cukup satu baris; selain itu sertakan traceback
+    expected = type(exc).__module__.startswith("ccxt") or isinstance(exc, OSError)
+    log.warning(
+        "%s: %s", type(exc).__name__, exc,
+        exc_info=None if expected else exc,
+        extra={"stage": stage, "error": type(exc).__name__, **context},
+    )
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _gauges.clear()
+
+
+# =========================
+#  EXPOSITION (Prometheus text format 0.0.4)
+# =========================
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def _header(lines, seen, name, default_kind):
+    if name in seen:
+        return
+    seen.add(name)
+    kind, text = _help.get(name, (default_kind, ""))
+    if text:
+        lines.append(f"# HELP {name} {text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render_prometheus():
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted(_histograms.items(), key=lambda kv: kv[0])
+
+    lines, seen = [], set()
+    for (name, labels), value in counters:
+        _header(lines, seen, name, "counter")
+        lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    for (name, labels), value in gauges:
+        _header(lines, seen, name, "gauge")
+        lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    for (name, labels), h in histograms:
+        _header(lines, seen, name, "histogram")
+        with h.lock:
+            counts, total, count = list(h.counts), h.total, h.count
+        cumulative = 0
+        for bound, c in zip(h.bounds + (float("inf"),), counts):
+            cumulative += c
+            le = ("le", _fmt_value(bound) if bound != float("inf") else "+Inf")
+            lines.append(f"{name}_bucket{_fmt_labels(labels, le)} {cumulative}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total!r}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+
+    return "\n".join(lines) + "\n"
+
+
+describe("cryptobot_stage_seconds", "histogram", "Durasi per stage (fetch, indicator, message, send, render).")
+describe("cryptobot_scan_seconds", "histogram", "Durasi satu putaran scan semua pair/timeframe.")
+describe("cryptobot_errors_total", "counter", "Jumlah error per stage dan tipe exception.")
+describe("cryptobot_rate_limit_total", "counter", "Jumlah response rate-limit (429/418) dari exchange.")
+describe("cryptobot_cache_hits_total", "counter", "Jumlah cache hit per cache.")
+describe("cryptobot_cache_misses_total", "counter", "Jumlah cache miss per cache.")
+describe("cryptobot_signals_total", "counter", "Jumlah sinyal baru (langsung maupun lewat digest).")
+describe("cryptobot_exchange_requests_total", "counter", "Jumlah request ke exchange.")
+describe("cryptobot_scan_skipped_total", "counter", "Combo yang dilewati scanner (misal belum ada candle close baru).")
+describe("cryptobot_cache_coalesced_total", "counter", "Request yang menunggu fetch yang sama yang sedang berjalan (single-flight).")
+describe("cryptobot_cache_flight_timeouts_total", "counter", "Caller yang berhenti menunggu fetch orang lain (macet) dan fetch sendiri.")
+describe("cryptobot_worker_restarts_total", "counter", "Worker (scanner) yang diganti watchdog, per alasan (stalled / died).")
+describe("cryptobot_worker_heartbeat_age_seconds", "gauge", "Detik sejak heartbeat terakhir worker.")
+describe("cryptobot_circuit_open", "gauge", "1 kalau circuit breaker venue sedang open (request ke exchange ditahan).")
+describe("cryptobot_circuit_trips_total", "counter", "Berapa kali circuit breaker terbuka, per venue dan alasan.")
+describe("cryptobot_circuit_rejected_total", "counter", "Request yang ditolak langsung karena circuit open.")
+describe("cryptobot_digest_signals_total", "counter", "Sinyal yang dikirim lewat pesan digest.")
+describe("cryptobot_telegram_upload_bytes_total", "counter", "Byte body upload (foto) yang di-stream ke Telegram.")
+describe("cryptobot_journal_rows_total", "counter", "Sinyal yang tertulis ke jurnal.")
+describe("cryptobot_journal_dropped_total", "counter", "Sinyal yang tidak dicatat karena antrean jurnal penuh.")
+describe("cryptobot_tracked_signals", "gauge", "Sinyal terkirim yang masih dilacak performanya.")
+describe("cryptobot_tracked_closed_total", "counter", "Sinyal yang selesai dilacak, per timeframe dan menang/kalah.")
+describe("cryptobot_send_wait_seconds_total", "counter", "Total waktu menunggu limit kirim Telegram (global / per chat).")
+describe("cryptobot_alerts_fired_total", "counter", "Alert harga yang kena dan dikirim ke chat.")
+describe("cryptobot_throttled_total", "counter", "Command berat yang ditolak (rate = jatah chat habis, busy = antrean penuh).")
+describe("cryptobot_heavy_queue_depth", "gauge", "Jumlah command berat yang sedang antre.")
+describe("cryptobot_signals_suppressed_total", "counter", "Sinyal yang tidak dikirim karena hanya mengikuti sinyal leader (korelasi tinggi).")
+describe("cryptobot_corr_symbols", "gauge", "Jumlah pair di matriks korelasi per timeframe.")
+describe("cryptobot_log_dropped_total", "counter", "Record log yang dibuang karena antrean log penuh.")
+describe("cryptobot_log_sampled_out_total", "counter", "Event log DEBUG yang tidak diteruskan karena sampling.")
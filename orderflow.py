@@ -0,0 +1,195 @@
+"""
+Konfirmasi order book & trade flow untuk sinyal cross (opsional, ORDERFLOW=1).
+
+Hanya combo yang baru cross yang diperkaya: untuk symbolnya diambil snapshot
+depth (`fetch_order_book`) dan trade terakhir (`fetch_trades`) secara paralel,
+lalu dihitung:
+
+- imbalance bid/ask: (volume bid - volume ask) / total, dalam ±DEPTH_BAND dari mid
+- delta trade: (volume beli taker - volume jual taker) / total, dalam FLOW_WINDOW
+
+Snapshot di-cache sebentar (FLOW_TTL, jam exchange) dengan jumlah entry terbatas,
+jadi beberapa TF satu symbol yang cross bersamaan cukup satu fetch. Putaran scan
+tanpa sinyal tidak menambah request sama sekali.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+ORDERFLOW_ENABLED = os.getenv("ORDERFLOW", "0") == "1"
+
+DEPTH_LIMIT = 100        # level per sisi (Binance: limit 100 = bobot 5)
+DEPTH_BAND = 0.01        # hanya level dalam ±1% dari mid
+TRADES_LIMIT = 500
+FLOW_WINDOW = 5 * 60     # detik trade terakhir yang dihitung
+FLOW_TTL = 15            # detik snapshot dianggap segar
+MAX_SNAPSHOTS = 128
+FLOW_WORKERS = 4
+FLOW_TIMEOUT = 10        # detik maks. menunggu snapshot sebelum sinyal dikirim apa adanya
+
+_cache = OrderedDict()   # symbol -> (diambil pada (detik), Future)
+_lock = threading.Lock()
+# _fetch jalan di _pool dan menunggu fetch_trades; fetch_trades harus di pool
+# terpisah, kalau tidak semua worker bisa menunggu future yang tidak dapat thread
+_pool = None
+_trades_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(FLOW_WORKERS, thread_name_prefix="orderflow")
+    return _pool
+
+
+def _get_trades_pool():
+    global _trades_pool
+    if _trades_pool is None:
+        _trades_pool = ThreadPoolExecutor(FLOW_WORKERS, thread_name_prefix="orderflow-trades")
+    return _trades_pool
+
+
+def book_imbalance(book, band=DEPTH_BAND):
+    """Imbalance -1..1 dari order book ccxt ({"bids": [[price, amount], ...], "asks": ...})."""
+    bids, asks = book.get("bids") or [], book.get("asks") or []
+    if not bids or not asks:
+        return None
+    mid = (bids[0][0] + asks[0][0]) / 2
+    low, high = mid * (1 - band), mid * (1 + band)
+    bid_vol = sum(p * a for p, a, *_ in bids if p >= low)
+    ask_vol = sum(p * a for p, a, *_ in asks if p <= high)
+    total = bid_vol + ask_vol
+    return (bid_vol - ask_vol) / total if total else None
+
+
+def trade_delta(trades, since_ms):
+    """(delta -1..1, volume beli, volume jual) dalam quote dari trade ccxt sejak `since_ms`."""
+    buy = sell = 0.0
+    for t in trades:
+        if (t.get("timestamp") or 0) < since_ms:
+            continue
+        cost = t.get("cost") or (t.get("price") or 0) * (t.get("amount") or 0)
+        if t.get("side") == "buy":
+            buy += cost
+        elif t.get("side") == "sell":
+            sell += cost
+    total = buy + sell
+    return ((buy - sell) / total if total else None), buy, sell
+
+
+def _fetch(symbol, now_ms):
+    """Ambil depth + trade paralel dan hitung ringkasannya. None kalau gagal."""
+    import ccxt
+    from scanner import get_breaker, get_exchange, retry_after_seconds
+
+    ex = get_exchange()
+    breaker = get_breaker()
+    if not breaker.allow():
+        return None
+    # hasil selalu dicatat ke breaker (lihat circuit.py: probe half-open)
+    try:
+        with metrics.timer("orderflow"):
+            # trade di thread lain, depth di thread ini -> dua request bersamaan
+            trades = _get_trades_pool().submit(ex.fetch_trades, symbol, None, TRADES_LIMIT)
+            book = ex.fetch_order_book(symbol, DEPTH_LIMIT)
+            trades = trades.result()
+        metrics.inc("cryptobot_exchange_requests_total", 2)
+        breaker.record_success()
+    except ccxt.BaseError as e:
+        metrics.count_error("orderflow", e, symbol=symbol)
+        if isinstance(e, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+            metrics.inc("cryptobot_rate_limit_total")
+            kind = "rate_limit" if isinstance(e, ccxt.RateLimitExceeded) else "ban"
+            breaker.record_failure(kind, retry_after_seconds(ex))
+        elif isinstance(e, ccxt.NetworkError):
+            breaker.record_failure("network")
+        else:
+            # error request (symbol salah, dsb.): exchange menjawab, venue sehat
+            breaker.record_success()
+        return None
+    except Exception:
+        breaker.record_failure("network")
+        raise
+
+    delta, buy, sell = trade_delta(trades, now_ms - FLOW_WINDOW * 1000)
+    return {"imbalance": book_imbalance(book), "delta": delta, "buy": buy, "sell": sell}
+
+
+def prefetch(symbol):
+    """
+    Mulai ambil snapshot `symbol` di background (atau pakai yang masih segar).
+    Return Future berisi dict flow / None.
+    """
+    from scanner import get_exchange
+
+    now_ms = get_exchange().milliseconds()
+    now = now_ms / 1000
+    with _lock:
+        cached = _cache.get(symbol)
+        if cached is not None and now - cached[0] < FLOW_TTL:
+            _cache.move_to_end(symbol)
+            metrics.inc("cryptobot_cache_hits_total", cache="orderflow")
+            return cached[1]
+        metrics.inc("cryptobot_cache_misses_total", cache="orderflow")
+        future = _get_pool().submit(_fetch, symbol, now_ms)
+        _cache[symbol] = (now, future)
+        _cache.move_to_end(symbol)
+        while len(_cache) > MAX_SNAPSHOTS:
+            _cache.popitem(last=False)
+    return future
+
+
+def resolve(future):
+    """Hasil prefetch; None kalau gagal / kelamaan (sinyal tetap dikirim)."""
+    try:
+        return future.result(timeout=FLOW_TIMEOUT)
+    except Exception as e:
+        metrics.count_error("orderflow", e)
+        return None
+
+
+def confirms(flow, side):
+    """True/False kalau imbalance & delta searah / berlawanan dengan sinyal, None kalau campur."""
+    sign = 1 if side == "BUY" else -1
+    votes = [v * sign > 0 for v in (flow.get("imbalance"), flow.get("delta")) if v]
+    if not votes:
+        return None
+    if all(votes):
+        return True
+    if not any(votes):
+        return False
+    return None
+
+
+def _pct(v):
+    return "n/a" if v is None else f"{v * 100:+.1f}%"
+
+
+def _quote(v):
+    for unit, div in (("M", 1e6), ("K", 1e3)):
+        if v >= div:
+            return f"{v / div:.1f}{unit}"
+    return f"{v:.0f}"
+
+
+def format_flow(flow, side):
+    """Baris tambahan untuk pesan sinyal."""
+    verdict = {True: "✅ searah sinyal", False: "⚠️ berlawanan dengan sinyal", None: "➖ campuran"}
+    return (
+        f"Order book (±{DEPTH_BAND * 100:g}%): `{_pct(flow.get('imbalance'))}` bid/ask\n"
+        f"Trade flow ({FLOW_WINDOW // 60}m): `{_pct(flow.get('delta'))}` "
+        f"(beli {_quote(flow['buy'])} / jual {_quote(flow['sell'])})\n"
+        f"Flow: {verdict[confirms(flow, side)]}\n"
+    )
+
+
+def cached():
+    return len(_cache)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,90 @@
+"""
+Sampling profiler on-demand untuk semua thread (scanner, handler chart, web).
+
+Tidak ada hook yang terpasang saat profiler mati (zero overhead). Saat dipanggil,
+satu loop sampling membaca `sys._current_frames()` tiap `interval` detik selama
+`seconds` detik, lalu hasilnya dikembalikan dalam format collapsed stack:
+
+    <thread>;<frame paling luar>;...;<frame paling dalam> <jumlah sampel>
+
+Format ini bisa langsung dipakai flamegraph.pl / speedscope / inferno.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.005  # 200 Hz
+MIN_INTERVAL = 0.001      # 1 kHz; lebih rapat = loop sampling makan satu core
+MAX_SECONDS = 25          # di bawah timeout default worker gunicorn (30 detik)
+
+_running = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Profiler lain sedang berjalan."""
+
+
+def _frame_label(code, labels):
+    label = labels.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)
+        label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        label = label.replace(";", ":")
+        labels[code] = label
+    return label
+
+
+def sample(seconds, interval=DEFAULT_INTERVAL):
+    """
+    Sampling semua thread (kecuali thread pemanggil) selama `seconds` detik.
+    Return Counter {(thread, frame1, ..., frameN): jumlah_sampel}.
+    """
+    seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+    interval = max(MIN_INTERVAL, min(float(interval), seconds))
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy("profiler sedang berjalan")
+
+    try:
+        me = threading.get_ident()
+        labels = {}
+        stacks = Counter()
+        names = {}
+        next_names = 0.0
+        deadline = time.monotonic() + seconds
+
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= next_names:
+                names = {t.ident: t.name.replace(";", ":") for t in threading.enumerate()}
+                next_names = now + 1.0
+
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                stack.append(names.get(tid, f"thread-{tid}"))
+                stacks[tuple(reversed(stack))] += 1
+
+            time.sleep(interval)
+        return stacks
+    finally:
+        _running.release()
+
+
+def collapsed(stacks):
+    """Format Counter hasil `sample()` ke teks collapsed stack (paling sering di atas)."""
+    return "".join(
+        f"{';'.join(stack)} {count}\n"
+        for stack, count in stacks.most_common()
+    )
+
+
+def profile(seconds, interval=DEFAULT_INTERVAL):
+    return collapsed(sample(seconds, interval))
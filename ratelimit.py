@@ -0,0 +1,179 @@
+"""
+Pembatas laju: kirim pesan Telegram dan command berat dari user.
+
+Limit Bot API: kira-kira 30 pesan/detik total dan 1 pesan/detik per chat.
+`Pacer.wait(chat_id)` memesan slot kirim berikutnya (global + per chat) lalu
+tidur sampai slot itu tiba, jadi aman dipanggil dari beberapa thread.
+
+Command berat (chart = fetch + render matplotlib) dibatasi token bucket per chat
+(`ChatLimiter`) dan dijalankan di `FairExecutor` (batas global + antrean adil
+antar chat).
+"""
+import threading
+import time
+from collections import deque
+
+import metrics
+
+GLOBAL_RATE = 30.0        # pesan per detik, semua chat
+PER_CHAT_INTERVAL = 1.0   # detik antar pesan ke chat yang sama
+MAX_TRACKED_CHATS = 10_000
+
+
+class Pacer:
+    def __init__(self, global_rate=GLOBAL_RATE, per_chat_interval=PER_CHAT_INTERVAL,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.global_interval = 1.0 / global_rate
+        self.per_chat_interval = per_chat_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._next_global = 0.0
+        self._next_chat = {}  # chat_id -> waktu paling awal boleh kirim lagi
+        self._lock = threading.Lock()
+
+    def reserve(self, chat_id):
+        """Pesan slot kirim untuk `chat_id`. Return detik yang harus ditunggu."""
+        with self._lock:
+            now = self.clock()
+            at = max(now, self._next_global, self._next_chat.get(chat_id, 0.0))
+            self._next_global = at + self.global_interval
+            self._next_chat[chat_id] = at + self.per_chat_interval
+            if len(self._next_chat) > MAX_TRACKED_CHATS:
+                self._next_chat = {c: t for c, t in self._next_chat.items() if t > now}
+        return at - now
+
+    def backlog(self):
+        """Perkiraan jumlah kiriman yang sudah memesan slot tapi belum jalan."""
+        ahead = self._next_global - self.clock()
+        return max(0, round(ahead / self.global_interval))
+
+    def wait(self, chat_id):
+        delay = self.reserve(chat_id)
+        if delay > 0:
+            metrics.inc("cryptobot_send_wait_seconds_total", delay)
+            self.sleep(delay)
+
+
+# =========================
+#  COMMAND BERAT (chart / render / fetch)
+# =========================
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate      # token per detik
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now):
+        """Ambil 1 token. Return 0 kalau berhasil, selain itu detik sampai token berikutnya."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ChatLimiter:
+    """Token bucket per chat (default 1 command berat per 5 detik, burst 3)."""
+
+    def __init__(self, rate=0.2, burst=3, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, chat_id):
+        with self._lock:
+            now = self.clock()
+            bucket = self._buckets.get(chat_id)
+            if bucket is None:
+                if len(self._buckets) > MAX_TRACKED_CHATS:
+                    # bucket yang sudah penuh lagi sama saja dengan bucket baru
+                    self._buckets = {
+                        c: b for c, b in self._buckets.items()
+                        if b.tokens + (now - b.updated) * b.rate < b.burst
+                    }
+                bucket = self._buckets[chat_id] = TokenBucket(self.rate, self.burst, now)
+            return bucket.take(now)
+
+
+class FairExecutor:
+    """
+    Worker pool kecil untuk command berat dengan antrean per chat.
+
+    - Maksimal `workers` job jalan bersamaan (batas global render/fetch),
+      supaya thread scanner tidak kelaparan.
+    - Job diambil round-robin antar chat: chat yang spam tidak bisa menyalip
+      chat lain. Per chat paling banyak `max_per_chat` job (antre + jalan).
+    - `submit` tidak pernah menunggu: kalau antrean penuh langsung return False
+      (handler cukup balas "sibuk").
+    """
+
+    def __init__(self, workers=2, max_pending=32, max_per_chat=2, name="heavy"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_per_chat = max_per_chat
+        self.name = name
+        self._queues = {}  # chat_id -> deque job (urutan dict = giliran round-robin)
+        self._load = {}    # chat_id -> job antre + jalan
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def submit(self, chat_id, fn, *args):
+        with self._cond:
+            if self._pending >= self.max_pending or self._load.get(chat_id, 0) >= self.max_per_chat:
+                metrics.inc("cryptobot_throttled_total", reason="busy")
+                return False
+            queue = self._queues.get(chat_id)
+            if queue is None:
+                queue = self._queues[chat_id] = deque()
+            queue.append((fn, args))
+            self._load[chat_id] = self._load.get(chat_id, 0) + 1
+            self._pending += 1
+            metrics.set_gauge("cryptobot_heavy_queue_depth", self._pending, pool=self.name)
+            if len(self._threads) < self.workers:
+                t = threading.Thread(target=self._run, name=f"{self.name}-{len(self._threads)}", daemon=True)
+                self._threads.append(t)
+                t.start()
+            self._cond.notify()
+        return True
+
+    def _next_job(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            chat_id = next(iter(self._queues))
+            queue = self._queues.pop(chat_id)
+            fn, args = queue.popleft()
+            if queue:
+                self._queues[chat_id] = queue  # sisa antrean chat ini pindah ke belakang
+            self._pending -= 1
+            metrics.set_gauge("cryptobot_heavy_queue_depth", self._pending, pool=self.name)
+            return chat_id, fn, args
+
+    def _done(self, chat_id):
+        with self._cond:
+            load = self._load.get(chat_id, 1) - 1
+            if load:
+                self._load[chat_id] = load
+            else:
+                self._load.pop(chat_id, None)
+
+    def _run(self):
+        while True:
+            chat_id, fn, args = self._next_job()
+            try:
+                fn(*args)
+            except Exception as e:
+                metrics.count_error(self.name, e)
+            finally:
+                self._done(chat_id)
+
+    def pending(self):
+        return self._pending
@@ -0,0 +1,117 @@
+"""
+Resampling multi-timeframe dari satu feed base timeframe per symbol.
+
+Scanner cukup fetch satu series base (misal 5m) per symbol; candle 15m/30m/1h/4h/1d
+dibangun dengan agregasi bar base (open pertama, high max, low min, close terakhir,
+volume dijumlah) dengan batas bucket yang sama seperti Binance (UTC epoch, 1w mulai
+Senin 00:00 UTC). History panjang TF tinggi tetap diambil sekali lewat fetch
+langsung (seed), setelah itu di-update incremental dari base.
+"""
+from bisect import bisect_left
+
+from candles import timeframe_ms
+
+# Candle 1w Binance mulai Senin 00:00 UTC; epoch (1970-01-01) hari Kamis
+_BUCKET_OFFSET_MS = {"w": 4 * 86_400_000}
+
+DAY_MS = 86_400_000
+MAX_FETCH_LIMIT = 1000  # batas limit fetch_ohlcv Binance
+
+
+def bucket_start(ts, tf):
+    tf_ms = timeframe_ms(tf)
+    offset = _BUCKET_OFFSET_MS.get(tf[-1], 0)
+    return (ts - offset) // tf_ms * tf_ms + offset
+
+
+def can_resample(base_tf, tf):
+    """TF bisa dibangun dari base kalau kelipatan base dan batasnya sejajar hari UTC."""
+    if tf[-1] == "M":
+        return False  # panjang bulan tidak tetap -> fetch langsung
+    base_ms, tf_ms = timeframe_ms(base_tf), timeframe_ms(tf)
+    if tf_ms <= base_ms or tf_ms % base_ms:
+        return False
+    return DAY_MS % tf_ms == 0 or tf in ("1d", "1w")
+
+
+def aggregate(base, tf, since_ts):
+    """
+    Bar `tf` dari series base, mulai bucket yang memuat `since_ts`.
+    Hanya bucket yang tercakup penuh oleh base (base mulai <= awal bucket) yang dibuat.
+    Return list rows format ccxt.
+    """
+    if not len(base):
+        return []
+
+    tf_ms = timeframe_ms(tf)
+    first = bucket_start(since_ts, tf)
+    if base.time[0] > first:
+        first = bucket_start(base.time[0], tf)
+        if first < base.time[0]:
+            first += tf_ms
+
+    rows = []
+    current = None
+    for j in range(bisect_left(base.time, first), len(base)):
+        b = bucket_start(base.time[j], tf)
+        if current is None or b != current[0]:
+            current = [b, base.open[j], base.high[j], base.low[j], base.close[j], base.volume[j]]
+            rows.append(current)
+        else:
+            if base.high[j] > current[2]:
+                current[2] = base.high[j]
+            if base.low[j] < current[3]:
+                current[3] = base.low[j]
+            current[4] = base.close[j]
+            current[5] += base.volume[j]
+    return rows
+
+
+def history_bars(base_tf, timeframes, minimum=0):
+    """Jumlah bar base yang perlu disimpan supaya bucket TF tertinggi tercakup penuh."""
+    base_ms = timeframe_ms(base_tf)
+    need = [2 * timeframe_ms(tf) // base_ms for tf in timeframes if can_resample(base_tf, tf)]
+    return min(MAX_FETCH_LIMIT, max(need + [minimum]))
+
+
+class SymbolFeed:
+    """Series base satu symbol + cara membangun TF tinggi darinya."""
+
+    __slots__ = ("symbol", "base_tf", "base")
+
+    def __init__(self, symbol, base_tf, base):
+        self.symbol = symbol
+        self.base_tf = base_tf
+        self.base = base  # Candles base TF
+
+    def fetch_limit(self, now_ms):
+        """Limit fetch base: seed penuh kalau kosong, selain itu cukup bar baru + overlap."""
+        if not len(self.base):
+            return self.base.capacity
+        missing = (now_ms - self.base.time[-1]) // timeframe_ms(self.base_tf) + 2
+        return int(min(MAX_FETCH_LIMIT, max(2, missing)))
+
+    def update_base(self, rows):
+        """Merge rows base baru. Return waktu bar base paling awal yang berubah (atau None)."""
+        if not rows:
+            return None
+        self.base.update(rows, step_ms=timeframe_ms(self.base_tf))
+        return int(rows[0][0])
+
+    def refresh(self, candles, tf, since_ts):
+        """
+        Update series `tf` dari base mulai `since_ts`. Series harus sudah di-seed
+        dengan history (fetch langsung). Kalau hasil agregasi tidak bersambung
+        dengan series (base sempat gap), series dikosongkan supaya di-seed ulang.
+        """
+        if since_ts is None:
+            return candles
+        rows = aggregate(self.base, tf, since_ts)
+        if not rows:
+            return candles
+        tf_ms = timeframe_ms(tf)
+        if not len(candles) or rows[0][0] > candles.time[-1] + tf_ms:
+            candles.clear()
+            return candles
+        candles.update(rows, step_ms=tf_ms)
+        return candles
@@ -0,0 +1,882 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import indicators
+import metrics
+import orderflow
+import status
+from alerts import AlertBook, format_alert
+from circuit import CircuitBreaker, backoff_delay
+from correlation import CORR_MODE, CorrelationBook
+from digest import Digest
+from fetch_cache import OHLCVCache
+from journal import JOURNAL_ENABLED, SignalJournal
+from candles import Candles, timeframe_ms
+from resample import SymbolFeed, can_resample, history_bars
+from supervisor import Superseded
+from tracker import SignalTracker, strategy_of
+
+log = logging.getLogger("cryptobot.scanner")
+
+# ccxt sengaja di-import lazy (di dalam fungsi):
+# worker web yang cuma jawab health check / webhook tidak perlu bayar
+# beberapa detik import + puluhan MB memori.
+
+# =========================
+#  CRYPTO CONFIG (Binance via ccxt)
+# =========================
+
+EXCHANGE_NAME = "Binance"
+exchange = None  # client ccxt, dibuat saat pertama dipakai (lihat get_exchange)
+_exchange_lock = threading.Lock()
+
+# Rekam / putar ulang traffic exchange untuk load test offline (lihat tape.py)
+EXCHANGE_MODE = os.getenv("EXCHANGE_MODE", "live")
+EXCHANGE_TAPE = os.getenv("EXCHANGE_TAPE", "data/exchange.tape")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1"))
+
+# Pair crypto yang akan dipantau auto-signal
+CRYPTO_PAIRS = [
+    "BTC/USDT",
+    "ETH/USDT",
+    "SOL/USDT",
+    "BNB/USDT",
+    "PAXG/USDT",
+    "XRP/USDT",
+    "DOT/USDT",
+]
+
+# Timeframe auto-signal
+CRYPTO_TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+
+# Jeda antar scan (detik)
+SCAN_INTERVAL = 60
+
+# Jeda dasar sebelum retry kalau NetworkError (detik, + jitter)
+RETRY_DELAY = 2
+
+# Circuit breaker per venue: venue -> CircuitBreaker (lihat circuit.py).
+# Error network beruntun / 429 / 418 membuka circuit; selama open scanner tidak
+# request sama sekali dan putaran scan berhenti cepat.
+BREAKERS = {}
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+
+# Bucket histogram durasi satu putaran scan (detik)
+SCAN_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+# Mode evaluasi sinyal:
+#   "closed" -> cross MACD hanya di candle yang sudah close (event), dedup per candle
+#   "live"   -> perilaku lama: state MACD di candle yang masih berjalan
+EVAL_MODE = os.getenv("EVAL_MODE", "closed")
+
+# Simpan sinyal terakhir (mode live): (symbol, tf) -> "BUY"/"SELL"
+LAST_SIGNAL = {}
+
+# Mode closed: candle close terakhir yang sudah dievaluasi: (symbol, tf) -> open time (ms)
+LAST_EVALUATED = {}
+
+# Mode closed: cross yang sudah dikirim: (symbol, tf, candle open time, side) -> True
+SENT_CROSSES = {}
+MAX_SENT_CROSSES = 10_000
+
+# Jumlah candle yang di-fetch & disimpan per combo
+CANDLE_LIMIT = 200
+
+# Series candle per combo, di-update in-place tiap scan: (symbol, tf) -> Candles
+CANDLES = {}
+_candles_lock = threading.Lock()
+
+# Cache OHLCV bersama scanner + chart (TTL per TF, single-flight).
+# Jam cache = jam exchange, supaya batas close candle sama dengan data.
+OHLCV_CACHE = OHLCVCache(clock=lambda: get_exchange().milliseconds() / 1000)
+
+# Pengiriman sinyal:
+#   "digest" -> sinyal satu putaran digabung jadi satu tabel (lihat digest.py),
+#               pair prioritas tetap dikirim satu per satu
+#   "single" -> satu pesan per sinyal
+DELIVERY_MODE = os.getenv("DELIVERY_MODE", "digest")
+DIGEST = Digest(exchange_name=EXCHANGE_NAME)
+
+# Alert harga per chat, dicek dari candle yang di-fetch scanner (lihat alerts.py)
+ALERTS = AlertBook()
+# Harga close terakhir per symbol, dan snapshot candle terakhir saat cek alert
+# terakhir: symbol -> (open time, high, low)
+LAST_PRICE = {}
+ALERT_CHECKED = {}
+# Mode closed: combo hanya di-fetch sekali per candle close, jadi symbol yang punya
+# alert diberi fetch kecil base TF tiap putaran supaya alert tetap dicek per SCAN_INTERVAL
+ALERT_BARS = 3
+
+# Korelasi return antar pair per TF, untuk tag / tahan sinyal yang cuma ikut
+# pergerakan leader (lihat correlation.py)
+CORRELATION = CorrelationBook()
+
+# Jurnal semua sinyal yang dikirim (lihat journal.py); None = tidak dicatat
+JOURNAL = SignalJournal() if JOURNAL_ENABLED else None
+
+# Performa live sinyal yang dikirim, dari candle yang sudah di-fetch (lihat tracker.py)
+TRACKER = SignalTracker()
+
+# Status untuk dashboard admin (lihat status.py), hanya ditulis thread scanner:
+# (symbol, tf) -> [fetch terakhir, candle terakhir, sinyal terakhir, waktu sinyal] (ms)
+COMBO_STATE = {}
+CYCLES = deque(maxlen=status.CYCLE_HISTORY)  # (mulai ms, durasi ms, jumlah sinyal)
+# Batas bobot request Binance per menit (header x-mbx-used-weight-1m)
+EXCHANGE_WEIGHT_LIMIT = int(os.getenv("EXCHANGE_WEIGHT_LIMIT", "6000"))
+
+# Base timeframe untuk resampling: cukup 1 fetch per symbol, TF lain dibangun dari
+# base (lihat resample.py). Kosongkan ("") untuk fetch tiap TF langsung.
+BASE_TIMEFRAME = os.getenv("BASE_TIMEFRAME", "5m")
+
+# Feed base per symbol: symbol -> SymbolFeed
+FEEDS = {}
+
+# Kapan series CANDLES (symbol, tf) terakhir di-refresh dari exchange (ms jam exchange).
+# Chart pair yang dipantau dibaca dari series ini (lihat chart_rows) selama umurnya
+# tidak lebih dari CHART_MAX_AGE_MS dan candle terakhirnya masih candle berjalan.
+SERIES_UPDATED = {}
+CHART_MAX_AGE_MS = timeframe_ms(BASE_TIMEFRAME or "5m")
+
+
+# =========================
+#  UTIL
+# =========================
+
+def format_time_utc(ts=None):
+    if ts is None:
+        ts = datetime.now(timezone.utc)
+    return ts.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+# =========================
+#  DATA CRYPTO via CCXT
+# =========================
+
+def get_exchange():
+    global exchange
+    if exchange is None:
+        with _exchange_lock:
+            if exchange is None:
+                exchange = make_exchange()
+    return exchange
+
+
+def make_exchange():
+    """Client sesuai EXCHANGE_MODE: live, record (live + rekam ke tape), replay (dari tape)."""
+    if EXCHANGE_MODE == "replay":
+        from tape import TapeReplayer
+        return TapeReplayer(EXCHANGE_TAPE, speed=REPLAY_SPEED, latency=True)
+
+    import ccxt
+    client = ccxt.binance()  # tanpa API key, public market data
+    if EXCHANGE_MODE == "record":
+        from tape import TapeRecorder
+        return TapeRecorder(client, EXCHANGE_TAPE)
+    return client
+
+
+def get_breaker():
+    ex = get_exchange()
+    venue = getattr(ex, "id", EXCHANGE_NAME)
+    breaker = BREAKERS.get(venue)
+    if breaker is None:
+        with _exchange_lock:
+            breaker = BREAKERS.get(venue)
+            if breaker is None:
+                # jam breaker = jam exchange (sama seperti cache)
+                breaker = BREAKERS[venue] = CircuitBreaker(
+                    venue,
+                    failure_threshold=CIRCUIT_FAILURES,
+                    clock=lambda: get_exchange().milliseconds() / 1000,
+                )
+    return breaker
+
+
+def retry_after_seconds(ex):
+    """Header Retry-After response terakhir (detik), None kalau tidak ada / bukan angka."""
+    headers = getattr(ex, "last_response_headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_ohlcv_ccxt(symbol: str, timeframe: str, limit: int = 200):
+    """
+    Ambil candlestick crypto dari exchange (ccxt), lewat cache bersama.
+    return: list [ [timestamp, open, high, low, close, volume], ... ]
+    """
+    return OHLCV_CACHE.get_or_fetch(
+        symbol, timeframe, limit,
+        lambda: fetch_ohlcv_uncached(symbol, timeframe, limit),
+    )
+
+
+def fetch_ohlcv_uncached(symbol: str, timeframe: str, limit: int = 200, since=None):
+    import ccxt
+
+    ex = get_exchange()
+    breaker = get_breaker()
+    for attempt in range(2):
+        if not breaker.allow():
+            return None
+        metrics.inc("cryptobot_exchange_requests_total")
+        try:
+            t0 = time.perf_counter()
+            with metrics.timer("fetch"):
+                rows = ex.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+            breaker.record_success()
+            log.debug("fetch", extra={
+                "symbol": symbol, "tf": timeframe, "stage": "fetch", "rows": len(rows),
+                "duration_ms": round((time.perf_counter() - t0) * 1000, 2),
+            })
+            return rows
+        except ccxt.NetworkError as e:
+            metrics.count_error("fetch", e, symbol=symbol, tf=timeframe, attempt=attempt)
+            if isinstance(e, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+                # 429 (RateLimitExceeded) / 418 (DDoSProtection, ban IP) dari Binance:
+                # langsung buka circuit, jangan retry -- retry saat di-ban hanya
+                # memperpanjang ban. (Di ccxt 4.x RateLimitExceeded bukan subclass
+                # DDoSProtection, jadi dicek dua-duanya.)
+                metrics.inc("cryptobot_rate_limit_total")
+                kind = "rate_limit" if isinstance(e, ccxt.RateLimitExceeded) else "ban"
+                breaker.record_failure(kind, retry_after_seconds(ex))
+                return None
+            breaker.record_failure("network")
+            if attempt == 0:
+                time.sleep(backoff_delay(0, RETRY_DELAY, RETRY_DELAY))
+                continue
+            return None
+        except ccxt.ExchangeError as e:
+            # error request (symbol salah, dsb.): exchange menjawab, venue sehat
+            breaker.record_success()
+            metrics.count_error("fetch", e, symbol=symbol, tf=timeframe)
+            return None
+        except Exception:
+            # error lain (response rusak, bug parsing): hasil tetap dicatat supaya
+            # probe half-open tidak tertahan selamanya
+            breaker.record_failure("network")
+            raise
+
+
+# =========================
+#  ANALISA MACD (array typed, tanpa DataFrame)
+# =========================
+
+def get_series(symbol, tf, capacity=CANDLE_LIMIT):
+    """Series (symbol, tf) yang disimpan, dibuat kosong kalau belum ada. Panggil di bawah _candles_lock."""
+    key = (symbol, tf)
+    candles = CANDLES.get(key)
+    if candles is None:
+        candles = CANDLES[key] = Candles(capacity)
+    elif candles.capacity < capacity:
+        candles.capacity = capacity
+    return candles
+
+
+def update_candles(symbol, tf, ohlc):
+    """Merge response ccxt ke series (symbol, tf) yang disimpan. Panggil di bawah _candles_lock."""
+    candles = get_series(symbol, tf)
+    candles.update(ohlc, step_ms=timeframe_ms(tf))
+    return candles
+
+
+def macd_from_candles(candles):
+    if len(candles) < 50:
+        return None
+
+    lines = indicators.macd(candles.close)
+    if lines is None:
+        return None
+
+    macd_line, signal_line, hist = lines
+    return {
+        "price": candles.close[-1],
+        "macd": macd_line[-1],
+        "signal": signal_line[-1],
+        "hist": hist[-1],
+        "time": candles.datetime_at(-1),
+    }
+
+
+def find_closed_cross(symbol, tf, candles, now_ms):
+    """
+    Cari cross MACD hanya di candle yang sudah close, sejak candle close terakhir
+    yang dievaluasi. Return dict hasil di candle tempat cross terjadi (+ "cross",
+    "cross_time"), atau None kalau tidak ada cross / tidak ada candle close baru.
+    """
+    key = (symbol, tf)
+    closed = candles.closed_count(timeframe_ms(tf), now_ms)
+    if closed < 50:
+        return None
+
+    last_closed = candles.time[closed - 1]
+    since = LAST_EVALUATED.get(key)
+    if since == last_closed:
+        return None
+    LAST_EVALUATED[key] = last_closed
+
+    lines = indicators.macd(candles.close[:closed])
+    if lines is None:
+        return None
+    macd_line, signal_line, hist = lines
+
+    # Start pertama kali: cek candle close terakhir saja (jangan kirim cross lama).
+    # Setelahnya: cek semua candle close baru, supaya cross tidak terlewat kalau
+    # scan sempat telat beberapa candle.
+    start = closed - 1
+    if since is not None:
+        while start > 1 and candles.time[start - 1] > since:
+            start -= 1
+
+    cross = None
+    for i in range(max(start, 1), closed):
+        prev_above = macd_line[i - 1] - signal_line[i - 1]
+        curr_above = macd_line[i] - signal_line[i]
+        if prev_above <= 0 < curr_above:
+            cross = (i, "BUY")
+        elif prev_above >= 0 > curr_above:
+            cross = (i, "SELL")
+    if cross is None:
+        return None
+
+    i, side = cross
+    return {
+        "price": candles.close[i],
+        "macd": macd_line[i],
+        "signal": signal_line[i],
+        "hist": hist[i],
+        "time": candles.datetime_at(i),
+        "cross": side,
+        "cross_time": candles.time[i],
+    }
+
+
+def needs_fetch(symbol, tf, now_ms):
+    """Mode closed: fetch hanya kalau candle berikutnya sudah (seharusnya) close."""
+    last = LAST_EVALUATED.get((symbol, tf))
+    return last is None or now_ms >= last + 2 * timeframe_ms(tf)
+
+
+def build_signal_message(symbol, tf, res):
+    side = res.get("cross")
+    reason = ""
+
+    if side == "BUY":
+        reason = "MACD Golden Cross di candle yang sudah close."
+    elif side == "SELL":
+        reason = "MACD Dead Cross di candle yang sudah close."
+    elif res["macd"] > res["signal"] and res["hist"] > 0:
+        side = "BUY"
+        reason = "MACD Golden Cross, histogram > 0 (bullish momentum)."
+    elif res["macd"] < res["signal"] and res["hist"] < 0:
+        side = "SELL"
+        reason = "MACD Dead Cross, histogram < 0 (bearish momentum)."
+
+    if not side:
+        return None, None
+
+    # baris opsional: konfirmasi order flow, korelasi dengan leader
+    extra = ""
+    if res.get("flow"):
+        extra += orderflow.format_flow(res["flow"], side)
+    if res.get("corr"):
+        leader, rho = res["corr"]
+        extra += f"Korelasi: `{rho:.2f}` dengan {leader} (ikut sinyal {leader})\n"
+
+    msg = (
+        f"🚨 *CRYPTO MACD Signal*\n\n"
+        f"Exchange: *{EXCHANGE_NAME}*\n"
+        f"Pair: *{symbol}*\n"
+        f"Timeframe: *{tf}*\n"
+        f"Sinyal: *{side}*\n\n"
+        f"Price: `{res['price']:.5f}`\n"
+        f"MACD: `{res['macd']:.6f}`\n"
+        f"Signal: `{res['signal']:.6f}`\n"
+        f"Histogram: `{res['hist']:.6f}`\n"
+        f"{extra}"
+        f"Waktu candle: {res['time']}\n"
+        f"Alasan: {reason}\n"
+        f"Update bot: {format_time_utc()}"
+    )
+    return msg, side
+
+
+# =========================
+#  SCANNER AUTO-SIGNAL
+# =========================
+
+def mark_and_should_send(symbol, tf, side):
+    key = (symbol, tf)
+    last = LAST_SIGNAL.get(key)
+    if last == side:
+        return False
+    LAST_SIGNAL[key] = side
+    return True
+
+
+def mark_cross_sent(symbol, tf, candle_time, side):
+    key = (symbol, tf, candle_time, side)
+    if key in SENT_CROSSES:
+        return False
+    SENT_CROSSES[key] = True
+    if len(SENT_CROSSES) > MAX_SENT_CROSSES:
+        # buang entry paling lama (dict urut sesuai insert)
+        del SENT_CROSSES[next(iter(SENT_CROSSES))]
+    return True
+
+
+def is_resampled(tf):
+    return bool(BASE_TIMEFRAME) and (tf == BASE_TIMEFRAME or can_resample(BASE_TIMEFRAME, tf))
+
+
+def get_feed(symbol, timeframes):
+    feed = FEEDS.get(symbol)
+    if feed is None:
+        capacity = history_bars(BASE_TIMEFRAME, timeframes, CANDLE_LIMIT)
+        with _candles_lock:
+            base = get_series(symbol, BASE_TIMEFRAME, capacity)
+        feed = FEEDS[symbol] = SymbolFeed(symbol, BASE_TIMEFRAME, base)
+    return feed
+
+
+def load_direct(symbol, tf):
+    """Fetch langsung satu combo ke CANDLES. Return Candles atau None."""
+    ohlc = get_ohlcv_ccxt(symbol, tf, limit=CANDLE_LIMIT)
+    if not ohlc:
+        return None
+    with _candles_lock:
+        candles = update_candles(symbol, tf, ohlc)
+        SERIES_UPDATED[(symbol, tf)] = get_exchange().milliseconds()
+        return candles
+
+
+def load_resampled(symbol, timeframes, now_ms, refresh=None):
+    """
+    Satu fetch base untuk `symbol`; TF yang bisa di-resample dibangun dari base.
+    History TF tinggi hanya di-fetch langsung sekali (seed) saat series masih kosong.
+    `refresh` = semua TF resample symbol ini (default `timeframes`): yang belum due
+    ikut diperbarui dari base (tanpa fetch) supaya chart dari memori tetap baru.
+    Return dict tf -> Candles untuk `timeframes`.
+    """
+    refresh = timeframes if refresh is None else refresh
+    feed = get_feed(symbol, refresh)
+    rows = get_ohlcv_ccxt(symbol, BASE_TIMEFRAME, limit=feed.fetch_limit(now_ms))
+    if not rows:
+        return {}
+
+    higher = [tf for tf in refresh if tf != BASE_TIMEFRAME and is_resampled(tf)]
+    with _candles_lock:
+        empty = [tf for tf in higher if tf in timeframes and not len(get_series(symbol, tf))]
+    seeds = {tf: get_ohlcv_ccxt(symbol, tf, limit=CANDLE_LIMIT) for tf in empty}
+
+    loaded = {}
+    with _candles_lock:
+        since = feed.update_base(rows)
+        SERIES_UPDATED[(symbol, BASE_TIMEFRAME)] = now_ms
+        if BASE_TIMEFRAME in timeframes:
+            loaded[BASE_TIMEFRAME] = feed.base
+        for tf in higher:
+            candles = get_series(symbol, tf)
+            if seeds.get(tf):
+                candles.update(seeds[tf], step_ms=timeframe_ms(tf))
+            if not len(candles):
+                continue  # belum di-seed (TF belum due): tunggu putaran TF itu
+            candles = feed.refresh(candles, tf, since)
+            if len(candles):
+                SERIES_UPDATED[(symbol, tf)] = now_ms
+            if tf in timeframes:
+                loaded[tf] = candles
+    return loaded
+
+
+def chart_rows(symbol, tf, limit):
+    """
+    Rows chart dari series scanner di memori (tanpa fetch), atau None kalau series
+    tidak ada, kurang dari `limit` bar, atau sudah basi. Candle berjalan bisa
+    tertinggal sampai CHART_MAX_AGE_MS (satu candle base).
+    """
+    now_ms = get_exchange().milliseconds()
+    with _candles_lock:
+        candles = CANDLES.get((symbol, tf))
+        updated = SERIES_UPDATED.get((symbol, tf))
+        if (
+            candles is None or updated is None or len(candles) < limit
+            or now_ms - updated > CHART_MAX_AGE_MS
+            or candles.time[-1] + timeframe_ms(tf) <= now_ms
+        ):
+            return None
+        return candles.rows(limit)
+
+
+def evaluate_candles(symbol, tf, candles, now_ms):
+    """
+    Evaluasi satu (symbol, tf) dari series yang sudah di-update.
+    Return (msg, side, res) kalau ada sinyal baru yang harus dikirim, selain itu None.
+    """
+    closed_mode = EVAL_MODE == "closed"
+    with metrics.timer("indicator"), _candles_lock:
+        if closed_mode:
+            res = find_closed_cross(symbol, tf, candles, now_ms)
+        else:
+            res = macd_from_candles(candles)
+    if not res:
+        return None
+
+    with metrics.timer("message"):
+        msg, side = build_signal_message(symbol, tf, res)
+    if not (msg and side):
+        return None
+
+    if closed_mode:
+        should_send = mark_cross_sent(symbol, tf, res["cross_time"], side)
+    else:
+        should_send = mark_and_should_send(symbol, tf, side)
+    return (msg, side, res) if should_send else None
+
+
+def check_alerts(symbol, candles):
+    """
+    Cek alert harga `symbol` dengan pergerakan harga sejak cek terakhir. Return
+    list Alert yang kena.
+
+    Alert baru dipasang relatif ke LAST_PRICE (close saat cek terakhir), jadi
+    range bagian candle berjalan yang terjadi sebelum cek itu tidak boleh ikut:
+    dari candle yang berjalan saat cek terakhir hanya dipakai high/low yang
+    melewati snapshot-nya plus jalur close lama -> close baru. Candle sesudahnya
+    dihitung penuh.
+    """
+    if not len(candles):
+        return []
+    times, highs, lows, closes = candles.time, candles.high, candles.low, candles.close
+    close = closes[-1]
+    prev = ALERT_CHECKED.get(symbol)
+    start = LAST_PRICE.get(symbol, close)
+    high = low = start
+    for i in range(len(candles) - 1, -1, -1):
+        t = times[i]
+        if prev is None or t < prev[0]:
+            break
+        if t == prev[0]:
+            # candle yang berjalan saat cek terakhir: hanya ekstrem baru
+            if highs[i] > prev[1]:
+                high = max(high, highs[i])
+            if lows[i] < prev[2]:
+                low = min(low, lows[i])
+            break
+        high, low = max(high, highs[i]), min(low, lows[i])
+    high, low = max(high, close), min(low, close)
+    ALERT_CHECKED[symbol] = (times[-1], highs[-1], lows[-1])
+    LAST_PRICE[symbol] = close
+    return ALERTS.check(symbol, high, low)
+
+
+def current_price(symbol):
+    """Harga terakhir dari data scanner, fetch kecil kalau belum ada."""
+    price = LAST_PRICE.get(symbol)
+    if price is None:
+        rows = get_ohlcv_ccxt(symbol, BASE_TIMEFRAME or "1m", limit=2)
+        if rows:
+            price = LAST_PRICE[symbol] = rows[-1][4]
+    return price
+
+
+def scan_symbol(symbol, timeframes, heartbeat=None):
+    """
+    Fetch + evaluasi semua TF satu symbol. Combo yang belum punya candle close baru
+    (mode closed) dilewati tanpa fetch. Return (signals, alerts): list
+    (tf, msg, side, res) sinyal baru dan list Alert harga yang kena.
+    `heartbeat()` dipanggil tepat sebelum state bersama ditulis (combo dievaluasi,
+    alert diambil), supaya thread yang sudah diganti watchdog berhenti di situ.
+    """
+    heartbeat = heartbeat or (lambda: None)
+    closed_mode = EVAL_MODE == "closed"
+    now_ms = get_exchange().milliseconds()
+    due = [tf for tf in timeframes if not closed_mode or needs_fetch(symbol, tf, now_ms)]
+    if len(due) < len(timeframes):
+        metrics.inc("cryptobot_scan_skipped_total", len(timeframes) - len(due), reason="no_new_candle")
+        for tf in timeframes:
+            if tf not in due:
+                log.debug("skip", extra={"symbol": symbol, "tf": tf, "stage": "scan", "reason": "no_new_candle"})
+
+    loaded = {}
+    resampled = [tf for tf in due if is_resampled(tf)]
+    if resampled:
+        try:
+            loaded = load_resampled(symbol, resampled, now_ms, [tf for tf in timeframes if is_resampled(tf)])
+        except Exception as e:
+            metrics.count_error("resample", e, symbol=symbol, tf=",".join(resampled))
+
+    signals = []
+    finest = None  # series TF terkecil yang di-update, untuk alert harga
+    for tf in due:
+        try:
+            candles = loaded.get(tf) if is_resampled(tf) else load_direct(symbol, tf)
+            if candles is None:
+                # fetch gagal / circuit open; penyebabnya sudah di-log di fetch
+                metrics.inc("cryptobot_scan_skipped_total", reason="no_data")
+                log.info("skip", extra={"symbol": symbol, "tf": tf, "stage": "scan", "reason": "no_data"})
+                continue
+            if finest is None or timeframe_ms(tf) < timeframe_ms(finest[0]):
+                finest = (tf, candles)
+            heartbeat()
+            state = COMBO_STATE.setdefault((symbol, tf), [None, None, None, None])
+            state[0] = now_ms
+            state[1] = candles.time[-1] if len(candles) else None
+            with _candles_lock:
+                CORRELATION.observe(symbol, tf, candles, now_ms)
+                TRACKER.observe(symbol, tf, candles, now_ms)
+            signal = evaluate_candles(symbol, tf, candles, now_ms)
+            if signal:
+                signals.append((tf, *signal))
+        except Superseded:
+            raise
+        except Exception as e:
+            # Jangan matikan loop hanya karena 1 error, tapi tetap dicatat
+            metrics.count_error("scan", e, symbol=symbol, tf=tf)
+
+    if finest is None and ALERTS.has(symbol):
+        tf = BASE_TIMEFRAME or min(timeframes, key=timeframe_ms)
+        try:
+            rows = get_ohlcv_ccxt(symbol, tf, limit=ALERT_BARS)
+            if rows:
+                finest = (tf, Candles.from_ccxt(rows))
+        except Exception as e:
+            metrics.count_error("alerts", e, symbol=symbol, tf=tf)
+
+    fired = []
+    if finest is not None:
+        heartbeat()
+        with _candles_lock:
+            fired = check_alerts(symbol, finest[1])
+    return signals, fired
+
+
+def deliver(send, msg):
+    try:
+        with metrics.timer("send"):
+            send(msg)
+        return True
+    except Exception as e:
+        metrics.count_error("send", e)
+        return False
+
+
+def scan_once(send, pairs=None, timeframes=None, notify=None, heartbeat=None):
+    """
+    Satu putaran scan semua pair/timeframe.
+    Sinyal baru dikirim lewat `send(msg)`: langsung (mode single / pair prioritas)
+    atau digabung jadi digest di akhir putaran. Alert harga yang kena dikirim ke
+    chat pemiliknya lewat `notify(chat_id, msg)`. `heartbeat()` (watchdog, lihat
+    supervisor.py) dipanggil per pair, sebelum state bersama ditulis dan sebelum
+    tiap kiriman; thread yang sudah diganti berhenti di situ (Superseded) tanpa
+    menandai cross / mengirim pesan. Return jumlah sinyal baru.
+    """
+    heartbeat = heartbeat or (lambda: None)
+    pairs = CRYPTO_PAIRS if pairs is None else pairs
+    timeframes = CRYPTO_TIMEFRAMES if timeframes is None else timeframes
+    digest = DIGEST if DELIVERY_MODE == "digest" else None
+
+    def dispatch(symbol, tf, msg, side, res):
+        if digest is None or digest.is_priority(symbol):
+            deliver(send, msg)
+        else:
+            digest.add(symbol, tf, side, msg, res, get_exchange().milliseconds() / 1000)
+
+    found = skipped = 0
+    pending = []  # (symbol, tf, msg, side, res, future snapshot order flow / None)
+    t0 = time.perf_counter()
+    breaker = get_breaker()
+    for symbol in pairs:
+        heartbeat()
+        if breaker.is_open():
+            # venue sedang bermasalah -> sisa putaran dilewati tanpa request
+            metrics.inc("cryptobot_scan_skipped_total", len(timeframes), reason="circuit_open")
+            skipped += 1
+            continue
+        signals, fired = scan_symbol(symbol, timeframes, heartbeat)
+        for alert in fired:
+            if notify is not None:
+                msg = f"🔔 *Price Alert*\n{format_alert(alert, LAST_PRICE.get(symbol))}"
+                deliver(lambda text: notify(alert.chat_id, text), msg)
+        for tf, msg, side, res in signals:
+            found += 1
+            metrics.inc("cryptobot_signals_total", tf=tf, side=side)
+            log.info("signal", extra={"symbol": symbol, "tf": tf, "stage": "signal", "side": side})
+            state = COMBO_STATE.setdefault((symbol, tf), [None, None, None, None])
+            state[2], state[3] = side, get_exchange().milliseconds()
+            CORRELATION.note_leader(symbol, tf, side, res.get("cross_time"))
+            future = None
+            if orderflow.ORDERFLOW_ENABLED and res.get("cross"):
+                # snapshot diambil di background selama scan lanjut ke pair berikutnya
+                future = orderflow.prefetch(symbol)
+            pending.append((symbol, tf, msg, side, res, future))
+
+    # sinyal dikirim setelah semua pair di-scan: cross leader di putaran ini
+    # sudah tercatat dan matriks korelasi sudah memuat candle terbaru
+    heartbeat()
+    CORRELATION.commit()
+    TRACKER.update()  # semua sinyal terbuka sekaligus, sebelum sinyal baru dibuka
+    for symbol, tf, msg, side, res, future in pending:
+        heartbeat()
+        rebuild = future is not None
+        if CORR_MODE != "off":
+            res["corr"] = CORRELATION.redundant_with(symbol, tf, side, res.get("cross_time"))
+            if res["corr"] is not None:
+                if CORR_MODE == "suppress":
+                    metrics.inc("cryptobot_signals_suppressed_total", tf=tf, reason="correlated")
+                    log.info("suppress", extra={
+                        "symbol": symbol, "tf": tf, "stage": "deliver", "side": side,
+                        "leader": res["corr"][0], "corr": round(res["corr"][1], 3),
+                    })
+                    continue
+                rebuild = True
+        if future is not None:
+            res["flow"] = orderflow.resolve(future)  # None -> pesan tanpa baris flow
+        if rebuild:
+            msg, _ = build_signal_message(symbol, tf, res)
+        heartbeat()  # resolve() bisa menunggu sampai FLOW_TIMEOUT
+        signal_time = res.get("cross_time") or get_exchange().milliseconds()
+        if JOURNAL is not None:
+            JOURNAL.append(signal_time, symbol, tf, side, res)
+        verdict = orderflow.confirms(res["flow"], side) if res.get("flow") else None
+        TRACKER.open(symbol, tf, side, res["price"], signal_time, strategy_of(res, verdict))
+        dispatch(symbol, tf, msg, side, res)
+
+    if digest is not None:
+        heartbeat()
+        for msg in digest.flush(get_exchange().milliseconds() / 1000):
+            deliver(send, msg)
+    elapsed = time.perf_counter() - t0
+    metrics.histogram("cryptobot_scan_seconds", buckets=SCAN_BUCKETS).observe(elapsed)
+    CYCLES.append((get_exchange().milliseconds(), round(elapsed * 1000, 2), found))
+    publish_status()
+    if skipped:
+        log.warning("circuit open, pair dilewati", extra={
+            "stage": "scan", "reason": "circuit_open", "pairs_skipped": skipped,
+            "retry_in_s": round(breaker.remaining(), 1),
+        })
+    log.info("scan", extra={
+        "stage": "scan", "duration_ms": round(elapsed * 1000, 2),
+        "pairs": len(pairs), "signals": found,
+    })
+    return found
+
+
+def used_weight(ex):
+    """Bobot request 1 menit terakhir dari header Binance, None kalau tidak ada."""
+    headers = getattr(ex, "last_response_headers", None) or {}
+    for key in ("x-mbx-used-weight-1m", "X-MBX-USED-WEIGHT-1M"):
+        if key in headers:
+            try:
+                return int(headers[key])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def publish_status():
+    """Bangun snapshot status baru dan pasang untuk dashboard (sekali per putaran)."""
+    ex = get_exchange()
+    breaker = get_breaker()
+    weight = used_weight(ex)
+    snapshot = {
+        "published_at": status.iso_ms(ex.milliseconds()),
+        "exchange": {
+            "venue": getattr(ex, "id", EXCHANGE_NAME),
+            "mode": EXCHANGE_MODE,
+            "circuit": breaker.state,
+            "circuit_retry_in_s": round(breaker.remaining(), 1),
+            "circuit_trips_total": breaker.trips_total,
+            "used_weight_1m": weight,
+            "weight_limit_1m": EXCHANGE_WEIGHT_LIMIT,
+            "weight_headroom": None if weight is None else EXCHANGE_WEIGHT_LIMIT - weight,
+        },
+        "cycles": [
+            {"at": status.iso_ms(at), "duration_ms": duration, "signals": found}
+            for at, duration, found in CYCLES
+        ],
+        "combos": [
+            {
+                "symbol": symbol, "tf": tf,
+                "last_fetch": status.iso_ms(state[0]),
+                "last_candle": status.iso_ms(state[1]),
+                "last_signal": state[2],
+                "last_signal_at": status.iso_ms(state[3]),
+            }
+            for (symbol, tf), state in sorted(COMBO_STATE.items())
+        ],
+        **status.collect(),
+    }
+    status.publish(snapshot)
+
+
+status.register("caches", "ohlcv", lambda: len(OHLCV_CACHE))
+status.register("caches", "candles", lambda: len(CANDLES))
+status.register("caches", "sent_crosses", lambda: len(SENT_CROSSES))
+status.register("caches", "alerts", lambda: len(ALERTS))
+status.register("caches", "orderflow", orderflow.cached)
+status.register("caches", "tracked_signals", lambda: len(TRACKER))
+status.register("queues", "digest_pending", lambda: len(DIGEST))
+if JOURNAL is not None:
+    status.register("caches", "journal_rows", lambda: len(JOURNAL))
+    status.register("queues", "journal_pending", JOURNAL.pending)
+
+
+def reset_state():
+    """Kosongkan state scanner (dipakai benchmark / replay)."""
+    with _candles_lock:
+        LAST_SIGNAL.clear()
+        LAST_EVALUATED.clear()
+        SENT_CROSSES.clear()
+        CANDLES.clear()
+        FEEDS.clear()
+        SERIES_UPDATED.clear()
+        BREAKERS.clear()
+        LAST_PRICE.clear()
+        ALERT_CHECKED.clear()
+        COMBO_STATE.clear()
+        CYCLES.clear()
+    ALERTS.clear()
+    DIGEST.clear()
+    OHLCV_CACHE.clear()
+    CORRELATION.clear()
+    TRACKER.clear()
+    orderflow.clear()
+
+
+def crypto_scanner_loop(send, notify=None, worker=None):
+    """
+    Loop utama: scan semua pair/timeframe,
+    hitung MACD, kirim sinyal kalau ada BUY/SELL baru.
+    Kalau circuit open, putaran berikutnya menunggu sampai circuit boleh dicoba
+    lagi; crash beruntun ditunda dengan backoff (bukan jeda tetap).
+    `worker` = WorkerHandle dari supervisor (heartbeat + restart kalau macet);
+    kalau sudah diganti generasi baru, loop ini berhenti (Superseded).
+    """
+    crashes = 0
+    while True:
+        try:
+            scan_once(send, notify=notify, heartbeat=worker.beat if worker else None)
+            if worker is not None:
+                worker.cycle_done()
+            crashes = 0
+            wait = SCAN_INTERVAL
+            remaining = get_breaker().remaining()
+            if remaining:
+                wait = max(SCAN_INTERVAL, remaining)
+        except Superseded:
+            return
+        except Exception as e:
+            metrics.count_error("loop", e)
+            wait = backoff_delay(crashes, RETRY_DELAY, SCAN_INTERVAL * 5)
+            crashes += 1
+        if worker is not None:
+            worker.sleep(wait)
+        else:
+            time.sleep(wait)
@@ -0,0 +1,212 @@
+"""
+Screener MACD seluruh pair USDT di exchange (/screen <tf>).
+
+- Daftar pair: market spot aktif dengan quote USDT (tanpa stablecoin & token
+  leverage), di-cache beberapa jam. Kalau lebih dari SCREEN_MAX_SYMBOLS, diambil
+  yang volume 24 jamnya (quoteVolume) terbesar dari satu `fetch_tickers`.
+- Fetch paralel `SCREEN_WORKERS` thread, langsung ke exchange (tidak lewat
+  cache OHLCV bersama supaya ratusan symbol tidak mengusir entry scanner).
+  Bobot klines Binance = 2 per request berapa pun limit-nya (<= 1000), jadi
+  satu screen 400 pair = 800 dari 6000 bobot/menit (+80 untuk ticker 24 jam
+  semua pair saat daftar pair di-refresh). `SCREEN_BARS` = 99 cukup untuk MACD.
+- Evaluasi sekali jalan untuk semua symbol: MACD matriks (indicators.macd_matrix)
+  hanya di candle yang sudah close.
+- Hasil di-cache per (tf, candle close terakhir): screen ulang di candle yang
+  sama gratis; request bersamaan untuk tf yang sama menunggu satu perhitungan.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import indicators
+import metrics
+import status
+from candles import timeframe_ms
+
+SCREEN_BARS = 99
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", "8"))
+SCREEN_MAX_SYMBOLS = int(os.getenv("SCREEN_MAX_SYMBOLS", "400"))
+MARKETS_TTL = 6 * 3600  # detik
+CROSS_LOOKBACK = 5      # candle close terakhir yang dicek untuk "baru cross"
+
+_STABLE_BASES = {"USDC", "FDUSD", "TUSD", "BUSD", "DAI", "USDP", "USDD", "EUR", "AEUR", "PAX"}
+_LEVERAGED_SUFFIXES = ("UP", "DOWN", "BULL", "BEAR")
+
+_markets = (0.0, [], 0)   # (diambil pada, symbols yang di-screen, jumlah pair kandidat)
+_results = {}          # tf -> (open time candle close terakhir, hasil)
+_locks = {}            # tf -> Lock (single-flight per tf)
+_lock = threading.Lock()
+status.register("caches", "screen", lambda: len(_results))
+
+
+def active_usdt_symbols(ex):
+    global _markets
+    fetched_at, symbols, _total = _markets
+    now = ex.milliseconds() / 1000
+    if symbols and now - fetched_at < MARKETS_TTL:
+        return symbols
+
+    markets = ex.load_markets()
+    candidates = sorted(
+        m["symbol"] for m in markets.values()
+        if m.get("quote") == "USDT" and m.get("spot", True) and m.get("active", True) is not False
+        and m.get("base") not in _STABLE_BASES
+        and not m.get("base", "").endswith(_LEVERAGED_SUFFIXES)
+    )
+    symbols = candidates
+    if len(candidates) > SCREEN_MAX_SYMBOLS:
+        symbols = by_volume(ex, candidates)[:SCREEN_MAX_SYMBOLS]
+    _markets = (now, symbols, len(candidates))
+    return symbols
+
+
+def by_volume(ex, symbols):
+    """Urutkan symbol dari volume 24 jam (quote) terbesar; urutan asli kalau ticker gagal."""
+    try:
+        tickers = ex.fetch_tickers()
+    except Exception as e:
+        metrics.count_error("screen", e, stage="tickers")
+        return symbols
+    metrics.inc("cryptobot_exchange_requests_total")
+    volume = {s: (tickers.get(s) or {}).get("quoteVolume") or 0.0 for s in symbols}
+    return sorted(symbols, key=lambda s: -volume[s])
+
+
+def universe():
+    """(jumlah pair yang di-screen, jumlah pair kandidat) dari daftar pair terakhir."""
+    _fetched_at, symbols, total = _markets
+    return len(symbols), total
+
+
+def _fetch_all(symbols, tf):
+    from scanner import fetch_ohlcv_uncached
+
+    with ThreadPoolExecutor(SCREEN_WORKERS, thread_name_prefix="screen") as pool:
+        return list(pool.map(lambda s: fetch_ohlcv_uncached(s, tf, SCREEN_BARS), symbols))
+
+
+def evaluate(symbols, batches, tf, now_ms):
+    """
+    Skor MACD semua symbol dari rows ccxt. Return list dict per symbol:
+    momentum & slope histogram (dinormalisasi ke harga, basis point) dan cross
+    terakhir dalam CROSS_LOOKBACK candle.
+    """
+    tf_ms = timeframe_ms(tf)
+    current_open = now_ms - now_ms % tf_ms
+    names, closes = [], []
+    for symbol, rows in zip(symbols, batches):
+        if not rows:
+            continue
+        closed = [r[4] for r in rows if r[0] < current_open]  # buang candle berjalan
+        if len(closed) < SCREEN_BARS - 1:
+            continue  # pair baru listing / data kurang -> tidak sebanding
+        names.append(symbol)
+        closes.append(closed[-(SCREEN_BARS - 1):])
+    if not names:
+        return []
+
+    lines = indicators.macd_matrix(closes)
+    if lines is None:
+        return []
+    import numpy as np
+
+    macd_line, signal_line, hist = lines
+    price = np.asarray(closes)[:, -1]
+    momentum = hist[:, -1] / price * 1e4
+    slope = (hist[:, -1] - hist[:, -2]) / price * 1e4
+
+    # cross terakhir: perubahan tanda (macd - signal) dalam beberapa candle terakhir
+    sign = np.sign(hist[:, -(CROSS_LOOKBACK + 1):])
+    changes = np.diff(sign, axis=1)
+
+    results = []
+    for i, symbol in enumerate(names):
+        idx = np.flatnonzero(changes[i])
+        cross, ago = None, None
+        if idx.size:
+            j = idx[-1]
+            cross = "BUY" if changes[i][j] > 0 else "SELL"
+            ago = CROSS_LOOKBACK - 1 - int(j)
+        results.append({
+            "symbol": symbol,
+            "price": float(price[i]),
+            "momentum": float(momentum[i]),
+            "slope": float(slope[i]),
+            "cross": cross,
+            "cross_ago": ago,
+            "bullish": bool(macd_line[i, -1] > signal_line[i, -1]),
+        })
+    return results
+
+
+def _score(r):
+    # momentum + arah slope; cross baru dapat bonus (makin baru makin besar)
+    bonus = 0.0
+    if r["cross"]:
+        bonus = (CROSS_LOOKBACK - r["cross_ago"]) * (1 if r["cross"] == "BUY" else -1)
+    return r["momentum"] + 2.0 * r["slope"] + bonus
+
+
+def screen(tf):
+    """Hasil screener `tf` (list dict, sudah berisi 'score'), di-cache per candle close."""
+    from scanner import get_exchange
+
+    ex = get_exchange()
+    now_ms = ex.milliseconds()
+    tf_ms = timeframe_ms(tf)
+    last_closed = now_ms - now_ms % tf_ms - tf_ms
+
+    with _lock:
+        tf_lock = _locks.setdefault(tf, threading.Lock())
+    with tf_lock:
+        cached = _results.get(tf)
+        if cached is not None and cached[0] == last_closed:
+            metrics.inc("cryptobot_cache_hits_total", cache="screen")
+            return cached[1]
+        metrics.inc("cryptobot_cache_misses_total", cache="screen")
+
+        with metrics.timer("screen"):
+            symbols = active_usdt_symbols(ex)
+            batches = _fetch_all(symbols, tf)
+            results = evaluate(symbols, batches, tf, now_ms)
+            for r in results:
+                r["score"] = _score(r)
+        # data belum lengkap (misal circuit open di tengah jalan) -> jangan di-cache
+        if len(results) >= len(symbols) // 2:
+            _results[tf] = (last_closed, results)
+        return results
+
+
+def top(results, n=10):
+    """(bullish, bearish): n skor tertinggi dengan MACD > signal, n terendah dengan MACD < signal."""
+    bulls = sorted((r for r in results if r["bullish"]), key=lambda r: r["score"], reverse=True)
+    bears = sorted((r for r in results if not r["bullish"]), key=lambda r: r["score"])
+    return bulls[:n], bears[:n]
+
+
+def format_screen(tf, results, n=10):
+    bulls, bears = top(results, n)
+
+    def rows(items):
+        lines = []
+        for r in items:
+            cross = f"{r['cross']}-{r['cross_ago']}" if r["cross"] else ""
+            lines.append(f"{r['symbol'].replace('/USDT', ''):<9} {r['momentum']:>7.1f} {r['slope']:>6.1f} {cross}")
+        return "\n".join(lines) or "-"
+
+    header = f"{'Pair':<9} {'Hist':>7} {'Slope':>6} Cross"
+    screened, total = universe()
+    scope = f" (top {screened} volume 24 jam dari {total})" if total > screened else ""
+    return (
+        f"🔎 *MACD Screener {tf}* – {len(results)} pair USDT{scope}\n"
+        f"Hist/slope dalam bps harga; Cross = sinyal-berapa candle lalu\n\n"
+        f"🟢 *Bullish*\n```\n{header}\n{rows(bulls)}\n```\n"
+        f"🔴 *Bearish*\n```\n{header}\n{rows(bears)}\n```"
+    )
+
+
+def clear():
+    global _markets
+    with _lock:
+        _markets = (0.0, [], 0)
+        _results.clear()
@@ -0,0 +1,100 @@
+"""
+Snapshot status bot untuk dashboard admin (/admin/status).
+
+Scanner membangun satu dict baru di akhir setiap putaran scan dan memasangnya
+dengan `publish()` (satu assignment referensi). Route dashboard hanya membaca
+referensi itu -- tanpa lock, tanpa menyentuh struktur data scanner -- jadi
+polling dashboard tidak pernah bersaing dengan scan. Snapshot tidak pernah
+diubah setelah dipublish.
+
+Modul lain mendaftarkan ukuran cache / antreannya lewat `register()`; fungsi itu
+dipanggil di thread scanner saat snapshot dibangun (harus murah: len(), int).
+"""
+import html
+from datetime import datetime, timezone
+
+SNAPSHOT = None    # dict snapshot terakhir (read-only)
+CYCLE_HISTORY = 60  # jumlah putaran scan terakhir yang disimpan
+
+_sources = {}      # (section, name) -> fn() -> angka
+
+
+def register(section, name, fn):
+    """Daftarkan angka yang ikut dipublish, contoh: register("caches", "chart", lambda: len(_charts))."""
+    _sources[(section, name)] = fn
+
+
+def collect():
+    """Nilai semua sumber terdaftar: {section: {name: value}}."""
+    out = {}
+    for (section, name), fn in list(_sources.items()):
+        try:
+            out.setdefault(section, {})[name] = fn()
+        except Exception as e:
+            out.setdefault(section, {})[name] = f"error: {type(e).__name__}"
+    return out
+
+
+def publish(snapshot):
+    global SNAPSHOT
+    SNAPSHOT = snapshot
+
+
+def current():
+    return SNAPSHOT
+
+
+def iso_ms(ms):
+    if ms is None:
+        return None
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# =========================
+#  HTML
+# =========================
+
+def _table(headers, rows):
+    head = "".join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape('' if v is None else str(v))}</td>" for v in row) + "</tr>"
+        for row in rows
+    )
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+
+def render_html(snapshot):
+    if snapshot is None:
+        return "<p>Scanner belum menyelesaikan putaran pertama.</p>"
+
+    cycles = snapshot["cycles"]
+    durations = [c["duration_ms"] for c in cycles]
+    summary = ""
+    if durations:
+        ordered = sorted(durations)
+        summary = (
+            f"<p>Putaran: {len(durations)} terakhir, p50 {ordered[len(ordered) // 2]} ms, "
+            f"max {ordered[-1]} ms</p>"
+        )
+
+    sections = [
+        f"<h1>Crypto MACD Bot</h1><p>Snapshot: {html.escape(snapshot['published_at'])}</p>",
+        "<h2>Exchange</h2>" + _table(["key", "value"], snapshot["exchange"].items()),
+    ]
+    for name in ("caches", "queues"):
+        if snapshot.get(name):
+            sections.append(f"<h2>{name.capitalize()}</h2>" + _table(["name", "size"], snapshot[name].items()))
+    sections.append(
+        "<h2>Scan</h2>" + summary
+        + _table(["waktu", "durasi ms", "sinyal"], [(c["at"], c["duration_ms"], c["signals"]) for c in cycles[::-1]])
+    )
+    sections.append("<h2>Combo</h2>" + _table(
+        ["symbol", "tf", "fetch terakhir", "candle terakhir", "sinyal terakhir", "waktu sinyal"],
+        [(c["symbol"], c["tf"], c["last_fetch"], c["last_candle"], c["last_signal"], c["last_signal_at"])
+         for c in snapshot["combos"]],
+    ))
+    style = (
+        "<style>body{font-family:monospace}table{border-collapse:collapse;margin-bottom:1em}"
+        "td,th{border:1px solid #ccc;padding:2px 8px;text-align:left}</style>"
+    )
+    return f"<!doctype html><html><head><meta charset='utf-8'>{style}</head><body>{''.join(sections)}</body></html>"
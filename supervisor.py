@@ -0,0 +1,185 @@
+"""
+Watchdog untuk thread worker (scanner): heartbeat, restart otomatis, health.
+
+Worker menerima `WorkerHandle` dan memanggil:
+- `beat()`        -> tanda masih maju (per pair di scanner)
+- `sleep(detik)`  -> jeda antar putaran; deadline heartbeat diperpanjang selama jeda
+- `cycle_done()`  -> satu putaran selesai (dipakai readiness)
+
+Watchdog (satu thread) mengecek tiap CHECK_INTERVAL detik. Worker yang thread-nya
+mati, atau yang tidak beat melewati deadline (hang di network call, deadlock),
+diganti thread baru dengan generasi baru. Thread Python tidak bisa dibunuh, jadi
+thread lama dibiarkan; begitu ia bangun dan memanggil beat()/sleep(), handle-nya
+sudah basi dan `Superseded` dilempar supaya ia berhenti. Worker wajib memanggil
+beat() tepat sebelum menulis state bersama / mengirim pesan (bukan hanya di awal
+langkah), supaya thread basi yang bangun di tengah langkah tidak ikut menulis.
+
+Liveness = proses & watchdog hidup. Readiness = semua worker sudah menyelesaikan
+putaran pertama dan tidak sedang macet.
+"""
+import threading
+import time
+
+import metrics
+from circuit import backoff_delay
+
+CHECK_INTERVAL = 5.0
+RESTART_BACKOFF_CAP = 60.0  # detik maks. jeda antar restart beruntun
+
+
+class Superseded(Exception):
+    """Worker ini sudah diganti generasi baru; keluar dari loop."""
+
+
+class WorkerHandle:
+    __slots__ = ("worker", "generation")
+
+    def __init__(self, worker, generation):
+        self.worker = worker
+        self.generation = generation
+
+    def _check(self):
+        if self.generation != self.worker.generation:
+            raise Superseded(f"{self.worker.name} generasi {self.generation} sudah diganti")
+
+    def beat(self):
+        self._check()
+        w = self.worker
+        w.last_beat = w.clock()
+        w.deadline = w.last_beat + w.stall_timeout
+
+    def sleep(self, seconds):
+        self._check()
+        w = self.worker
+        w.last_beat = w.clock()
+        w.deadline = w.last_beat + seconds + w.stall_timeout
+        time.sleep(seconds)
+        self.beat()
+
+    def cycle_done(self):
+        self._check()
+        self.worker.last_cycle = self.worker.clock()
+        self.worker.cycles += 1
+        self.worker.cycles_since_start += 1
+
+
+class Worker:
+    def __init__(self, name, target, stall_timeout, clock=time.monotonic):
+        self.name = name
+        self.target = target
+        self.stall_timeout = stall_timeout
+        self.clock = clock
+        self.generation = 0
+        self.thread = None
+        self.started_at = None
+        self.last_beat = None
+        self.deadline = None
+        self.last_cycle = None
+        self.cycles = 0
+        self.cycles_since_start = 0  # siklus sejak (re)start terakhir; readiness pakai ini
+        self.restarts = 0
+        self.restarts_in_row = 0
+        self.next_restart_at = 0.0
+
+    def start(self):
+        self.generation += 1
+        handle = WorkerHandle(self, self.generation)
+        now = self.clock()
+        self.started_at = self.last_beat = now
+        self.cycles_since_start = 0
+        self.deadline = now + self.stall_timeout
+        self.thread = threading.Thread(
+            target=self._run, args=(handle,), name=f"{self.name}-{self.generation}", daemon=True,
+        )
+        self.thread.start()
+
+    def _run(self, handle):
+        try:
+            self.target(handle)
+        except Superseded:
+            pass
+        except Exception as e:
+            metrics.count_error(self.name, e)
+
+    def problem(self, now):
+        """None kalau sehat, selain itu "died" / "stalled"."""
+        if self.thread is None or not self.thread.is_alive():
+            return "died"
+        if now > self.deadline:
+            return "stalled"
+        return None
+
+    def info(self, now):
+        return {
+            "generation": self.generation,
+            "alive": bool(self.thread and self.thread.is_alive()),
+            "heartbeat_age_s": round(now - self.last_beat, 1) if self.last_beat is not None else None,
+            "deadline_in_s": round(self.deadline - now, 1) if self.deadline is not None else None,
+            "cycles": self.cycles,
+            "cycles_since_start": self.cycles_since_start,
+            "last_cycle_age_s": round(now - self.last_cycle, 1) if self.last_cycle is not None else None,
+            "restarts": self.restarts,
+        }
+
+
+class Supervisor:
+    def __init__(self, check_interval=CHECK_INTERVAL, clock=time.monotonic):
+        self.check_interval = check_interval
+        self.clock = clock
+        self.workers = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add(self, name, target, stall_timeout):
+        """Daftarkan dan jalankan worker `target(handle)`."""
+        worker = Worker(name, target, stall_timeout, clock=self.clock)
+        with self._lock:
+            self.workers[name] = worker
+        worker.start()
+        return worker
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="supervisor", daemon=True)
+            self._thread.start()
+        return self
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.check()
+            except Exception as e:
+                metrics.count_error("supervisor", e)
+
+    def check(self):
+        now = self.clock()
+        with self._lock:
+            workers = list(self.workers.values())
+        for w in workers:
+            metrics.set_gauge("cryptobot_worker_heartbeat_age_seconds", round(now - w.last_beat, 1), worker=w.name)
+            reason = w.problem(now)
+            if reason is None:
+                if w.cycles_since_start:
+                    w.restarts_in_row = 0
+                continue
+            if now < w.next_restart_at:
+                continue  # restart beruntun ditunda (crash loop)
+            metrics.count_error("supervisor", RuntimeError(f"{w.name} {reason}"), worker=w.name, reason=reason)
+            metrics.inc("cryptobot_worker_restarts_total", worker=w.name, reason=reason)
+            w.restarts += 1
+            w.restarts_in_row += 1
+            w.next_restart_at = now + backoff_delay(w.restarts_in_row - 1, 1.0, RESTART_BACKOFF_CAP)
+            w.start()
+
+    def liveness(self):
+        alive = self._thread is not None and self._thread.is_alive()
+        return alive, {"supervisor": alive}
+
+    def readiness(self):
+        now = self.clock()
+        with self._lock:
+            workers = dict(self.workers)
+        info = {name: w.info(now) for name, w in workers.items()}
+        ready = bool(workers) and all(w.cycles_since_start and w.problem(now) is None for w in workers.values())
+        return ready, {"ready": ready, "workers": info}
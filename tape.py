@@ -0,0 +1,191 @@
+"""
+Rekam & putar ulang traffic exchange (fetch_ohlcv / fetch_ticker /
+fetch_order_book / fetch_trades).
+
+Record: `TapeRecorder` membungkus client ccxt asli dan menulis setiap response
+(atau error) ke file JSON-lines append-only, satu baris per request:
+
+    [t_ms, durasi_ms, method, symbol, timeframe, since, limit, result, error]
+
+Replay: `TapeReplayer` meniru client ccxt dari file itu. Jam exchange berjalan
+dari waktu request pertama di tape dengan kecepatan `speed` (1 = waktu asli,
+60 = 1 jam dalam 1 menit, 0 = jam manual lewat `advance()`), dan setiap request
+dijawab dengan response terakhir yang direkam untuk request yang sama sampai
+jam tersebut. Error yang direkam (429, timeout, ...) ikut diputar ulang.
+
+Dipilih lewat env EXCHANGE_MODE=live|record|replay dan EXCHANGE_TAPE=<path>
+(lihat scanner.get_exchange).
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+
+# Maks. response lama yang disambung saat replay request yang lebih panjang
+MAX_STITCH = 500
+
+
+class TapeRecorder:
+    def __init__(self, inner, path):
+        self._inner = inner
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", buffering=1)  # line-buffered: baris lengkap langsung ke disk
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # id, rateLimit, last_response_headers, milliseconds, parse_timeframe, ...
+        return getattr(self._inner, name)
+
+    def _record(self, method, symbol, timeframe, since, limit, call):
+        t_ms = self._inner.milliseconds()  # jam exchange (ccxt: jam sistem)
+        t0 = time.perf_counter()
+        result = error = None
+        try:
+            result = call()
+            return result
+        except Exception as e:
+            error = [type(e).__name__, str(e)[:200]]
+            raise
+        finally:
+            line = json.dumps(
+                [t_ms, int((time.perf_counter() - t0) * 1000), method, symbol, timeframe,
+                 since, limit, result, error],
+                separators=(",", ":"),
+            )
+            with self._lock:
+                self._file.write(line + "\n")
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        return self._record(
+            "ohlcv", symbol, timeframe, since, limit,
+            lambda: self._inner.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit, params=params or {}),
+        )
+
+    def fetch_ticker(self, symbol, params=None):
+        return self._record(
+            "ticker", symbol, None, None, None,
+            lambda: self._inner.fetch_ticker(symbol, params or {}),
+        )
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        return self._record(
+            "book", symbol, None, None, limit,
+            lambda: self._inner.fetch_order_book(symbol, limit, params or {}),
+        )
+
+    def fetch_trades(self, symbol, since=None, limit=None, params=None):
+        return self._record(
+            "trades", symbol, None, since, limit,
+            lambda: self._inner.fetch_trades(symbol, since, limit, params or {}),
+        )
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class TapeReplayer:
+    id = "replay"
+    rateLimit = 0
+    timeframes = None
+
+    def __init__(self, path, speed=1.0, latency=False):
+        """
+        speed   : kelipatan waktu asli; 0 = jam hanya maju lewat advance()
+        latency : True = tidur sesuai durasi request yang direkam (dibagi speed)
+        """
+        self.speed = speed
+        self.latency = latency
+        self.last_response_headers = {}
+        self.requests = 0
+        self.misses = 0
+        self._records = {}  # key -> ([t_ms], [(durasi, result, error)])
+        start = None
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                t, dur, method, symbol, tf, since, limit, result, error = json.loads(line)
+                start = t if start is None else min(start, t)
+                times, entries = self._records.setdefault((method, symbol, tf, since), ([], []))
+                i = bisect_right(times, t)
+                times.insert(i, t)
+                entries.insert(i, (dur, result, error))
+        self.start_ms = start or 0
+        self._offset_ms = 0
+        self._real0 = time.monotonic()
+
+    # ---------- jam ----------
+
+    def milliseconds(self):
+        elapsed = (time.monotonic() - self._real0) * 1000 * self.speed if self.speed else 0
+        return int(self.start_ms + self._offset_ms + elapsed)
+
+    def advance(self, seconds):
+        self._offset_ms += int(seconds * 1000)
+
+    # ---------- API ala ccxt ----------
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        import ccxt
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    def load_markets(self, reload=False):
+        return {}
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        entries, i = self._replay("ohlcv", symbol, timeframe, since)
+        rows = entries[i][1]
+        if limit and since is None and len(rows) < limit:
+            # response terakhir pendek (fetch incremental 2-3 bar): sambung dengan
+            # response sebelumnya supaya request seed yang panjang tetap terlayani
+            merged = {r[0]: r for r in rows}
+            for _, older, error in reversed(entries[max(0, i - MAX_STITCH):i]):
+                if error:
+                    continue
+                for r in older:
+                    merged.setdefault(r[0], r)
+                if len(merged) >= limit:
+                    break
+            rows = [merged[t] for t in sorted(merged)]
+        if limit:
+            rows = rows[:limit] if since is not None else rows[-limit:]
+        return [list(r) for r in rows]
+
+    def fetch_ticker(self, symbol, params=None):
+        entries, i = self._replay("ticker", symbol, None, None)
+        return dict(entries[i][1])
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        entries, i = self._replay("book", symbol, None, None)
+        return dict(entries[i][1])
+
+    def fetch_trades(self, symbol, since=None, limit=None, params=None):
+        entries, i = self._replay("trades", symbol, None, since)
+        return [dict(t) for t in entries[i][1]]
+
+    def _replay(self, method, symbol, timeframe, since):
+        """Return (entries, i): entry ke-i = response terakhir sampai jam sekarang."""
+        import ccxt
+
+        self.requests += 1
+        found = self._records.get((method, symbol, timeframe, since))
+        if found is None and since is not None:
+            found = self._records.get((method, symbol, timeframe, None))
+        if found is None:
+            self.misses += 1
+            raise ccxt.BadSymbol(f"{method} {symbol} {timeframe} tidak ada di tape")
+
+        times, entries = found
+        # sebelum request pertama yang direkam -> pakai yang pertama
+        i = max(bisect_right(times, self.milliseconds()) - 1, 0)
+        dur, _, error = entries[i]
+        if self.latency and dur:
+            time.sleep(dur / 1000 / (self.speed or 1))
+        if error:
+            name, message = error
+            raise getattr(ccxt, name, ccxt.NetworkError)(message)
+        return entries, i
@@ -0,0 +1,24 @@
+import pytest
+
+import scanner
+from bench.fake_exchange import FakeExchange
+
+
+@pytest.fixture
+def use_exchange():
+    """Pasang exchange palsu ke scanner (jurnal mati, state bersih); dipulihkan sesudah test."""
+    old = scanner.exchange, scanner.JOURNAL
+
+    def install(ex):
+        scanner.exchange, scanner.JOURNAL = ex, None
+        scanner.reset_state()
+        return ex
+
+    yield install
+    scanner.reset_state()
+    scanner.exchange, scanner.JOURNAL = old
+
+
+@pytest.fixture
+def fake(use_exchange):
+    return use_exchange(FakeExchange())
@@ -0,0 +1,79 @@
+"""
+Alert harga: hanya pergerakan sesudah alert dipasang yang dihitung, bukan
+high/low candle berjalan dari sebelum alert ada.
+"""
+import pytest
+
+import scanner
+from candles import Candles
+
+T0 = 1_700_000_000_000
+STEP = 300_000
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    scanner.reset_state()
+    yield
+    scanner.reset_state()
+
+
+def series(*rows):
+    c = Candles(10)
+    c.update([[T0 + i * STEP, o, h, l, cl, 1.0] for i, (o, h, l, cl) in enumerate(rows)], step_ms=STEP)
+    return c
+
+
+def test_alert_inside_forming_candle_range_does_not_fire():
+    # candle berjalan sudah sempat ke 110, harga sekarang 100
+    assert scanner.check_alerts("BTC/USDT", series((100, 110, 99, 100))) == []
+    alert = scanner.ALERTS.add(1, "BTC/USDT", 105, scanner.current_price("BTC/USDT"))
+    # candle yang sama, harga belum bergerak lagi
+    assert scanner.check_alerts("BTC/USDT", series((100, 110, 99, 101))) == []
+    # close naik melewati level sesudah alert dipasang
+    assert scanner.check_alerts("BTC/USDT", series((100, 110, 99, 106))) == [alert]
+
+
+def test_new_extreme_and_new_candle_fire():
+    scanner.check_alerts("BTC/USDT", series((100, 110, 90, 100)))
+    up = scanner.ALERTS.add(1, "BTC/USDT", 112, 100)
+    down = scanner.ALERTS.add(1, "BTC/USDT", 85, 100)
+    # high baru di candle yang sama -> up kena
+    assert scanner.check_alerts("BTC/USDT", series((100, 113, 90, 100))) == [up]
+    # wick di candle berikutnya -> down kena
+    assert scanner.check_alerts("BTC/USDT", series((100, 113, 90, 100), (100, 101, 84, 100))) == [down]
+
+
+@pytest.mark.parametrize("level", [float("nan"), float("inf"), float("-inf"), 0.0, -5.0])
+def test_invalid_level_rejected(level):
+    with pytest.raises(ValueError):
+        scanner.ALERTS.add(1, "BTC/USDT", level, 100)
+    real = scanner.ALERTS.add(2, "BTC/USDT", 90, 100)
+    assert len(scanner.ALERTS) == 1
+    assert scanner.ALERTS.check("BTC/USDT", 101, 89) == [real]
+
+
+def test_alerts_checked_every_cycle_between_candle_closes(fake):
+    pairs, tfs = ["BTC/USDT"], ["5m", "1h"]
+    fake.now_ms = (fake.now_ms // 300_000 + 1) * 300_000 + 1000  # tepat sesudah close 5m
+    scanner.scan_once(lambda msg: None, pairs=pairs, timeframes=tfs)
+    fake.advance(60)
+    requests = fake.requests
+    scanner.scan_once(lambda msg: None, pairs=pairs, timeframes=tfs)
+    assert fake.requests == requests  # tanpa alert: tidak ada fetch sampai candle close
+
+    scanner.ALERTS.add(1, "BTC/USDT", scanner.LAST_PRICE["BTC/USDT"] * 2, scanner.LAST_PRICE["BTC/USDT"])
+    checked = scanner.ALERT_CHECKED["BTC/USDT"]
+    fake.advance(60)
+    scanner.scan_once(lambda msg: None, pairs=pairs, timeframes=tfs)
+    assert fake.requests == requests + 1
+    assert scanner.ALERT_CHECKED["BTC/USDT"] != checked
+
+
+def test_high_price_precision():
+    # float32 membulatkan 104999.99 ke 105000.0 -> alert 105000 kena padahal belum
+    scanner.check_alerts("BTC/USDT", series((104_000.0, 104_500.0, 103_900.0, 104_000.0)))
+    scanner.ALERTS.add(1, "BTC/USDT", 105_000.0, 104_000.0)
+    c = series((104_000.0, 104_999.99, 103_900.0, 104_900.0))
+    assert c.high[-1] == 104_999.99
+    assert scanner.check_alerts("BTC/USDT", c) == []
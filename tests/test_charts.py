@@ -0,0 +1,42 @@
+"""
+Chart pair yang dipantau dibaca dari series scanner di memori: tidak ada request
+ke exchange selama series masih baru.
+"""
+import pytest
+
+import scanner
+
+TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+
+
+def scan(fake, cycles):
+    for _ in range(cycles):
+        fake.advance(60)
+        scanner.scan_once(lambda msg: None, pairs=["BTC/USDT"], timeframes=TIMEFRAMES)
+
+
+def test_watched_pair_charts_need_no_fetch(fake):
+    scan(fake, 12)
+    requests = fake.requests
+    for tf in TIMEFRAMES:
+        rows = scanner.chart_rows("BTC/USDT", tf, 200)
+        assert rows is not None and len(rows) == 200, tf
+        assert rows[-1][0] + scanner.timeframe_ms(tf) > fake.milliseconds(), tf
+    assert fake.requests == requests
+
+
+def test_stale_series_falls_back_to_fetch(fake):
+    scan(fake, 1)
+    fake.advance(scanner.CHART_MAX_AGE_MS / 1000 + 1)
+    assert scanner.chart_rows("BTC/USDT", "1h", 200) is None
+    assert scanner.chart_rows("ETH/USDT", "1h", 200) is None
+
+
+def test_render_uses_series(fake):
+    pytest.importorskip("matplotlib")
+    import charts
+
+    scan(fake, 3)
+    requests = fake.requests
+    assert charts.render_chart("BTC/USDT", "4h", 200)
+    assert fake.requests == requests
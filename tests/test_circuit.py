@@ -0,0 +1,76 @@
+"""
+Circuit breaker: probe half-open harus selalu dilepas, apa pun hasil request-nya.
+
+    python -m pytest -q tests
+"""
+import ccxt
+import pytest
+
+import scanner
+from bench.fake_exchange import FakeExchange
+from circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BadSymbolExchange(FakeExchange):
+    """Exchange palsu yang menolak symbol di luar `markets` dengan BadSymbol, seperti Binance."""
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        if symbol not in self.markets:
+            self._request()
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        return super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+@pytest.fixture
+def fake(use_exchange):
+    return use_exchange(BadSymbolExchange(markets=["BTC/USDT", "ETH/USDT"]))
+
+
+def open_after_rate_limit(ex):
+    breaker = scanner.get_breaker()
+    breaker.record_failure("rate_limit", retry_after=30)
+    assert breaker.is_open()
+    ex.advance(31)
+    return breaker
+
+
+def test_half_open_probe_bad_symbol_closes_circuit(fake):
+    breaker = open_after_rate_limit(fake)
+    # probe half-open = request chart dengan symbol salah
+    assert scanner.fetch_ohlcv_uncached("NOPE/USDT", "1h") is None
+    assert breaker.state == CLOSED
+
+    requests = fake.requests
+    for _ in range(3):
+        scanner.scan_once(lambda msg: None, pairs=["BTC/USDT", "ETH/USDT"], timeframes=["1h"])
+        fake.advance(3600)
+    assert fake.requests > requests
+
+
+def test_half_open_probe_unexpected_error_reopens_circuit(fake):
+    breaker = open_after_rate_limit(fake)
+    fake.fetch_ohlcv = lambda *a, **kw: {}["rusak"]
+    with pytest.raises(KeyError):
+        scanner.fetch_ohlcv_uncached("BTC/USDT", "1h")
+    assert breaker.state == OPEN
+    assert breaker.remaining() > 0
+
+
+def test_lost_probe_released_after_timeout():
+    clock = Clock()
+    breaker = CircuitBreaker("test", base_delay=1.0, max_delay=1.0, probe_timeout=10.0, clock=clock)
+    breaker.record_failure("rate_limit")
+    clock.now = 2.0
+    assert breaker.allow()          # probe, hasilnya tidak pernah dilaporkan
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    clock.now = 13.0
+    assert breaker.allow()
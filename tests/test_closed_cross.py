@@ -0,0 +1,62 @@
+"""
+Sinyal MACD hanya dari candle yang sudah close: candle berjalan tidak dihitung,
+satu candle satu sinyal, dan cross lama tidak dikirim ulang saat start.
+"""
+import math
+
+import pytest
+
+import indicators
+import scanner
+from candles import Candles
+
+T0 = 1_700_000_000_000
+STEP = 300_000
+# gelombang sinus -> MACD cross bolak-balik tiap setengah periode
+CLOSES = [100 + 10 * math.sin(i / 8) for i in range(160)]
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    scanner.reset_state()
+    yield
+    scanner.reset_state()
+
+
+def first_cross():
+    macd_line, signal_line, _ = indicators.macd(CLOSES)
+    """Index candle cross BUY pertama sesudah warm-up indikator."""
+    return next(i for i in range(60, len(CLOSES)) if macd_line[i - 1] <= signal_line[i - 1] and macd_line[i] > signal_line[i])
+
+
+def series(n):
+    c = Candles(len(CLOSES))
+    c.update([[T0 + i * STEP, x, x, x, x, 1.0] for i, x in enumerate(CLOSES[:n])], step_ms=STEP)
+    return c
+
+
+def inside(i):
+    """now_ms di tengah candle ke-i (candle i masih berjalan)."""
+    return T0 + i * STEP + STEP // 2
+
+
+def test_forming_candle_cross_waits_for_close():
+    i = first_cross()
+    assert scanner.find_closed_cross("BTC/USDT", "5m", series(i + 1), inside(i)) is None
+    res = scanner.find_closed_cross("BTC/USDT", "5m", series(i + 2), inside(i + 1))
+    assert res["cross"] == "BUY" and res["cross_time"] == T0 + i * STEP
+    # scan berikutnya di candle yang sama tidak mengirim ulang
+    assert scanner.find_closed_cross("BTC/USDT", "5m", series(i + 2), inside(i + 1) + 60_000) is None
+
+
+def test_late_scan_catches_cross_between_passes():
+    i = first_cross()
+    assert scanner.find_closed_cross("BTC/USDT", "5m", series(i), inside(i - 1)) is None
+    # scan telat 3 candle: cross di candle i tetap ketemu
+    res = scanner.find_closed_cross("BTC/USDT", "5m", series(i + 4), inside(i + 3))
+    assert res is not None and res["cross_time"] == T0 + i * STEP
+
+
+def test_old_cross_not_sent_on_first_start():
+    i = first_cross()
+    assert scanner.find_closed_cross("BTC/USDT", "5m", series(i + 4), inside(i + 3)) is None
@@ -0,0 +1,57 @@
+"""
+Cache OHLCV: caller bersamaan untuk key yang sama menunggu satu fetch, dan
+entry tidak melewati batas close candle berikutnya.
+"""
+import threading
+import time
+
+from fetch_cache import OHLCVCache
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def rows(n, start=0, step=3_600_000):
+    return [[start + i * step, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(n)]
+
+
+def test_concurrent_callers_share_one_fetch():
+    cache = OHLCVCache(clock=Clock(1_000_000.0))
+    calls = []
+    start = threading.Barrier(8)
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return rows(200)
+
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_fetch("BTC/USDT", "1h", 200, fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 8 and all(len(r) == 200 for r in results)
+
+
+def test_entry_expires_at_next_close_and_failures_not_cached():
+    clock = Clock(3600 * 1000 - 10)  # 10 detik sebelum close 1h
+    cache = OHLCVCache(clock=clock)
+    cache.get_or_fetch("BTC/USDT", "1h", 200, lambda: rows(200))
+    assert cache.get("BTC/USDT", "1h", 200) is not None
+    clock.now += 11
+    assert cache.get("BTC/USDT", "1h", 200) is None
+
+    assert cache.get_or_fetch("ETH/USDT", "1h", 200, lambda: None) is None
+    assert cache.get("ETH/USDT", "1h", 200) is None
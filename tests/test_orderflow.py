@@ -0,0 +1,39 @@
+"""
+Order flow: prefetch banyak symbol sekaligus tidak boleh mengunci pool, dan
+hasil fetch selalu dicatat ke circuit breaker.
+"""
+import ccxt
+import pytest
+
+import orderflow
+import scanner
+from bench.fake_exchange import FakeExchange
+from circuit import CLOSED
+
+
+@pytest.fixture
+def fake(use_exchange, monkeypatch):
+    monkeypatch.setattr(orderflow, "FLOW_TIMEOUT", 3)
+    return use_exchange(FakeExchange(latency=0.02))
+
+
+def test_prefetch_more_symbols_than_workers(fake):
+    symbols = [f"S{i}/USDT" for i in range(orderflow.FLOW_WORKERS * 2)]
+    futures = [orderflow.prefetch(s) for s in symbols]
+    assert all(orderflow.resolve(f) is not None for f in futures)
+    orderflow.clear()
+    assert orderflow.resolve(orderflow.prefetch("BTC/USDT")) is not None
+
+
+def test_half_open_probe_released_on_exchange_error(fake, monkeypatch):
+    breaker = scanner.get_breaker()
+    breaker.record_failure("rate_limit", retry_after=30)
+    fake.advance(31)
+
+    def bad_symbol(symbol, limit=None, params=None):
+        raise ccxt.BadSymbol(symbol)
+
+    monkeypatch.setattr(fake, "fetch_order_book", bad_symbol)
+    assert orderflow.resolve(orderflow.prefetch("NOPE/USDT")) is None
+    assert breaker.state == CLOSED
+    assert breaker.allow()
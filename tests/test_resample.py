@@ -0,0 +1,44 @@
+"""
+Resampling: TF tinggi yang dibangun dari base 5m sama dengan candle TF itu dari
+exchange (batas bucket UTC), dan update incremental bersambung dengan seed.
+"""
+import pytest
+
+from bench.fake_exchange import FakeExchange
+from candles import Candles, timeframe_ms
+from resample import SymbolFeed, aggregate, bucket_start, can_resample
+
+
+@pytest.mark.parametrize("tf", ["15m", "1h", "4h"])
+def test_aggregate_matches_exchange_candles(tf):
+    ex = FakeExchange()
+    base = Candles.from_ccxt(ex.fetch_ohlcv("BTC/USDT", "5m", limit=1000))
+    built = aggregate(base, tf, base.time[0])
+    direct = {r[0]: r for r in ex.fetch_ohlcv("BTC/USDT", tf, limit=50)}
+    current = bucket_start(ex.milliseconds(), tf)
+    closed = [r for r in built if r[0] < current and r[0] in direct]
+    assert len(closed) >= 10
+    for row in closed:
+        assert row == pytest.approx(direct[row[0]]), row[0]
+    assert all(r[0] % timeframe_ms(tf) == 0 for r in built)
+
+
+def test_incremental_refresh_extends_seed():
+    ex = FakeExchange()
+    feed = SymbolFeed("BTC/USDT", "5m", Candles(600))
+    feed.update_base(ex.fetch_ohlcv("BTC/USDT", "5m", limit=600))
+    hour = Candles(200)
+    hour.update(ex.fetch_ohlcv("BTC/USDT", "1h", limit=200), step_ms=timeframe_ms("1h"))
+
+    ex.advance(3 * 3600)
+    since = feed.update_base(ex.fetch_ohlcv("BTC/USDT", "5m", limit=feed.fetch_limit(ex.milliseconds())))
+    feed.refresh(hour, "1h", since)
+    direct = ex.fetch_ohlcv("BTC/USDT", "1h", limit=5)
+    assert hour.time[-1] == direct[-1][0]
+    for got, want in zip(hour.rows()[-4:-1], direct[-4:-1]):
+        assert got == pytest.approx(want)
+
+
+def test_can_resample():
+    assert can_resample("5m", "1h") and can_resample("5m", "1d")
+    assert not can_resample("5m", "1M") and not can_resample("1h", "5m") and not can_resample("5m", "7m")
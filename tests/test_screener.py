@@ -0,0 +1,30 @@
+"""
+Screener: kalau pair melebihi SCREEN_MAX_SYMBOLS, yang di-screen adalah pair
+dengan volume 24 jam terbesar, dan balasan menyebut jumlahnya.
+"""
+import pytest
+
+import screener
+from bench.fake_exchange import FakeExchange, make_pairs
+
+
+@pytest.fixture
+def markets(use_exchange, monkeypatch):
+    monkeypatch.setattr(screener, "SCREEN_MAX_SYMBOLS", 5)
+    screener.clear()
+    ex = use_exchange(FakeExchange(markets=make_pairs(20)))
+    yield ex
+    screener.clear()
+
+
+def test_cap_keeps_highest_volume(markets):
+    tickers = markets.fetch_tickers()
+    expected = sorted(tickers, key=lambda s: -tickers[s]["quoteVolume"])[:5]
+    assert screener.active_usdt_symbols(markets) == expected
+    assert screener.universe() == (5, 20)
+
+
+def test_reply_reports_screened_count(markets):
+    results = screener.screen("1h")
+    assert len(results) == 5
+    assert "top 5 volume 24 jam dari 20" in screener.format_screen("1h", results)
@@ -0,0 +1,60 @@
+"""
+Watchdog: thread scanner yang sudah diganti generasi baru tidak boleh menandai
+cross atau mengirim pesan setelah ia bangun, dan worker hasil restart baru
+dianggap ready setelah menyelesaikan satu siklus.
+"""
+import threading
+import time
+
+import pytest
+
+import scanner
+from supervisor import Superseded, Supervisor, Worker, WorkerHandle
+
+
+def test_stale_scanner_thread_leaves_state_alone(fake, monkeypatch):
+    worker = Worker("scanner", target=None, stall_timeout=60)
+    worker.generation = 1
+    stale = WorkerHandle(worker, 1)
+
+    fetch = scanner.fetch_ohlcv_uncached
+
+    def hang_then_replaced(*args, **kwargs):
+        rows = fetch(*args, **kwargs)
+        worker.generation += 1  # watchdog mengganti thread selama fetch "hang"
+        return rows
+
+    monkeypatch.setattr(scanner, "fetch_ohlcv_uncached", hang_then_replaced)
+    sent = []
+    with pytest.raises(Superseded):
+        scanner.scan_once(sent.append, pairs=["BTC/USDT"], timeframes=["1h"],
+                          notify=lambda chat, msg: sent.append(msg), heartbeat=stale.beat)
+    assert not scanner.LAST_EVALUATED
+    assert not scanner.SENT_CROSSES
+    assert not sent
+
+
+def test_restarted_worker_not_ready_until_it_cycles():
+    release = threading.Event()
+
+    def target(handle):
+        if handle.generation == 1:
+            handle.cycle_done()
+        release.wait(5)  # generasi 2 "macet" sebelum siklus pertama
+
+    sup = Supervisor()
+    worker = sup.add("scanner", target, stall_timeout=60)
+    for _ in range(100):
+        if worker.cycles:
+            break
+        time.sleep(0.01)
+    assert sup.readiness()[0]
+
+    worker.start()  # restart oleh watchdog
+    try:
+        ready, detail = sup.readiness()
+        assert not ready
+        assert detail["workers"]["scanner"]["cycles"] == 1
+        assert detail["workers"]["scanner"]["cycles_since_start"] == 0
+    finally:
+        release.set()
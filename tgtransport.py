@@ -0,0 +1,167 @@
+"""
+Transport HTTP untuk Bot API Telegram (dipasang ke pyTelegramBotAPI).
+
+Bawaan telebot: satu `requests.Session` per thread (koneksi TCP+TLS baru untuk
+tiap thread pengirim, di-reset tiap 10 menit), timeout connect 15 s / read 30 s
+untuk semua method, dan body multipart foto dirakit utuh di memori.
+
+Di sini:
+- satu Session bersama dengan pool koneksi keep-alive seukuran jumlah thread
+  pengirim (`pool_block`: thread ke-N+1 menunggu koneksi bebas, tidak membuka
+  koneksi tambahan yang langsung dibuang); TCP keep-alive supaya koneksi idle
+  tidak diputus diam-diam oleh NAT/load balancer.
+- timeout connect/read eksplisit; upload (sendPhoto dsb.) dapat read timeout
+  sendiri karena body-nya besar.
+- upload foto di-stream: body multipart dibaca per blok dari bytes/file
+  aslinya, tanpa menyalin seluruh PNG ke satu buffer body.
+
+    import tgtransport
+    tgtransport.install(pool_size=8)
+    bot.send_photo(chat_id, tgtransport.upload(png), caption=...)
+"""
+import io
+import os
+import socket
+import threading
+import uuid
+
+import metrics
+
+TG_CONNECT_TIMEOUT = float(os.getenv("TG_CONNECT_TIMEOUT", "5"))
+TG_READ_TIMEOUT = float(os.getenv("TG_READ_TIMEOUT", "15"))
+TG_UPLOAD_TIMEOUT = float(os.getenv("TG_UPLOAD_TIMEOUT", "60"))
+TG_POOL_SIZE = int(os.getenv("TG_POOL_SIZE", "0"))  # 0 = pakai ukuran dari pemanggil install()
+
+_session = None
+_lock = threading.Lock()
+
+
+class MultipartStream:
+    """
+    Body multipart/form-data yang dibaca per blok (file-like dengan `len`).
+
+    `requests` mengirim objek seperti ini dengan Content-Length dari `len` dan
+    membaca isinya bertahap, jadi payload (bytes / file) tidak pernah
+    digabung ke satu buffer.
+    """
+
+    def __init__(self, files):
+        self.boundary = uuid.uuid4().hex
+        self._parts = []
+        for name, value in files.items():
+            filename, payload = value if isinstance(value, tuple) else (name, value)
+            if isinstance(payload, (bytes, bytearray, memoryview)):
+                payload = io.BytesIO(payload)
+            self._add(name, filename or name, payload)
+        self._parts.append(io.BytesIO(f"--{self.boundary}--\r\n".encode()))
+        self.len = sum(_remaining(p) for p in self._parts)
+        self._index = 0
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _add(self, name, filename, payload):
+        header = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{os.path.basename(str(filename))}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        )
+        self._parts += [io.BytesIO(header.encode()), payload, io.BytesIO(b"\r\n")]
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.len
+        out = []
+        while size > 0 and self._index < len(self._parts):
+            chunk = self._parts[self._index].read(size)
+            if not chunk:
+                self._index += 1
+                continue
+            out.append(chunk)
+            size -= len(chunk)
+        return b"".join(out)
+
+
+def _remaining(f):
+    """Sisa byte yang bisa dibaca dari file-like `f` (dari posisi sekarang)."""
+    try:
+        return os.fstat(f.fileno()).st_size - f.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pos = f.tell()
+        end = f.seek(0, io.SEEK_END)
+        f.seek(pos)
+        return end - pos
+
+
+def upload(data, name="chart.png"):
+    """
+    Bungkus bytes (PNG) untuk send_photo / InputMediaPhoto. Bytes mentah ikut
+    di-repr utuh oleh log debug telebot sebelum request (ratusan KB per upload);
+    file-like tidak, dan dibaca bertahap oleh `MultipartStream`.
+    """
+    return name, io.BytesIO(data)
+
+
+def make_session(pool_size):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection
+
+    class KeepAliveAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+            super().init_poolmanager(*args, **kwargs)
+
+    session = requests.Session()
+    # satu host (api.telegram.org) -> satu pool; max_retries=0: retry diatur pemanggil
+    adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def send_request(method, url, params=None, files=None, timeout=None, proxies=None):
+    """Pengganti `requests.request` untuk `apihelper.CUSTOM_REQUEST_SENDER`."""
+    connect, read = timeout if isinstance(timeout, tuple) else (TG_CONNECT_TIMEOUT, timeout or TG_READ_TIMEOUT)
+    kwargs = {"params": params, "timeout": (connect, read), "proxies": proxies}
+    if files:
+        # field lain (chat_id, caption, ...) tetap di query string seperti telebot
+        body = MultipartStream(files)
+        kwargs.update(
+            data=body,
+            headers={"Content-Type": body.content_type},
+            timeout=(connect, max(read, TG_UPLOAD_TIMEOUT)),
+        )
+        metrics.inc("cryptobot_telegram_upload_bytes_total", body.len)
+    return _session.request(method, url, **kwargs)
+
+
+def install(pool_size):
+    """Pasang session bersama + timeout ke telebot (sekali; aman dipanggil ulang)."""
+    global _session
+    from telebot import apihelper
+
+    with _lock:
+        if _session is None:
+            _session = make_session(TG_POOL_SIZE or pool_size)
+        apihelper.CONNECT_TIMEOUT = TG_CONNECT_TIMEOUT
+        apihelper.READ_TIMEOUT = TG_READ_TIMEOUT
+        apihelper.CUSTOM_REQUEST_SENDER = send_request
+    return _session
+
+
+def uninstall():
+    """Kembali ke transport bawaan telebot (dipakai benchmark)."""
+    global _session
+    from telebot import apihelper
+
+    with _lock:
+        apihelper.CUSTOM_REQUEST_SENDER = None
+        apihelper.CONNECT_TIMEOUT, apihelper.READ_TIMEOUT = 15, 30
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,268 @@
+"""
+Pelacakan performa sinyal yang dikirim (live, tanpa fetch tambahan).
+
+Setiap sinyal yang dikirim dibuka sebagai posisi virtual di harga close candle
+sinyal. Scanner menyerahkan close candle terakhir yang sudah close per combo
+(`observe`, O(1)); di akhir putaran `update()` memperbarui SEMUA sinyal terbuka
+sekaligus dengan operasi array numpy:
+
+    return = side * (close combo / harga masuk - 1)
+
+plus jumlah candle berjalan. Sinyal ditutup
+saat muncul sinyal berlawanan di combo yang sama, atau setelah TRACK_MAX_BARS
+candle. Return akhir masuk statistik bergulir (TRACK_WINDOW sinyal terakhir)
+per strategi/pair/timeframe: win rate dan rata-rata pergerakan.
+
+Strategi = "macd" plus tag dari pesan sinyal: "flow" (order flow searah),
+"antiflow" (berlawanan), "corr" (mengikuti leader berkorelasi).
+
+State di memori (hilang saat restart); numpy di-import lazy.
+"""
+import os
+import threading
+from collections import deque
+
+import metrics
+from candles import timeframe_ms
+
+TRACK_MAX_BARS = int(os.getenv("TRACK_MAX_BARS", "48"))   # candle sampai sinyal ditutup
+TRACK_WINDOW = int(os.getenv("TRACK_WINDOW", "100"))      # sinyal tertutup per statistik
+SIDES = {"BUY": 1.0, "SELL": -1.0}
+
+
+def strategy_of(res, flow_verdict=None):
+    tags = ["macd"]
+    if flow_verdict is True:
+        tags.append("flow")
+    elif flow_verdict is False:
+        tags.append("antiflow")
+    if res.get("corr"):
+        tags.append("corr")
+    return "+".join(tags)
+
+
+class SignalTracker:
+    # array per sinyal terbuka (baris 0..n-1 terpakai)
+    _OPEN_ARRAYS = ("_key", "_strategy", "_side", "_entry", "_last", "_bars", "_ret")
+
+    def __init__(self, max_bars=TRACK_MAX_BARS, window=TRACK_WINDOW):
+        self.max_bars = max_bars
+        self.window = window
+        self._np = None
+        self._lock = threading.Lock()
+        # per combo: id, close & waktu candle close terakhir, panjang candle (ms)
+        self._keys = {}
+        self._key_names = []
+        self._strategies = {}
+        self._strategy_names = []
+        self.n = 0  # jumlah sinyal terbuka (baris terpakai di array)
+        # (strategi, symbol, tf) -> deque return sinyal tertutup
+        self._closed = {}
+
+    def _init_arrays(self):
+        import numpy as np
+
+        self._np = np
+        self._k_close = np.zeros(16)
+        self._k_time = np.full(16, -1, dtype=np.int64)
+        self._k_tf = np.ones(16, dtype=np.int64)
+        cap = 64
+        self._key = np.zeros(cap, dtype=np.int64)
+        self._strategy = np.zeros(cap, dtype=np.int64)
+        self._side = np.zeros(cap)
+        self._entry = np.zeros(cap)
+        self._last = np.zeros(cap, dtype=np.int64)   # waktu candle terakhir yang dihitung
+        self._bars = np.zeros(cap, dtype=np.int64)
+        self._ret = np.zeros(cap)
+
+    def _key_id(self, symbol, tf):
+        key_id = self._keys.get((symbol, tf))
+        if key_id is None:
+            key_id = self._keys[(symbol, tf)] = len(self._key_names)
+            self._key_names.append((symbol, tf))
+            if key_id >= len(self._k_close):
+                np = self._np
+                grow = len(self._k_close)
+                self._k_close = np.concatenate([self._k_close, np.zeros(grow)])
+                self._k_time = np.concatenate([self._k_time, np.full(grow, -1, dtype=np.int64)])
+                self._k_tf = np.concatenate([self._k_tf, np.ones(grow, dtype=np.int64)])
+            self._k_tf[key_id] = timeframe_ms(tf)
+        return key_id
+
+    def _strategy_id(self, name):
+        sid = self._strategies.get(name)
+        if sid is None:
+            sid = self._strategies[name] = len(self._strategy_names)
+            self._strategy_names.append(name)
+        return sid
+
+    # ---------- dari scanner ----------
+
+    def observe(self, symbol, tf, candles, now_ms):
+        """Catat close candle terakhir yang sudah close untuk combo ini (hanya combo yang dilacak)."""
+        key_id = self._keys.get((symbol, tf))
+        if key_id is None:
+            return
+        tf_ms = timeframe_ms(tf)
+        times = candles.time
+        last = len(times) - 1
+        while last >= 0 and times[last] + tf_ms > now_ms:
+            last -= 1  # candle yang masih berjalan
+        if last < 0:
+            return
+        with self._lock:
+            self._k_close[key_id] = candles.close[last]
+            self._k_time[key_id] = times[last]
+
+    def open(self, symbol, tf, side, price, candle_time, strategy):
+        """Buka sinyal baru; sinyal berlawanan yang masih terbuka di combo ini ditutup di `price`."""
+        with self._lock:
+            if self._np is None:
+                self._init_arrays()
+            np = self._np
+            key_id = self._key_id(symbol, tf)
+            sign = SIDES[side]
+            n = self.n
+            if n:
+                opposite = (self._key[:n] == key_id) & (self._side[:n] != sign)
+                if opposite.any():
+                    self._ret[:n] = np.where(opposite, self._side[:n] * (price / self._entry[:n] - 1.0), self._ret[:n])
+                    self._close(opposite)
+                    n = self.n
+            if n == len(self._key):
+                for name in self._OPEN_ARRAYS:
+                    arr = getattr(self, name)
+                    setattr(self, name, np.concatenate([arr, np.zeros_like(arr)]))
+            self._key[n] = key_id
+            self._strategy[n] = self._strategy_id(strategy)
+            self._side[n] = sign
+            self._entry[n] = price
+            self._last[n] = max(candle_time, self._k_time[key_id])
+            self._bars[n] = 0
+            self._ret[n] = 0.0
+            self.n = n + 1
+            metrics.set_gauge("cryptobot_tracked_signals", self.n)
+
+    def update(self):
+        """Perbarui return semua sinyal terbuka dari close terakhir tiap combo (sekali per putaran)."""
+        with self._lock:
+            n = self.n
+            if not n:
+                return
+            np = self._np
+            key = self._key[:n]
+            t = self._k_time[key]
+            last = self._last[:n]
+            newer = t > last
+            if not newer.any():
+                return
+            ret = self._side[:n] * (self._k_close[key] / self._entry[:n] - 1.0)
+            self._bars[:n] += np.where(newer, (t - last) // self._k_tf[key], 0)
+            self._ret[:n] = np.where(newer, ret, self._ret[:n])
+            np.maximum(last, t, out=last)
+            done = self._bars[:n] >= self.max_bars
+            if done.any():
+                self._close(done)
+            metrics.set_gauge("cryptobot_tracked_signals", self.n)
+
+    def _close(self, mask):
+        """Pindahkan sinyal `mask` ke statistik tertutup dan padatkan array (lock dipegang)."""
+        n = self.n
+        for i in mask.nonzero()[0]:
+            symbol, tf = self._key_names[self._key[i]]
+            group = (self._strategy_names[self._strategy[i]], symbol, tf)
+            returns = self._closed.get(group)
+            if returns is None:
+                returns = self._closed[group] = deque(maxlen=self.window)
+            returns.append(float(self._ret[i]))
+            metrics.inc("cryptobot_tracked_closed_total", tf=tf, win=str(self._ret[i] > 0).lower())
+        keep = ~mask
+        kept = int(keep.sum())
+        for name in self._OPEN_ARRAYS:
+            arr = getattr(self, name)
+            arr[:kept] = arr[:n][keep]
+        self.n = kept
+
+    # ---------- statistik ----------
+
+    def stats(self, symbol=None, tf=None):
+        """
+        Baris statistik per (strategi, symbol, tf), terurut: dict dengan closed,
+        win_rate, avg (return rata-rata tertutup), open, open_avg (unrealized rata-rata).
+        """
+        with self._lock:
+            groups = {}
+            for (strategy, sym, timeframe), returns in self._closed.items():
+                groups[(strategy, sym, timeframe)] = {"returns": list(returns), "open": []}
+            for i in range(self.n):
+                sym, timeframe = self._key_names[self._key[i]]
+                group = (self._strategy_names[self._strategy[i]], sym, timeframe)
+                groups.setdefault(group, {"returns": [], "open": []})["open"].append(float(self._ret[i]))
+        rows = []
+        for (strategy, sym, timeframe), g in sorted(groups.items()):
+            if (symbol is not None and sym != symbol) or (tf is not None and timeframe != tf):
+                continue
+            returns, opened = g["returns"], g["open"]
+            rows.append({
+                "strategy": strategy, "symbol": sym, "tf": timeframe,
+                "closed": len(returns),
+                "win_rate": sum(r > 0 for r in returns) / len(returns) if returns else None,
+                "avg": sum(returns) / len(returns) if returns else None,
+                "open": len(opened),
+                "open_avg": sum(opened) / len(opened) if opened else None,
+            })
+        return rows
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        with self._lock:
+            self.n = 0
+            self._closed.clear()
+            self._keys.clear()
+            self._key_names.clear()
+            self._strategies.clear()
+            self._strategy_names.clear()
+            if self._np is not None:
+                self._init_arrays()
+
+
+def _pct(v):
+    return "    -" if v is None else f"{v * 100:+5.1f}"
+
+
+def format_stats(rows, max_rows=30):
+    """Pesan /stats: ringkasan per strategi lalu detail per pair/TF."""
+    if not rows:
+        return "Belum ada sinyal yang dilacak sejak bot start."
+    by_strategy = {}
+    for r in rows:
+        s = by_strategy.setdefault(r["strategy"], {"closed": 0, "wins": 0.0, "sum": 0.0, "open": 0})
+        s["closed"] += r["closed"]
+        s["open"] += r["open"]
+        if r["closed"]:
+            s["wins"] += r["win_rate"] * r["closed"]
+            s["sum"] += r["avg"] * r["closed"]
+    lines = ["📈 *Performa sinyal* (return sampai sinyal berlawanan / "
+             f"{TRACK_MAX_BARS} candle, {TRACK_WINDOW} terakhir per combo)", "```",
+             f"{'strategi':<16}{'n':>5}{'win%':>6}{'avg%':>7}{'open':>6}"]
+    for name, s in sorted(by_strategy.items()):
+        closed = s["closed"]
+        win = f"{100 * s['wins'] / closed:5.0f}" if closed else "    -"
+        avg = _pct(s["sum"] / closed if closed else None)
+        lines.append(f"{name:<16}{closed:>5} {win} {avg:>6}{s['open']:>6}")
+    lines.append("")
+    lines.append(f"{'pair':<11}{'tf':<4}{'n':>4}{'win%':>6}{'avg%':>7}{'open':>5}{'unr%':>7}")
+    ranked = sorted(rows, key=lambda r: (r["closed"], r["open"]), reverse=True)
+    for r in ranked[:max_rows]:
+        win = f"{100 * r['win_rate']:5.0f}" if r["win_rate"] is not None else "    -"
+        tag = "" if r["strategy"] == "macd" else " " + r["strategy"][5:]
+        lines.append(
+            f"{r['symbol'].replace('/USDT', ''):<11}{r['tf']:<4}{r['closed']:>4} {win} {_pct(r['avg']):>6}"
+            f"{r['open']:>5} {_pct(r['open_avg']):>6}{tag}"
+        )
+    if len(rows) > max_rows:
+        lines.append(f"... {len(rows) - max_rows} baris lagi (filter: /stats BTCUSDT atau /stats 1h)")
+    lines.append("```")
+    return "\n".join(lines)